@@ -3,16 +3,16 @@ This is the main module responsible for the RigValidations, which use the sub-cl
 process.
 """
 # General Imports.
-import ConfigParser
-import os
 import re
 
 # maya related imports.
 import pymel.core as pm
 
 # custom imports.
+from Validations.core import dev_mode
+from Validations.core import project_config
 from Validations.core import validations
-reload(validations)
+dev_mode.devReload(validations)
 
 
 class MayaValidations(validations.Validations):
@@ -26,26 +26,16 @@ class MayaValidations(validations.Validations):
         :return:
         :rtype:
         """
-        root_folder = os.path.dirname(os.path.dirname(__file__)).replace('\\', '/')
-        root_folder = root_folder.replace('/core', '/config')
-        # print root_folder, '<----------------------------------------'
-        proj_config = os.path.join(root_folder, self.project.lower()).replace('\\', '/')
-        # print proj_config, '============================================='
-        if not os.path.isfile(proj_config):
-            proj_config = os.path.join(root_folder, 'default').replace('\\', '/')
-        # print proj_config, '<========================================'
-        return proj_config
+        return project_config.getConfigFile(self.project)
 
     @property
     def get_parser(self):
         """
-        Make the parser here.
+        The cached config of the project, parsed once and reloaded only when the file changes.
         :return:
-        :rtype:
+        :rtype: project_config.ProjectConfig
         """
-        config_parser = ConfigParser.ConfigParser()
-        config_parser.read(self.get_config)
-        return config_parser
+        return project_config.getConfig(self.project)
 
     def selectErrorNodes(self):
         """
@@ -75,6 +65,8 @@ class CheckUnknownNodes(MayaValidations):
     """
     _name = "Unknow node check"
     _category = "Animation Validations"
+    _watchTypes = ('unknown', 'unknownDag', 'unknownTransform')
+    _watchAttrs = ()
 
     def check(self):
         """
@@ -85,7 +77,7 @@ class CheckUnknownNodes(MayaValidations):
         self.isNodes = True
         self.isFixable = True
         errorNodes = list()
-        for each in pm.ls(type='unknown'):
+        for each in self.snapshot.pyNodes(type='unknown'):
             errorNodes.append(each)
         self.status = 'OK'
         if len(errorNodes):
@@ -113,6 +105,8 @@ class CheckRootHiearchy(MayaValidations):
     """
     _name = "Root Hiearchy check"
     _category = "Animation Validations"
+    _watchTypes = ('dagNode',)
+    _watchAttrs = ()
 
     def check(self):
         """
@@ -127,12 +121,12 @@ class CheckRootHiearchy(MayaValidations):
         project_defaults = ['__SUBSET__', '__SET__', '__CAMERA__', '__CHARS__', '__PROPS__']
 
         errorNodes = list()
-        for each in pm.ls(assemblies=1):
-            if str(each) in defaults:
+        for each in self.snapshot.assemblies():
+            if each in defaults:
                 continue
-            if str(each) in project_defaults:
+            if each in project_defaults:
                 continue
-            errorNodes.append(str(each))
+            errorNodes.append(each)
         self.setStatus('OK')
         if len(errorNodes) > 0:
             self.setStatus('WARNING')
@@ -152,6 +146,7 @@ class CheckSettingsInfoNode(MayaValidations):
     """
     _name = "Shot node check"
     _category = "Animation utility Validations"
+    _watchAttrs = ()
 
     def check(self):
         """
@@ -163,16 +158,17 @@ class CheckSettingsInfoNode(MayaValidations):
         self.isNodes = False
         self.isFixable = False
         nodeType = self.get_parser.get('SETTINGS', 'settingsinfonode')
+        infoNodes = self.snapshot.pyNodes(type=nodeType)
         self.setStatus('OK')
-        if not len(pm.ls(type=nodeType)):
+        if not len(infoNodes):
             self.setStatus('WARNING')
             self.setErrorMessage('No %s node found in the scene.' % nodeType)
             return False, ''
-        elif len(pm.ls(type=nodeType)) > 1:
+        elif len(infoNodes) > 1:
             self.setStatus('ERROR')
             self.setErrorMessage('More than 1 %s node found in the scene.' % nodeType)
             return False, ''
-        return True, pm.ls(type=nodeType)[0]
+        return True, infoNodes[0]
 
 class CheckFrameLength(MayaValidations):
     """
@@ -182,9 +178,23 @@ class CheckFrameLength(MayaValidations):
     """
     _name = "Start and End frame check"
     _category = "Animation Validations"
+    _watchAttrs = ('startFrame', 'endFrame')
+    _watchEvents = ('playbackChanged',)
+    _requires = (CheckSettingsInfoNode,)
+    # the fix needs the frames read by the check.
+    _cacheable = False
     _startFrame = ''
     _endFrame = ''
 
+    @property
+    def _watchTypes(self):
+        """
+        The settings info node type of the project config, shotgun's shot node.
+        :return:
+        :rtype: tuple
+        """
+        return (self.get_parser.get('SETTINGS', 'settingsinfonode'),)
+
     def check(self):
         """
 
@@ -196,11 +206,9 @@ class CheckFrameLength(MayaValidations):
         start_frame = ''
         end_frame = ''
 
-        checkInfo = CheckSettingsInfoNode(self.project)
-        nodeCheck = checkInfo.check()
-        if nodeCheck[0]:
+        nodeFound, shotNode = self.getRequirement(CheckSettingsInfoNode).payload
+        if nodeFound:
             # print 'Settings info node found not refering to the database.'
-            shotNode = pm.PyNode(nodeCheck[1])
             start_frame = shotNode.startFrame.get()
             end_frame = shotNode.endFrame.get()
         else:
@@ -237,6 +245,16 @@ class CheckAudio(MayaValidations):
     """
     _name = "Audio check"
     _category = "Animation Validations"
+    _requires = (CheckSettingsInfoNode,)
+
+    @property
+    def _watchTypes(self):
+        """
+        The audio nodes and the settings info node type of the project config, shotgun's shot node.
+        :return:
+        :rtype: tuple
+        """
+        return ('audio', self.get_parser.get('SETTINGS', 'settingsinfonode'))
 
     def check(self):
         """
@@ -247,19 +265,17 @@ class CheckAudio(MayaValidations):
         self.isNodes = True
         self.isFixable = False
         self.setStatus('OK')
-        checkInfo = CheckSettingsInfoNode(self.project)
-        nodeCheck = checkInfo.check()
+        nodeFound, shotNode = self.getRequirement(CheckSettingsInfoNode).payload
 
         shot_audio = ''
-        if not nodeCheck[0]:
+        if not nodeFound:
             raise RuntimeError('Settings info node not found, invalid scene.')
 
-        shotNode = pm.PyNode(nodeCheck[1])
         for each in shotNode.listConnections():
             if pm.nodeType(each) == 'audio':
                 shot_audio = each
 
-        scene_audio = pm.ls(type='audio')
+        scene_audio = self.snapshot.pyNodes(type='audio')
         if not len(scene_audio):
             self.errorMessage = 'No audio in the scene.'
             self.setStatus('WARNING')
@@ -271,7 +287,7 @@ class CheckAudio(MayaValidations):
             self.setStatus('ERROR')
             return False
         if scene_audio[0] != shot_audio:
-            self.errorNodes.append(scene_audio[0])
+            self.errorStore.append(scene_audio[0])
             self.errorMessage = 'Audio not matching with the shotNode audio.'
             self.setStatus('ERROR')
             return False
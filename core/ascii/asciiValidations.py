@@ -0,0 +1,444 @@
+"""
+This is the offline validation engine, it validates a maya ascii file without maya. The file is read once by the
+AsciiScene, which is used as the scene snapshot of the run, then the validations that can be answered from the file
+alone run on it. The classes are named like their maya counterpart so the VALIDATIONS lists of the configs apply.
+
+Only what is written in the file is known, the content of the references is not read.
+"""
+# General Imports.
+import re
+
+from Validations.core import plugin_lists
+from Validations.core import project_config
+from Validations.core import scene_snapshot
+from Validations.core import validations
+from Validations.core.ascii import maReader
+
+DEFAULT_CAMERAS = ['persp', 'top', 'front', 'side']
+
+UNKNOWN_TYPES = ('unknown', 'unknownDag', 'unknownTransform')
+
+# the dag types that can be at the root of the hierarchy, the other node types are only dag if they have a parent.
+ROOT_DAG_TYPES = ('transform', 'joint', 'ikHandle', 'unknownTransform', 'unknownDag')
+
+# the base types the offline checks query by, maya resolves them with nodeType(inherited=True).
+_INHERITED_TYPES = {'constraint': lambda x: x.endswith('Constraint'),
+                    'transform': lambda x: x in ('transform', 'joint', 'ikHandle', 'unknownTransform') or
+                    x.endswith('Constraint'),
+                    'shape': lambda x: x in ('mesh', 'nurbsCurve', 'nurbsSurface', 'locator', 'camera')}
+
+_CHANNELS = {'t': ('tx', 'ty', 'tz'), 'r': ('rx', 'ry', 'rz'), 's': ('sx', 'sy', 'sz')}
+_LONG_ATTRS = {'translate': 't', 'rotate': 'r', 'scale': 's', 'fileTextureName': 'ftn'}
+
+
+def resolveInheritedTypes(nodeType):
+    """
+    The offline version of nodeType(inherited=True), limited to the base types the checks query by.
+    :param nodeType: the node type.
+    :type nodeType: str
+    :return:
+    :rtype: list
+    """
+    return [nodeType] + [x for x, match in _INHERITED_TYPES.items() if match(nodeType)]
+
+
+class AsciiSceneReader(maReader.MayaAsciiReader):
+    """
+    Collects in one pass everything the offline checks need. Every node is kept by the path it is created at, the
+    -p flags and the node names of the statements are resolved against the nodes already created, like maya does when
+    it reads the file, so the nodes with the same short name stay apart.
+    """
+    _wantedAttrs = ('t', 'r', 's', 'tx', 'ty', 'tz', 'rx', 'ry', 'rz', 'sx', 'sy', 'sz', 'ftn')
+
+    def __init__(self, stream):
+        super(AsciiSceneReader, self).__init__(stream)
+        # (path, type) of the created nodes, every path starts with "|" until longName tells the dag nodes apart.
+        self.nodes = list()
+        self.nodeTypes = dict()
+        self.requires = list()
+        self.references = list()
+        self.attrs = dict()
+        self.connections = list()
+        self.currentPath = None
+        self._pathsByName = dict()
+        self._parents = set()
+
+    def resolvePath(self, name):
+        """
+        Return the path of a created node from the name used in a statement, a short name or a partial path. When it
+        matches several nodes the last one created wins.
+        :param name: the node name.
+        :type name: str
+        :return: None if no created node matches.
+        :rtype: str
+        """
+        name = name.lstrip(':')
+        if not name:
+            return None
+        candidates = self._pathsByName.get(name.rsplit('|', 1)[-1], ())
+        if name.startswith('|'):
+            return name if name in candidates else None
+        for path in reversed(candidates):
+            if path.endswith('|' + name):
+                return path
+        return None
+
+    def longName(self, path):
+        """
+        Return the long name of a created node, the nodes created at the root without being dag keep their name.
+        :param path: the path of the node.
+        :type path: str
+        :return:
+        :rtype: str
+        """
+        if path.count('|') == 1 and path not in self._parents and self.nodeTypes.get(path) not in ROOT_DAG_TYPES:
+            return path[1:]
+        return path
+
+    def on_requires(self, plugin, version):
+        self.requires.append((plugin, version))
+
+    def on_file_reference(self, path, namespace, referenceNode):
+        self.references.append((path, namespace, referenceNode))
+
+    def on_create_node(self, nodetype, name, parent):
+        parentPath = None
+        if parent:
+            # a parent not created in this file, from a reference, is kept as it is written.
+            parentPath = self.resolvePath(parent) or '|' + parent.lstrip('|')
+            self._parents.add(parentPath)
+        path = '%s|%s' % (parentPath or '', name)
+        self.nodes.append((path, nodetype))
+        self.nodeTypes[path] = nodetype
+        self._pathsByName.setdefault(name, list()).append(path)
+        self.currentPath = path
+
+    def on_select(self, name):
+        self.currentPath = self.resolvePath(name)
+
+    def _getAttrNode(self, name):
+        node, _, attr = name.rpartition('.')
+        return self.resolvePath(node) if node else self.currentPath, _LONG_ATTRS.get(attr, attr)
+
+    def wants_set_attr(self, name):
+        node, attr = self._getAttrNode(name)
+        if node is None or attr not in self._wantedAttrs:
+            return False
+        nodeType = self.nodeTypes.get(node)
+        if attr == 'ftn':
+            return nodeType == 'file'
+        return node.endswith('CTRL')
+
+    def on_set_attr(self, name, value, type):
+        self.attrs[self._getAttrNode(name)] = value
+
+    def on_connect_attr(self, source, destination):
+        self.connections.append((source, destination))
+
+
+class AsciiScene(scene_snapshot.SceneSnapshot):
+    """
+    The scene snapshot of a maya ascii file, with the extra data only the file gives.
+    """
+    def __init__(self, path, reader):
+        self.path = path
+        self.requires = reader.requires
+        self.references = reader.references
+        self.connections = reader.connections
+        self._attrs = dict()
+
+        for (node, attr), value in reader.attrs.iteritems():
+            self._attrs[(reader.longName(node), attr)] = value
+        super(AsciiScene, self).__init__([(reader.longName(x), y) for x, y in reader.nodes], (), resolveInheritedTypes)
+
+    @classmethod
+    def fromFile(cls, path):
+        """
+        Read the maya ascii file in one streaming pass.
+        :param path: the .ma file.
+        :type path: str
+        :return:
+        :rtype: AsciiScene
+        """
+        if not path.lower().endswith('.ma'):
+            raise ValueError('Only the maya ascii files can be validated offline : %s' % path)
+        with open(path, 'r') as readId:
+            reader = AsciiSceneReader(readId)
+            reader.parse()
+        return cls(path, reader)
+
+    def getAttr(self, node, attr, default=None):
+        """
+        Return the value set in the file for the attribute, default if the file doesn't set it.
+        :param node: long name of the node.
+        :type node: str
+        :param attr: short name of the attribute, like "t" or "ftn".
+        :type attr: str
+        :return:
+        :rtype: object
+        """
+        return self._attrs.get((node, attr), default)
+
+    def getVector(self, node, attr, default):
+        """
+        Return a double3 attribute, built from its channels when they are set one by one.
+        """
+        value = self.getAttr(node, attr)
+        if isinstance(value, list) and len(value) == 3:
+            return [float(x) for x in value]
+        return [float(self.getAttr(node, x, default[i])) for i, x in enumerate(_CHANNELS[attr])]
+
+    def namespaces(self):
+        """
+        The namespaces of the references and of the nodes written in the file.
+        """
+        found = list()
+        names = [x[1] for x in self.references] + [x.rsplit(':', 1)[0] for x in self.ls(long=False) if ':' in x]
+        for name in names:
+            if name and name not in found:
+                found.append(name)
+        return found
+
+
+class AsciiValidations(validations.Validations):
+    """
+    Base of the offline validations, the snapshot of their run is an AsciiScene.
+    """
+    @property
+    def get_parser(self):
+        """
+        The cached config of the project.
+        :return:
+        :rtype: project_config.ProjectConfig
+        """
+        return project_config.getConfig(self.project)
+
+    def fix(self):
+        print 'Can\'t be fixed offline, please open the scene in maya to fix it.'
+
+
+class CheckPluginRequired(AsciiValidations):
+    """
+    Check the requires statements for the unwanted plugins.
+    """
+    _name = "Plugins required check"
+    _category = "Offline Validations"
+
+    def check(self):
+        self.isFixable = False
+        self.isNodes = True
+
+        errorPlugins = list()
+        for plugin, version in self.snapshot.requires:
+            for each_plug in plugin_lists.PROBLEMATIC_PLUGINS:
+                if each_plug in plugin and each_plug not in errorPlugins:
+                    errorPlugins.append(each_plug)
+        self.setStatus('OK')
+        if errorPlugins:
+            self.setStatus('ERROR')
+            self.setErrorNodes(errorPlugins)
+            self.setErrorMessage('%s numbers of unwanted plugins found in the scene in ACSII mode.' % len(errorPlugins))
+
+
+class CheckUnknownNodes(AsciiValidations):
+    """
+    Check for the unknown nodes written in the file.
+    """
+    _name = "Unknow node check"
+    _category = "Offline Validations"
+
+    def check(self):
+        self.isFixable = False
+        self.isNodes = True
+
+        errorNodes = self.snapshot.ls(exactType=UNKNOWN_TYPES)
+        self.setStatus('OK')
+        if errorNodes:
+            self.setStatus('ERROR')
+            self.setErrorNodes(errorNodes)
+            self.setErrorMessage('%s unknown nodes found in the scene.' % len(errorNodes))
+
+
+class CheckNamespace(AsciiValidations):
+    """
+    Check if the namespaces are legal.
+    """
+    _name = "Namespace"
+    _category = "Offline Validations"
+
+    def check(self):
+        self.isFixable = False
+        self.isNodes = True
+
+        illegalNamespaces = list()
+        progStandard = re.compile("^[A-Z]{4}[0-9]{2}_[0-9]{3}$")
+        progShot = re.compile("^SH[0-9]{4}_[0-9]{3}$")
+        for namespaces in self.snapshot.namespaces():
+            for namespace in namespaces.strip(':').split(':'):
+                if progStandard.match(namespace) or progShot.match(namespace) or namespace in ['UI', 'shared']:
+                    continue
+                if namespace not in illegalNamespaces:
+                    illegalNamespaces.append(namespace)
+        self.setStatus('OK')
+        if illegalNamespaces:
+            self.setStatus('ERROR')
+            self.setErrorNodes(illegalNamespaces)
+            self.setErrorMessage('%s  illegal namespace' % len(illegalNamespaces))
+
+
+class CheckTopNodes(AsciiValidations):
+    """
+    Check there is only one top node besides the default cameras.
+    """
+    _name = "Number of Top Node check"
+    _category = "Offline Validations"
+
+    def check(self):
+        self.isFixable = False
+        self.isNodes = True
+
+        wrong_names = [x for x in self.snapshot.assemblies() if x not in DEFAULT_CAMERAS]
+        self.setStatus('OK')
+        if len(wrong_names) != 1:
+            self.setStatus('ERROR')
+            self.setErrorNodes(wrong_names)
+            self.setErrorMessage('%s number of top nodes found in the scene, allowed only 1.' % len(wrong_names))
+
+
+class CheckRootHiearchy(AsciiValidations):
+    """
+    Check for the root nodes that are not part of the project defaults.
+    """
+    _name = "Root Hiearchy check"
+    _category = "Offline Validations"
+
+    def check(self):
+        self.isFixable = False
+        self.isNodes = True
+
+        parser = self.get_parser
+        project_defaults = ['__SUBSET__', '__SET__', '__CAMERA__', '__CHARS__', '__PROPS__']
+        if parser.has_option('TOPNODES', 'defaults'):
+            project_defaults = parser.get('TOPNODES', 'defaults')
+
+        errorNodes = [x for x in self.snapshot.assemblies() if x not in DEFAULT_CAMERAS + list(project_defaults)]
+        self.setStatus('OK')
+        if errorNodes:
+            self.setStatus('WARNING')
+            self.setErrorNodes(errorNodes)
+            self.setErrorMessage('%s numbers of extra root nodes found in the scene.' % len(errorNodes))
+
+
+class TexturePathCheck(AsciiValidations):
+    """
+    Check the file textures come from the production server.
+    """
+    _name = "Texture Path Check"
+    _category = "Offline Validations"
+
+    def check(self):
+        self.isFixable = False
+        self.isNodes = True
+
+        errorNodes = list()
+        for each in self.snapshot.ls(type='file'):
+            if not str(self.snapshot.getAttr(each, 'ftn', '')).startswith('$PROD_SERVER'):
+                errorNodes.append(each)
+        self.setStatus('OK')
+        if errorNodes:
+            self.setStatus('ERROR')
+            self.setErrorNodes(errorNodes)
+            self.setErrorMessage('%s file textures are from invalid paths.' % len(errorNodes))
+
+
+class CheckAudio(AsciiValidations):
+    """
+    Check there is exactly one audio node.
+    """
+    _name = "Audio check"
+    _category = "Offline Validations"
+
+    def check(self):
+        self.isFixable = False
+        self.isNodes = True
+
+        scene_audio = self.snapshot.ls(type='audio')
+        self.setStatus('OK')
+        if not scene_audio:
+            self.setStatus('WARNING')
+            self.setErrorMessage('No audio in the scene.')
+            self.isNodes = False
+        elif len(scene_audio) > 1:
+            self.setStatus('ERROR')
+            self.setErrorNodes(scene_audio)
+            self.setErrorMessage('More than 1 audio present in the scene.')
+
+
+class CheckCtrlTransform(AsciiValidations):
+    """
+    Check the CTRL transforms are at their rest values.
+    """
+    _name = "CTRL Transform check"
+    _category = "Offline Validations"
+
+    def check(self):
+        self.isFixable = False
+        self.isNodes = True
+
+        errorCTRLs = list()
+        rest = (('t', [0.0, 0.0, 0.0]), ('r', [0.0, 0.0, 0.0]), ('s', [1.0, 1.0, 1.0]))
+        for each in self.snapshot.ls(type='transform', suffix='CTRL'):
+            for attr, default in rest:
+                values = self.snapshot.getVector(each, attr, default)
+                if any(round(x - y, 5) for x, y in zip(values, default)):
+                    errorCTRLs.append(each)
+                    break
+        self.setStatus('OK')
+        if errorCTRLs:
+            self.setStatus('ERROR')
+            self.setErrorNodes(errorCTRLs)
+            self.setErrorMessage('%s CTRLS has non ZERO values' % len(errorCTRLs))
+
+
+def getValidationClasses(project, department):
+    """
+    Return the offline validations among the ones configured for the project and department.
+    :param project: the project name.
+    :type project: str
+    :param department: "rig" or "anim".
+    :type department: str
+    :return: the offline classes and the names of the configured validations that can't run offline.
+    :rtype: tuple
+    """
+    classes = list()
+    skipped = list()
+    for className in project_config.getConfig(project).get('VALIDATIONS', department):
+        validationClass = globals().get(className)
+        if isinstance(validationClass, type) and issubclass(validationClass, AsciiValidations):
+            if validationClass not in classes:
+                classes.append(validationClass)
+        elif className not in skipped:
+            skipped.append(className)
+    return classes, skipped
+
+
+def validateFile(path, project, department):
+    """
+    Validate a maya ascii file, the file is read only once for all the validations.
+    :param path: the .ma file.
+    :type path: str
+    :param project: the project name.
+    :type project: str
+    :param department: "rig" or "anim".
+    :type department: str
+    :return: the finished validations and the names of the ones that can't run offline.
+    :rtype: tuple
+    """
+    classes, skipped = getValidationClasses(project, department)
+    finished = list()
+    with validations.ValidationRun(lambda: AsciiScene.fromFile(path)) as validationRun:
+        for validationClass in classes:
+            validation = validationClass(project)
+            validation.run(validationRun)
+            finished.append(validation)
+    return finished, skipped
@@ -0,0 +1,236 @@
+"""
+Streaming reader for the maya ascii files. The file is read line by line and split into MEL statements, the statements
+the validations care about are handed to the on_* callbacks, with the same names as the maya_scenefile_parser ones
+(see test/maya_parser.py), so a subclass only overrides what it needs.
+"""
+# General Imports.
+import re
+
+_QUOTE_RE = re.compile(r'\\.|"')
+_TOKEN_RE = re.compile(r'"((?:[^"\\]|\\.)*)"|([^\s"]+)')
+_ESCAPE_RE = re.compile(r'\\(.)')
+_ESCAPES = {'n': '\n', 't': '\t', 'r': '\r'}
+_FLAG_RE = re.compile(r'^-[a-zA-Z]')
+
+# flags taking one argument, per command.
+_CREATE_NODE_FLAGS = ('-n', '-name', '-p', '-parent')
+_SET_ATTR_FLAGS = ('-k', '-keyable', '-l', '-lock', '-cb', '-channelBox', '-s', '-size', '-type', '-typ', '-ch',
+                   '-capacityHint')
+_REQUIRES_FLAGS = ('-nodeType', '-dataType')
+_FILE_FLAGS = ('-rdi', '-ns', '-rfn', '-op', '-typ', '-type', '-dr', '-rpr', '-shd', '-pmt')
+_CONNECT_ATTR_FLAGS = ('-l', '-lock')
+
+
+def _unescape(text):
+    return _ESCAPE_RE.sub(lambda x: _ESCAPES.get(x.group(1), x.group(1)), text)
+
+
+def tokenize(statement):
+    """
+    Lazily split a statement into (text, isQuoted) tokens.
+    :param statement: a MEL statement without its ending ";".
+    :type statement: str
+    :return:
+    :rtype: generator
+    """
+    for match in _TOKEN_RE.finditer(statement):
+        if match.group(1) is not None:
+            yield _unescape(match.group(1)), True
+        else:
+            yield match.group(2), False
+
+
+def splitArgs(tokens, flagsWithArg):
+    """
+    Split the tokens of a command into its flags and its positional arguments.
+    :param tokens: the (text, isQuoted) tokens after the command name.
+    :type tokens: iterable
+    :param flagsWithArg: the flags taking one argument, the others are taken as booleans.
+    :type flagsWithArg: tuple
+    :return: flags dictionary and positional arguments.
+    :rtype: tuple
+    """
+    flags = dict()
+    positional = list()
+    tokens = iter(tokens)
+    for text, quoted in tokens:
+        if not quoted and _FLAG_RE.match(text):
+            if text in flagsWithArg:
+                flags[text] = next(tokens, ('', False))[0]
+            else:
+                flags[text] = True
+            continue
+        positional.append(text)
+    return flags, positional
+
+
+def toValue(text, quoted):
+    """
+    Convert a bare token to a number when it is one.
+    """
+    if quoted:
+        return text
+    try:
+        return int(text)
+    except ValueError:
+        try:
+            return float(text)
+        except ValueError:
+            return text
+
+
+class MayaAsciiReader(object):
+    """
+    Streaming reader of a maya ascii file, override the on_* callbacks to collect what is needed.
+    """
+    def __init__(self, stream):
+        super(MayaAsciiReader, self).__init__()
+        self.stream = stream
+        self.currentNode = None
+        self._handlers = {'requires': self._requires,
+                          'file': self._file,
+                          'createNode': self._createNode,
+                          'setAttr': self._setAttr,
+                          'connectAttr': self._connectAttr,
+                          'select': self._select}
+
+    def iterStatements(self):
+        """
+        Yield the statements of the file, a statement can be on several lines and strings can hold ";".
+        :return:
+        :rtype: generator
+        """
+        buf = list()
+        inString = False
+        for line in self.stream:
+            if not buf and not inString:
+                stripped = line.lstrip()
+                if not stripped or stripped.startswith('//'):
+                    continue
+            buf.append(line)
+            if '"' in line or '\\' in line:
+                for match in _QUOTE_RE.finditer(line):
+                    if match.group(0) == '"':
+                        inString = not inString
+            if inString:
+                continue
+            text = line.rstrip()
+            if text.endswith(';'):
+                statement = ''.join(buf).strip()
+                buf = list()
+                yield statement[:-1]
+        if buf:
+            yield ''.join(buf).strip().rstrip(';')
+
+    def parse(self):
+        """
+        Read the whole file, calling the callbacks on the way.
+        :return:
+        :rtype: None
+        """
+        for statement in self.iterStatements():
+            command = statement.split(None, 1)[0]
+            handler = self._handlers.get(command)
+            if handler is not None:
+                handler(statement[len(command):])
+
+    def _requires(self, args):
+        flags, positional = splitArgs(tokenize(args), _REQUIRES_FLAGS)
+        if positional:
+            self.on_requires(positional[0], positional[1] if len(positional) > 1 else '')
+
+    def _file(self, args):
+        flags, positional = splitArgs(tokenize(args), _FILE_FLAGS)
+        if ('-r' in flags or '-rdi' in flags) and positional:
+            self.on_file_reference(positional[-1], flags.get('-ns', ''), flags.get('-rfn', ''))
+
+    def _createNode(self, args):
+        flags, positional = splitArgs(tokenize(args), _CREATE_NODE_FLAGS)
+        if not positional:
+            return
+        name = flags.get('-n') or flags.get('-name') or positional[0]
+        parent = flags.get('-p') or flags.get('-parent') or None
+        self.currentNode = name
+        self.on_create_node(positional[0], name, parent)
+
+    def _select(self, args):
+        flags, positional = splitArgs(tokenize(args), ())
+        if '-ne' in flags and positional:
+            self.currentNode = positional[0]
+            self.on_select(positional[0])
+
+    def _setAttr(self, args):
+        tokens = tokenize(args)
+        flags = dict()
+        name = None
+        for text, quoted in tokens:
+            if not quoted and _FLAG_RE.match(text):
+                flags[text] = next(tokens, ('', False))[0] if text in _SET_ATTR_FLAGS else True
+                continue
+            name = text
+            break
+        if name is None or not self.wants_set_attr(name):
+            return
+        moreFlags, positional = splitArgs(tokens, _SET_ATTR_FLAGS)
+        flags.update(moreFlags)
+        attrType = flags.get('-type') or flags.get('-typ') or ''
+        values = [toValue(x, False) for x in positional]
+        if attrType == 'string':
+            values = positional
+        if not values:
+            return
+        self.on_set_attr(name, values[0] if len(values) == 1 else values, attrType)
+
+    def _connectAttr(self, args):
+        flags, positional = splitArgs(tokenize(args), _CONNECT_ATTR_FLAGS)
+        if len(positional) > 1:
+            self.on_connect_attr(positional[0], positional[1])
+
+    def on_requires(self, plugin, version):
+        pass
+
+    def on_file_reference(self, path, namespace, referenceNode):
+        pass
+
+    def on_create_node(self, nodetype, name, parent):
+        pass
+
+    def on_select(self, name):
+        """
+        A "select -ne" statement, the next setAttr statements without node name apply to this node.
+        """
+        pass
+
+    def wants_set_attr(self, name):
+        """
+        Return False to skip the parsing of the values of a setAttr on the current node.
+        """
+        return True
+
+    def on_set_attr(self, name, value, type):
+        pass
+
+    def on_connect_attr(self, source, destination):
+        pass
+
+
+class ReferenceReader(MayaAsciiReader):
+    """
+    Reads the references of a maya ascii file, they are written before the first node so the rest of the file is not
+    read.
+    """
+    def __init__(self, stream):
+        super(ReferenceReader, self).__init__(stream)
+        self.references = list()
+
+    def parse(self):
+        for statement in self.iterStatements():
+            command = statement.split(None, 1)[0]
+            if command == 'createNode':
+                break
+            if command == 'file':
+                self._file(statement[len(command):])
+
+    def on_file_reference(self, path, namespace, referenceNode):
+        if path not in self.references:
+            self.references.append(path)
@@ -0,0 +1,355 @@
+"""
+Headless batch validation. The scene files are shared between a pool of long lived mayapy workers (see batch_worker),
+every worker opens its files one after the other and one json result is written per file. Files that already have a
+result are skipped, so a crashed run can simply be started again.
+
+usage:
+    python -m Validations.core.batch_validate -p bdg -d rig -o D:/temp/results "P:/bdg/assets/*/rig/*.ma"
+
+With "--engine ascii" the .ma files are validated by the offline engine, the workers are plain python processes and
+no maya license is used. "--engine memory" does the same with the configured validations themselves, run on an
+in-memory copy of the scene.
+
+--jsonl, --junit and --csv stream the checks of every scene into one file per format as the scenes are done (see
+result_export).
+"""
+# General Imports.
+import argparse
+import glob
+import hashlib
+import json
+import os
+import Queue
+import subprocess
+import sys
+import threading
+
+WORKER_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'batch_worker.py')
+SCENE_EXTENSIONS = ('.ma', '.mb')
+# seconds a worker gets to validate one scene before it is killed.
+JOB_TIMEOUT = 30 * 60
+
+
+def expandSceneFiles(patterns):
+    """
+    Expand the given paths and glob patterns into the list of maya scenes, without duplicates.
+    :param patterns: file paths or glob patterns.
+    :type patterns: list
+    :return:
+    :rtype: list
+    """
+    sceneFiles = list()
+    for pattern in patterns:
+        matches = glob.glob(pattern) if glob.has_magic(pattern) else [pattern]
+        for each in sorted(matches):
+            each = os.path.abspath(each).replace('\\', '/')
+            if os.path.splitext(each)[-1].lower() in SCENE_EXTENSIONS and each not in sceneFiles:
+                sceneFiles.append(each)
+    return sceneFiles
+
+
+def getResultFile(outputFolder, sceneFile):
+    """
+    Return the result file of a scene, the path hash keeps the scenes with the same name apart.
+    :param outputFolder: the folder holding the results.
+    :type outputFolder: str
+    :param sceneFile: the scene path.
+    :type sceneFile: str
+    :return:
+    :rtype: str
+    """
+    pathHash = hashlib.sha1(sceneFile.lower()).hexdigest()[:10]
+    return os.path.join(outputFolder, '%s.%s.json' % (os.path.basename(sceneFile), pathHash)).replace('\\', '/')
+
+
+def hasResult(outputFolder, sceneFile):
+    """
+    Check if the scene already has a result, the crashed scenes are tried again.
+    :param outputFolder: the folder holding the results.
+    :type outputFolder: str
+    :param sceneFile: the scene path.
+    :type sceneFile: str
+    :return:
+    :rtype: bool
+    """
+    resultFile = getResultFile(outputFolder, sceneFile)
+    if not os.path.isfile(resultFile):
+        return False
+    try:
+        with open(resultFile, 'r') as readId:
+            return json.load(readId).get('status') != 'CRASHED'
+    except ValueError:
+        return False
+
+
+def writeResult(outputFolder, result):
+    """
+    Write the result next to the others, through a temp file so a crash never leaves half a result.
+    :param outputFolder: the folder holding the results.
+    :type outputFolder: str
+    :param result: the result of a scene.
+    :type result: dict
+    :return: the result file.
+    :rtype: str
+    """
+    resultFile = getResultFile(outputFolder, result['file'])
+    tmpFile = '%s.%s.tmp' % (resultFile, os.getpid())
+    with open(tmpFile, 'w') as writeId:
+        json.dump(result, writeId, indent=2, sort_keys=True)
+    if os.path.exists(resultFile):
+        os.remove(resultFile)
+    os.rename(tmpFile, resultFile)
+    return resultFile
+
+
+def exportResult(exporter, result):
+    """
+    Give the checks of a scene result to the exporter, a scene that couldn't be validated is exported as one check.
+    :param exporter: the exporter, like a result_export.ExporterGroup.
+    :type exporter: object
+    :param result: the result of a scene.
+    :type result: dict
+    :return:
+    :rtype: None
+    """
+    checks = result['checks']
+    if not checks and result['status'] not in ('OK', 'WARNING'):
+        checks = [{'class': 'Scene', 'name': 'Scene', 'category': 'Scene', 'status': result['status'],
+                   'message': result.get('error', ''), 'errorNodes': [], 'isFixable': False,
+                   'wallTime': result.get('elapsed', 0.0)}]
+    for check in checks:
+        exporter.write(check, result['file'])
+
+
+class WorkerProcess(object):
+    """
+    One long lived worker process, the jobs are sent one at a time. Its output is read by a thread, so a worker stuck
+    on a scene can be killed after the timeout.
+    """
+    def __init__(self, command, timeout=None):
+        """
+        :param command: the command starting the worker.
+        :type command: list
+        :param timeout: seconds the worker gets for one job, None for no limit.
+        :type timeout: float
+        """
+        super(WorkerProcess, self).__init__()
+        self.command = command
+        self.timeout = timeout
+        self.process = None
+        self.lines = None
+        # jobs validated by the current process.
+        self.jobCount = 0
+        # why the last job failed.
+        self.error = None
+
+    def start(self):
+        self.process = subprocess.Popen(self.command, stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+        self.lines = Queue.Queue()
+        reader = threading.Thread(target=self._read, args=(self.process.stdout, self.lines))
+        reader.daemon = True
+        reader.start()
+        self.jobCount = 0
+
+    @staticmethod
+    def _read(stdout, lines):
+        # an empty line tells the process is gone.
+        for line in iter(stdout.readline, ''):
+            lines.put(line)
+        lines.put('')
+
+    def isAlive(self):
+        return self.process is not None and self.process.poll() is None
+
+    def validate(self, job):
+        """
+        Send a job to the worker and wait for its result, the worker is started again if it died.
+        :param job: the job to run.
+        :type job: dict
+        :return: the result or None if the worker crashed or timed out on the job, see error.
+        :rtype: dict
+        """
+        if not self.isAlive():
+            self.start()
+        self.error = None
+        try:
+            self.process.stdin.write(json.dumps(job) + '\n')
+            self.process.stdin.flush()
+            line = self.lines.get(timeout=self.timeout)
+        except IOError:
+            line = ''
+        except Queue.Empty:
+            self.error = 'The worker took more than %ss on this file.' % self.timeout
+            self.kill()
+            return None
+        if not line:
+            self.error = 'The worker died on this file.'
+            self.stop()
+            return None
+        self.jobCount += 1
+        return json.loads(line)
+
+    def kill(self):
+        if self.isAlive():
+            self.process.kill()
+            self.process.wait()
+        self.process = None
+
+    def stop(self):
+        if self.process is None:
+            return
+        if self.isAlive():
+            try:
+                self.process.stdin.close()
+            except IOError:
+                pass
+            self.process.wait()
+        self.process = None
+
+
+class BatchValidator(object):
+    """
+    Runs the jobs on a pool of worker processes and writes their results.
+    """
+    def __init__(self, outputFolder, workerCommand, workerCount=1, log=None, exporter=None, timeout=JOB_TIMEOUT):
+        """
+        :param exporter: gets the checks of every scene as soon as it is done, like a result_export.ExporterGroup.
+        :type exporter: object
+        :param timeout: seconds a worker gets for one scene, None for no limit.
+        :type timeout: float
+        """
+        super(BatchValidator, self).__init__()
+        self.outputFolder = outputFolder
+        self.workerCommand = workerCommand
+        self.workerCount = max(1, workerCount)
+        self.timeout = timeout
+        self.log = log or (lambda msg: sys.stderr.write(msg + '\n'))
+        self.exporter = exporter
+        self._lock = threading.Lock()
+        self._total = 0
+
+    def _work(self, jobs, results):
+        worker = WorkerProcess(self.workerCommand, self.timeout)
+        try:
+            while True:
+                try:
+                    job = jobs.get_nowait()
+                except Queue.Empty:
+                    break
+                result = worker.validate(job)
+                if result is None:
+                    result = dict(job, status='CRASHED', checks=list(), error=worker.error, elapsed=0.0)
+                writeResult(self.outputFolder, result)
+                with self._lock:
+                    results.append(result)
+                    self.export(result)
+                    self.log('[%s/%s] %s\t%s' % (len(results), self._total, result['status'], result['file']))
+        finally:
+            worker.stop()
+
+    def export(self, result):
+        if self.exporter is not None:
+            exportResult(self.exporter, result)
+
+    def run(self, sceneFiles, project, department, resume=True):
+        """
+        Validate the scenes.
+        :param sceneFiles: the scenes to validate.
+        :type sceneFiles: list
+        :param project: the project name.
+        :type project: str
+        :param department: "rig" or "anim".
+        :type department: str
+        :param resume: skip the scenes that already have a result.
+        :type resume: bool
+        :return: the results of this run.
+        :rtype: list
+        """
+        if not os.path.isdir(self.outputFolder):
+            os.makedirs(self.outputFolder)
+        jobs = Queue.Queue()
+        for sceneFile in sceneFiles:
+            if resume and hasResult(self.outputFolder, sceneFile):
+                continue
+            jobs.put({'file': sceneFile, 'project': project, 'department': department})
+        self._total = jobs.qsize()
+        self.log('%s files to validate, %s skipped.' % (self._total, len(sceneFiles) - self._total))
+
+        results = list()
+        threads = [threading.Thread(target=self._work, args=(jobs, results))
+                   for _ in range(min(self.workerCount, self._total))]
+        for thread in threads:
+            thread.daemon = True
+            thread.start()
+        for thread in threads:
+            while thread.is_alive():
+                thread.join(1)
+        return results
+
+
+def getWorkerCommand(mayapy, engine='maya', cache=True):
+    """
+    Return the command starting a worker.
+    :param mayapy: the mayapy executable.
+    :type mayapy: str
+    :param engine: "maya", "ascii" or "memory", the ascii and memory workers run on the current python.
+    :type engine: str
+    :param cache: use the result cache in the workers.
+    :type cache: bool
+    :return:
+    :rtype: list
+    """
+    if engine in ('ascii', 'memory'):
+        command = [sys.executable, WORKER_SCRIPT, '--engine', engine]
+    else:
+        command = [mayapy, WORKER_SCRIPT, '--engine', 'maya']
+    if not cache:
+        command.append('--no-cache')
+    return command
+
+
+def parseArgs(argv):
+    parser = argparse.ArgumentParser(description='Validate maya scenes without the UI.')
+    parser.add_argument('files', nargs='+', help='maya scenes or glob patterns.')
+    parser.add_argument('-p', '--project', required=True, help='project name, used to pick the config.')
+    parser.add_argument('-d', '--department', choices=('rig', 'anim'), default='rig',
+                        help='the VALIDATIONS list of the config to run.')
+    parser.add_argument('-o', '--output', required=True, help='folder receiving one json result per scene.')
+    parser.add_argument('-w', '--workers', type=int, default=2, help='number of mayapy processes.')
+    parser.add_argument('--mayapy', default=os.environ.get('MAYAPY', 'mayapy'), help='mayapy executable.')
+    parser.add_argument('--engine', choices=('maya', 'ascii', 'memory'), default='maya',
+                        help='"ascii" and "memory" validate the .ma files offline, without maya.')
+    parser.add_argument('--no-resume', dest='resume', action='store_false',
+                        help='validate again the scenes that already have a result.')
+    parser.add_argument('--no-cache', dest='cache', action='store_false',
+                        help='run every validation, without the result cache of the workers.')
+    parser.add_argument('--timeout', type=float, default=JOB_TIMEOUT,
+                        help='seconds a worker gets for one scene before it is killed, 0: no limit.')
+    parser.add_argument('--jsonl', help='json lines file receiving every check.')
+    parser.add_argument('--junit', help='JUnit XML file receiving every check.')
+    parser.add_argument('--csv', help='csv file receiving every check.')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """
+    Command line entry point.
+    :return: 0 if every scene is OK or WARNING, 1 otherwise.
+    :rtype: int
+    """
+    from Validations.core import result_export
+
+    args = parseArgs(sys.argv[1:] if argv is None else argv)
+    sceneFiles = expandSceneFiles(args.files)
+    exporter = result_export.ExporterGroup([result_export.FORMATS[x](getattr(args, x))
+                                            for x in ('jsonl', 'junit', 'csv') if getattr(args, x)])
+    batch = BatchValidator(args.output, getWorkerCommand(args.mayapy, args.engine, args.cache), args.workers,
+                           exporter=exporter, timeout=args.timeout or None)
+    with exporter:
+        results = batch.run(sceneFiles, args.project, args.department, resume=args.resume)
+    failed = [x for x in results if x['status'] not in ('OK', 'WARNING')]
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
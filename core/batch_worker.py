@@ -0,0 +1,345 @@
+"""
+This is the worker side of the batch validation. It is started once by the batch_validate module under mayapy, then it
+reads one json job per line on stdin, opens the scene, runs the validations configured for the project and writes one
+json result per line on stdout.
+
+The protocol is:
+    job     : {"file": <scene path>, "project": <project>, "department": "rig" or "anim"}
+    result  : {"file": ..., "project": ..., "department": ..., "status": ..., "checks": [...], "error": ...,
+               "elapsed": ...}
+
+With "--engine ascii" the worker runs without maya, the .ma files are validated by the offline engine of
+core/ascii/asciiValidations and the configured validations it can't answer are listed in "skipped". With
+"--engine memory" the .ma files are read into an in-memory scene and the configured validations themselves run on it
+through the maya stand-in, without maya either.
+
+The maya and memory engines keep the results in the result cache (core/result_cache), a scene that didn't change since
+its last validation is not opened again and its checks come back with "cached" set. "--no-cache" turns it off.
+"""
+# General Imports.
+import argparse
+import json
+import os
+import sys
+import time
+import traceback
+
+_PACKAGE_PARENT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if _PACKAGE_PARENT not in sys.path:
+    sys.path.insert(0, _PACKAGE_PARENT)
+
+# the order matters, the worst status of the checks is the status of the scene.
+STATUS_ORDER = ('OK', 'WARNING', 'ERROR', 'FAILED', 'CRASHED')
+
+# classes listed in the configs that are not real validations.
+SKIPPED_CLASSES = ('MayaValidations', 'TestingTheUI')
+
+# the result cache of the worker, opened on the first job.
+_RESULT_CACHE = {'enabled': True, 'cache': None}
+
+
+def worstStatus(statuses):
+    """
+    Return the worst of the given statuses.
+    :param statuses: the statuses of the checks.
+    :type statuses: iterable
+    :return:
+    :rtype: str
+    """
+    worst = 'OK'
+    for status in statuses:
+        if status in STATUS_ORDER and STATUS_ORDER.index(status) > STATUS_ORDER.index(worst):
+            worst = status
+    return worst
+
+
+def getValidationModule(department):
+    """
+    Return the module holding the validations of the department.
+    :param department: "rig" or "anim".
+    :type department: str
+    :return:
+    :rtype: module
+    """
+    if department == 'rig':
+        from Validations.core.rig import RigValidations
+        return RigValidations
+    if department == 'anim':
+        from Validations.core.anim import animValidations
+        return animValidations
+    raise ValueError('Unknown department "%s"' % department)
+
+
+def getValidationClasses(project, department):
+    """
+    Return the validation classes configured for the project and department, in the config order.
+    :param project: the project name.
+    :type project: str
+    :param department: "rig" or "anim".
+    :type department: str
+    :return:
+    :rtype: list
+    """
+    from Validations.core import project_config
+
+    module = getValidationModule(department)
+    classes = list()
+    for className in project_config.getConfig(project).get('VALIDATIONS', department):
+        if className in SKIPPED_CLASSES or not hasattr(module, className):
+            continue
+        validationClass = getattr(module, className)
+        if validationClass not in classes:
+            classes.append(validationClass)
+    return classes
+
+
+def getResultCache():
+    """
+    Return the result cache of the worker, None when it is turned off.
+    :return:
+    :rtype: result_cache.ResultCache
+    """
+    from Validations.core import result_cache
+
+    if _RESULT_CACHE['enabled'] and _RESULT_CACHE['cache'] is None:
+        _RESULT_CACHE['cache'] = result_cache.ResultCache.fromEnvironment()
+        _RESULT_CACHE['enabled'] = _RESULT_CACHE['cache'] is not None
+    return _RESULT_CACHE['cache']
+
+
+def getCachedChecks(job, backend):
+    """
+    Look for the cached results of the configured validations on the scene of the job.
+    :param job: the job with the file, project and department keys.
+    :type job: dict
+    :param backend: the name of the scene backend the validations run on.
+    :type backend: str
+    :return: the scene key, None without cache, and the cached results by class name.
+    :rtype: tuple
+    """
+    cache = getResultCache()
+    if cache is None:
+        return None, dict()
+    sceneKey = cache.getSceneKey(job['file'], job['project'], backend)
+    return sceneKey, cache.getMany(sceneKey, getValidationClasses(job['project'], job['department']))
+
+
+def isFullyCached(job, cached):
+    classes = getValidationClasses(job['project'], job['department'])
+    return bool(classes) and all(x.__name__ in cached for x in classes)
+
+
+def runValidations(project, department, sceneKey=None, cached=None):
+    """
+    Run the configured validations on the opened scene, all of them sharing one ValidationRun.
+    :param project: the project name.
+    :type project: str
+    :param department: "rig" or "anim".
+    :type department: str
+    :param sceneKey: the result cache key of the scene, the new results are stored under it.
+    :type sceneKey: result_cache.SceneKey
+    :param cached: the cached results by class name, these validations don't run.
+    :type cached: dict
+    :return: the result of every check.
+    :rtype: list
+    """
+    from Validations.core import instrumentation
+    from Validations.core import result_cache
+    from Validations.core import validations
+    from Validations.core.result_export import checkResult
+
+    cached = cached or dict()
+    cache = getResultCache() if sceneKey is not None else None
+    results = list()
+    measures = instrumentation.Instrumentation()
+    with validations.ValidationRun(instrumentation=measures) as validationRun:
+        for validationClass in getValidationClasses(project, department):
+            if validationClass.__name__ in cached:
+                results.append(cachedResult(validationClass, cached[validationClass.__name__]))
+                continue
+            validation = validationClass(project)
+            try:
+                validation.run(validationRun)
+                results.append(checkResult(validation, measures.getRecord(validation)))
+                if cache is not None:
+                    cache.put(sceneKey, validationClass, result_cache.resultOf(validation))
+            except Exception:
+                result = checkResult(validation, measures.getRecord(validation))
+                result['status'] = 'FAILED'
+                result['message'] = traceback.format_exc()
+                results.append(result)
+    return results
+
+
+def cachedResult(validationClass, result):
+    """
+    Turn a result of the result cache into the result of a check.
+    :param validationClass: the validation class.
+    :type validationClass: type
+    :param result: the cached result.
+    :type result: dict
+    :return:
+    :rtype: dict
+    """
+    return {'class': validationClass.__name__,
+            'name': validationClass._name,
+            'category': validationClass._category,
+            'status': result['status'],
+            'message': result['message'],
+            'errorNodes': result['errorNodes'],
+            'isFixable': result.get('isFixable', False),
+            'cached': True}
+
+
+def validateScene(job):
+    """
+    Open the scene of the job in maya and validate it, the scene is emptied afterwards for the next job.
+    :param job: the job with the file, project and department keys.
+    :type job: dict
+    :return: the result of the job.
+    :rtype: dict
+    """
+    import maya.cmds as cmds
+
+    result = dict(job, status='FAILED', checks=list(), error='')
+    start = time.time()
+    try:
+        sceneKey, cached = getCachedChecks(job, 'maya')
+        if isFullyCached(job, cached):
+            result['checks'] = runValidations(job['project'], job['department'], cached=cached)
+        else:
+            cmds.file(job['file'], open=True, force=True, prompt=False)
+            cache = getResultCache()
+            if cache is not None:
+                # the references given by maya, the only ones known for a .mb file.
+                from Validations.core import result_cache
+                sceneKey = cache.getSceneKey(job['file'], job['project'], 'maya', result_cache.getMayaReferences())
+            result['checks'] = runValidations(job['project'], job['department'], sceneKey, cached)
+        result['status'] = worstStatus(x['status'] for x in result['checks'])
+    except Exception:
+        result['error'] = traceback.format_exc()
+    finally:
+        try:
+            cmds.file(new=True, force=True)
+        except Exception:
+            pass
+    result['elapsed'] = time.time() - start
+    return result
+
+
+def validateAsciiScene(job):
+    """
+    Validate the scene of the job with the offline engine, no maya needed.
+    :param job: the job with the file, project and department keys.
+    :type job: dict
+    :return: the result of the job.
+    :rtype: dict
+    """
+    from Validations.core.ascii import asciiValidations
+    from Validations.core.result_export import checkResult
+
+    result = dict(job, status='FAILED', checks=list(), skipped=list(), error='')
+    start = time.time()
+    try:
+        finished, result['skipped'] = asciiValidations.validateFile(job['file'], job['project'], job['department'])
+        result['checks'] = [checkResult(x) for x in finished]
+        result['status'] = worstStatus(x['status'] for x in result['checks'])
+    except Exception:
+        result['error'] = traceback.format_exc()
+    result['elapsed'] = time.time() - start
+    return result
+
+
+def validateMemoryScene(job):
+    """
+    Validate the scene of the job on the in-memory backend, no maya needed.
+    :param job: the job with the file, project and department keys.
+    :type job: dict
+    :return: the result of the job.
+    :rtype: dict
+    """
+    from Validations.core import maya_standin
+    from Validations.core import validations
+
+    result = dict(job, status='FAILED', checks=list(), error='')
+    start = time.time()
+    try:
+        # the cache lookup loads the check modules, they have to get the stand-in modules.
+        maya_standin.install()
+        sceneKey, cached = getCachedChecks(job, maya_standin.MemoryBackend.name)
+        if isFullyCached(job, cached):
+            result['checks'] = runValidations(job['project'], job['department'], cached=cached)
+        else:
+            previous = validations.setBackend(maya_standin.MemoryBackend.fromAsciiFile(job['file']))
+            try:
+                result['checks'] = runValidations(job['project'], job['department'], sceneKey, cached)
+            finally:
+                validations.setBackend(previous)
+        result['status'] = worstStatus(x['status'] for x in result['checks'])
+    except Exception:
+        result['error'] = traceback.format_exc()
+    result['elapsed'] = time.time() - start
+    return result
+
+
+ENGINES = {'maya': validateScene, 'ascii': validateAsciiScene, 'memory': validateMemoryScene}
+
+
+def initializeMaya():
+    """
+    Start maya standalone.
+    :return:
+    :rtype: None
+    """
+    import maya.standalone
+    maya.standalone.initialize(name='python')
+
+
+def serve(validate, jobStream, resultStream):
+    """
+    Read the jobs one by one and write their results until the job stream is closed.
+    :param validate: callable turning a job into its result.
+    :type validate: callable
+    :param jobStream: the stream the jobs are read from.
+    :type jobStream: file
+    :param resultStream: the stream the results are written to.
+    :type resultStream: file
+    :return:
+    :rtype: None
+    """
+    while True:
+        line = jobStream.readline()
+        if not line:
+            break
+        line = line.strip()
+        if not line:
+            continue
+        resultStream.write(json.dumps(validate(json.loads(line))) + '\n')
+        resultStream.flush()
+
+
+def main(argv=None):
+    """
+    Entry point of the worker process.
+    :return:
+    :rtype: int
+    """
+    parser = argparse.ArgumentParser(description='Validation worker, jobs on stdin and results on stdout.')
+    parser.add_argument('--engine', choices=sorted(ENGINES.keys()), default='maya')
+    parser.add_argument('--no-cache', dest='cache', action='store_false', help='don\'t use the result cache.')
+    args = parser.parse_args(sys.argv[1:] if argv is None else argv)
+    _RESULT_CACHE['enabled'] = args.cache
+
+    # the checks and maya print on stdout, keep the real stdout for the results only.
+    resultStream = os.fdopen(os.dup(sys.stdout.fileno()), 'w')
+    os.dup2(sys.stderr.fileno(), sys.stdout.fileno())
+    sys.stdout = sys.stderr
+
+    if args.engine == 'maya':
+        initializeMaya()
+    serve(ENGINES[args.engine], sys.stdin, resultStream)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
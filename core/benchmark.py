@@ -0,0 +1,468 @@
+"""
+Scaling benchmark of the checks. A generator builds parametrized scenes (N meshes of V vertices, C *CTRL transforms,
+K constraints, F file nodes, S shots) at several sizes, every check of mayaSanityCheck, RigValidations and
+animValidations is run on each of them, and the time and memory of every check are recorded against the size. The
+checks whose time grows faster than the scene are flagged, from the slope of log(time) over log(size).
+
+The scenes are built with maya.cmds only, so the same generator runs in mayapy (--maya) and on the in-memory stand-in
+of core/maya_standin on a plain python. The checks using calls the stand-in doesn't have are reported UNSUPPORTED.
+
+    python benchmark.py --sizes 1 2 4 8 --json bench.json
+"""
+# General Imports.
+import argparse
+import collections
+import contextlib
+import gc
+import json
+import math
+import os
+import shutil
+import sys
+import tempfile
+import traceback
+
+_PACKAGE_PARENT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if _PACKAGE_PARENT not in sys.path:
+    sys.path.insert(0, _PACKAGE_PARENT)
+
+# the scene of size 1, the counts are multiplied by the size and the vertices per mesh stay the same.
+SceneSpec = collections.namedtuple('SceneSpec', ['meshes', 'vertices', 'ctrls', 'constraints', 'files', 'shots'])
+BASE_SPEC = SceneSpec(meshes=10, vertices=400, ctrls=50, constraints=20, files=20, shots=10)
+
+DEFAULT_SIZES = (1, 2, 4, 8)
+
+# the check modules in their run order, with the base class of their checks. In the development mode of dev_mode
+# RigValidations and animValidations reload the validations module when they are imported, so each module is imported
+# just before its checks run.
+CHECK_MODULES = (('Validations.core.rig.mayaSanityCheck', 'CheckMayaAbstract'),
+                 ('Validations.core.rig.RigValidations', 'MayaValidations'),
+                 ('Validations.core.anim.animValidations', 'MayaValidations'))
+
+# the modules checking shot scenes, their scene has the settings info node of the project instead of the shots of a
+# sequence.
+SHOT_SCENE_MODULES = ('Validations.core.anim.animValidations',)
+
+# a check is flagged when its time grows faster than size ** SUPERLINEAR_SLOPE.
+SUPERLINEAR_SLOPE = 1.3
+# the runs faster than this are timer noise, they are left out of the slope.
+MIN_MEASURED_TIME = 0.0005
+
+
+def scaleSpec(spec, size):
+    """
+    Return the spec with its counts multiplied by the size.
+    :param spec: the scene of size 1.
+    :type spec: SceneSpec
+    :param size: the scale factor.
+    :type size: int
+    :return:
+    :rtype: SceneSpec
+    """
+    return spec._replace(meshes=spec.meshes * size, ctrls=spec.ctrls * size, constraints=spec.constraints * size,
+                         files=spec.files * size, shots=spec.shots * size)
+
+
+def buildScene(spec, cmds, scenePath=None, settingsNodeType=None):
+    """
+    Build the scene of the spec in a new file. One CTRL in ten has a non zero translate, one constraint in two drives
+    nothing, one texture in five is off the server and the shots follow each other without overlapping, the first one
+    with the audio. A shot scene has a single settings info node on the playback range with the audio instead.
+    :param spec: what to build.
+    :type spec: SceneSpec
+    :param cmds: maya.cmds, or the maya.cmds of the stand-in.
+    :type cmds: module
+    :param scenePath: the ascii file the scene is saved to, the scene is left untitled if None.
+    :type scenePath: str
+    :param settingsNodeType: the settings info node type of the project, builds a shot scene if given.
+    :type settingsNodeType: str
+    :return: the number of nodes built.
+    :rtype: int
+    """
+    cmds.file(new=True, force=True)
+    topGroup = cmds.createNode('transform', name='rig_group')
+    geometries = cmds.createNode('transform', name='Geometries', parent=topGroup)
+    rig = cmds.createNode('transform', name='Rig', parent=topGroup)
+
+    subdivisions = max(1, int(round(math.sqrt(spec.vertices))) - 1)
+    meshes = list()
+    for index in range(spec.meshes):
+        transform = cmds.polyPlane(name='body_C_%03d_GEO' % index, sx=subdivisions, sy=subdivisions, ch=False)[0]
+        transform = cmds.parent(transform, geometries)[0]
+        shape = cmds.listRelatives(transform, shapes=True, fullPath=True)[0]
+        cmds.addAttr(shape, longName='grid_renderGeo', attributeType='bool')
+        meshes.append(transform)
+    cmds.sets(meshes, name='RenderSet')
+
+    ctrls = [cmds.createNode('transform', name='Main_CTRL', parent=rig)]
+    for index in range(spec.ctrls):
+        ctrl = cmds.createNode('transform', name='arm_L_%03d_CTRL' % index, parent=rig)
+        if not index % 10:
+            cmds.setAttr('%s.translateX' % ctrl, 1.0)
+        ctrls.append(ctrl)
+
+    for index in range(spec.constraints):
+        target = ctrls[index % len(ctrls)]
+        constraint = cmds.createNode('parentConstraint', name='arm_L_%03d_parentConstraint' % index, parent=target)
+        if index % 2:
+            cmds.connectAttr('%s.constraintRotateX' % constraint, '%s.rotateX' % target, force=True)
+
+    for index in range(spec.files):
+        fileNode = cmds.createNode('file', name='tex_%04d_file' % index)
+        path = '$PROD_SERVER/textures/tex_%04d.tif' % index if index % 5 else '/tmp/textures/tex_%04d.tif' % index
+        cmds.setAttr('%s.fileTextureName' % fileNode, path, type='string')
+
+    audio = cmds.createNode('audio', name='shot_audio')
+    lastFrame = max(1, spec.shots * 100)
+    if settingsNodeType:
+        settingsNode = cmds.createNode(settingsNodeType, name='settings_info')
+        if settingsNodeType != 'shot':
+            cmds.addAttr(settingsNode, longName='startFrame', attributeType='double')
+            cmds.addAttr(settingsNode, longName='endFrame', attributeType='double')
+            cmds.addAttr(settingsNode, longName='audio', attributeType='message')
+        cmds.setAttr('%s.startFrame' % settingsNode, 1)
+        cmds.setAttr('%s.endFrame' % settingsNode, lastFrame)
+        cmds.connectAttr('%s.message' % audio, '%s.audio' % settingsNode, force=True)
+    for index in range(0 if settingsNodeType else spec.shots):
+        shot = cmds.createNode('shot', name='SH%04d' % ((index + 1) * 10))
+        if not index:
+            cmds.connectAttr('%s.message' % audio, '%s.audio' % shot, force=True)
+        start = index * 100 + 1
+        for attr, value in (('startFrame', start), ('endFrame', start + 99), ('sequenceStartFrame', start),
+                            ('sequenceEndFrame', start + 99)):
+            cmds.setAttr('%s.%s' % (shot, attr), value)
+    cmds.playbackOptions(min=1, max=lastFrame)
+    if scenePath:
+        cmds.file(rename=scenePath)
+        cmds.file(save=True, type='mayaAscii')
+    return len(cmds.ls())
+
+
+class MemoryProbe(object):
+    """
+    Memory used by a block of code. With tracemalloc it is the peak of the python allocations, else it is the growth
+    of the peak resident size of the process, which only shows when the block goes above the previous peak.
+    """
+    def __init__(self):
+        super(MemoryProbe, self).__init__()
+        self.method = None
+        self.used = None
+        try:
+            import tracemalloc
+            self._tracemalloc = tracemalloc
+            self.method = 'tracemalloc'
+        except ImportError:
+            self._tracemalloc = None
+            try:
+                import resource
+                self._resource = resource
+                self.method = 'maxrss'
+            except ImportError:
+                self._resource = None
+
+    def _maxRss(self):
+        # kilobytes on linux, bytes on mac.
+        value = self._resource.getrusage(self._resource.RUSAGE_SELF).ru_maxrss
+        return value if sys.platform == 'darwin' else value * 1024
+
+    @contextlib.contextmanager
+    def measure(self):
+        """
+        Measure the block, the bytes used are in self.used afterwards, None when it can't be measured.
+        """
+        gc.collect()
+        if self.method == 'tracemalloc':
+            self._tracemalloc.start()
+            try:
+                yield self
+            finally:
+                self.used = self._tracemalloc.get_traced_memory()[1]
+                self._tracemalloc.stop()
+        elif self.method == 'maxrss':
+            before = self._maxRss()
+            try:
+                yield self
+            finally:
+                self.used = self._maxRss() - before
+        else:
+            yield self
+
+
+class _NullStream(object):
+    def write(self, text):
+        pass
+
+    def flush(self):
+        pass
+
+
+@contextlib.contextmanager
+def quiet():
+    """
+    Swallow what the checks print.
+    """
+    stdout = sys.stdout
+    sys.stdout = _NullStream()
+    try:
+        yield
+    finally:
+        sys.stdout = stdout
+
+
+def getCheckClasses(module, baseName):
+    """
+    Return the checks defined in the module, the subclasses of its base class, in the source order.
+    :param module: the check module.
+    :type module: module
+    :param baseName: the name of the base class of the checks.
+    :type baseName: str
+    :return:
+    :rtype: list
+    """
+    import inspect
+
+    base = getattr(module, baseName)
+    classes = [x for x in vars(module).values() if inspect.isclass(x) and issubclass(x, base) and x is not base and
+               x.__module__ == module.__name__]
+    return sorted(classes, key=lambda x: inspect.getsourcelines(x)[1])
+
+
+def runCheck(checkClass, project, repeat=1):
+    """
+    Run the check on the current scene in a fresh ValidationRun, the best of the repeats is kept.
+    :param checkClass: a Validations or CheckAbstract class.
+    :type checkClass: type
+    :param project: the project of the Validations checks.
+    :type project: str
+    :param repeat: the number of runs.
+    :type repeat: int
+    :return: status, wallTime, memory, nodesInspected, message
+    :rtype: dict
+    """
+    from Validations.core import instrumentation
+    from Validations.core import maya_standin
+    from Validations.core import validations
+    from Validations.core.rig import checkClasses
+
+    best = None
+    for _ in range(max(1, repeat)):
+        validation = checkClass(None) if issubclass(checkClass, checkClasses.CheckAbstract) else checkClass(project)
+        measures = instrumentation.Instrumentation()
+        probe = MemoryProbe()
+        message = ''
+        with quiet():
+            with probe.measure():
+                with validations.ValidationRun(instrumentation=measures) as validationRun:
+                    try:
+                        validation.run(validationRun)
+                        status = str(validation.status)
+                    except maya_standin.StandInUnsupported as error:
+                        status = 'UNSUPPORTED'
+                        message = str(error)
+                    except Exception:
+                        status = 'FAILED'
+                        message = traceback.format_exc().strip().splitlines()[-1]
+        record = measures.getRecord(validation)
+        result = {'status': status,
+                  'wallTime': record.wallTime if record is not None else 0.0,
+                  'memory': probe.used,
+                  'nodesInspected': record.nodesInspected if record is not None else 0,
+                  'message': message}
+        if best is None or result['wallTime'] < best['wallTime']:
+            best = result
+    return best
+
+
+def scalingSlope(sizes, times):
+    """
+    Return the least squares slope of log(time) over log(size), 1.0 is linear, 2.0 quadratic. None when there are less
+    than two measurable points.
+    :param sizes: the scene sizes.
+    :type sizes: list
+    :param times: the time at every size.
+    :type times: list
+    :return:
+    :rtype: float
+    """
+    points = [(math.log(size), math.log(wallTime)) for size, wallTime in zip(sizes, times)
+              if size > 0 and wallTime >= MIN_MEASURED_TIME]
+    if len(points) < 2:
+        return None
+    meanX = sum(x for x, y in points) / len(points)
+    meanY = sum(y for x, y in points) / len(points)
+    variance = sum((x - meanX) ** 2 for x, y in points)
+    if not variance:
+        return None
+    return sum((x - meanX) * (y - meanY) for x, y in points) / variance
+
+
+class Benchmark(object):
+    """
+    Build the scenes and run the checks on them.
+    """
+    def __init__(self, sizes=DEFAULT_SIZES, spec=BASE_SPEC, project='bdg', repeat=1, modules=CHECK_MODULES,
+                 useMaya=False, checkFilter=None):
+        """
+        :param sizes: the scale factors of the scenes.
+        :type sizes: list
+        :param spec: the scene of size 1.
+        :type spec: SceneSpec
+        :param project: the project of the RigValidations and animValidations checks.
+        :type project: str
+        :param repeat: runs of every check, the fastest is kept.
+        :type repeat: int
+        :param modules: (module name, base class name) of the check modules.
+        :type modules: list
+        :param useMaya: run in mayapy instead of on the stand-in.
+        :type useMaya: bool
+        :param checkFilter: the check class names to run, all of them if None.
+        :type checkFilter: list
+        """
+        super(Benchmark, self).__init__()
+        self.sizes = sorted(sizes)
+        self.spec = spec
+        self.project = project
+        self.repeat = repeat
+        self.modules = modules
+        self.useMaya = useMaya
+        self.checkFilter = set(checkFilter) if checkFilter else None
+        self.sceneSizes = dict()
+        self.results = collections.OrderedDict()
+
+    def _getCmds(self):
+        if self.useMaya:
+            import maya.standalone
+            maya.standalone.initialize(name='python')
+        else:
+            from Validations.core import maya_standin
+            from Validations.core import validations
+            validations.setBackend(maya_standin.MemoryBackend())
+        import maya.cmds as cmds
+        return cmds
+
+    def run(self, log=None):
+        """
+        Run every check at every size, the scene is built again for every module and size.
+        :param log: callable taking a progress line.
+        :type log: callable
+        :return: the results, see report.
+        :rtype: dict
+        """
+        from Validations.core import project_config
+
+        log = log or (lambda x: None)
+        cmds = self._getCmds()
+        sceneFolder = tempfile.mkdtemp(prefix='validations_benchmark_')
+        try:
+            self._runModules(cmds, os.path.join(sceneFolder, 'benchmark.ma').replace('\\', '/'),
+                             project_config.getConfig(self.project).get('SETTINGS', 'settingsinfonode'), log)
+        finally:
+            shutil.rmtree(sceneFolder, ignore_errors=True)
+        for entry in self.results.values():
+            measured = [x for x in entry['runs'] if x['status'] not in ('UNSUPPORTED', 'FAILED')]
+            entry['slope'] = scalingSlope([x['size'] for x in measured], [x['wallTime'] for x in measured])
+            entry['superLinear'] = entry['slope'] is not None and entry['slope'] > SUPERLINEAR_SLOPE
+        return self.report()
+
+    def _runModules(self, cmds, scenePath, settingsNodeType, log):
+        """
+        Run the checks of every module on the scenes saved to the scene path, the shot scenes with the settings info
+        node type.
+        """
+        import importlib
+
+        for moduleName, baseName in self.modules:
+            module = importlib.import_module(moduleName)
+            checks = [x for x in getCheckClasses(module, baseName)
+                      if self.checkFilter is None or x.__name__ in self.checkFilter]
+            if not checks:
+                continue
+            shotScene = moduleName in SHOT_SCENE_MODULES
+            for size in self.sizes:
+                spec = scaleSpec(self.spec, size)
+                with quiet():
+                    self.sceneSizes[size] = buildScene(spec, cmds, scenePath,
+                                                       settingsNodeType if shotScene else None)
+                log('%s, size %s (%s nodes)' % (moduleName.rsplit('.', 1)[-1], size, self.sceneSizes[size]))
+                for checkClass in checks:
+                    key = '%s.%s' % (moduleName.rsplit('.', 1)[-1], checkClass.__name__)
+                    entry = self.results.setdefault(key, {'check': key, 'name': checkClass._name, 'runs': list()})
+                    result = runCheck(checkClass, self.project, self.repeat)
+                    result['size'] = size
+                    result['nodes'] = self.sceneSizes[size]
+                    entry['runs'].append(result)
+
+    def report(self):
+        """
+        The results as a json-able dict, the super linear checks first then the slowest ones.
+        :return:
+        :rtype: dict
+        """
+        entries = sorted(self.results.values(),
+                         key=lambda x: (not x.get('superLinear'), -max([y['wallTime'] for y in x['runs']] or [0])))
+        return {'engine': 'maya' if self.useMaya else 'standin',
+                'sizes': self.sizes,
+                'spec': self.spec._asdict(),
+                'sceneNodes': dict((str(x), y) for x, y in self.sceneSizes.items()),
+                'memoryMethod': MemoryProbe().method,
+                'superLinearSlope': SUPERLINEAR_SLOPE,
+                'checks': entries}
+
+
+def formatReport(report):
+    """
+    Return the report as a text table, one line per check with its time at every size.
+    :param report: the report of Benchmark.run.
+    :type report: dict
+    :return:
+    :rtype: str
+    """
+    sizes = report['sizes']
+    lines = ['%-50s %s %7s' % ('check', ' '.join('%10s' % ('x%s' % x) for x in sizes), 'slope')]
+    for entry in report['checks']:
+        runs = dict((x['size'], x) for x in entry['runs'])
+        cells = list()
+        for size in sizes:
+            run = runs.get(size)
+            if run is None:
+                cells.append('%10s' % '-')
+            elif run['status'] in ('UNSUPPORTED', 'FAILED'):
+                cells.append('%10s' % run['status'][:10])
+            else:
+                cells.append('%9.4fs' % run['wallTime'])
+        slope = '%7.2f' % entry['slope'] if entry['slope'] is not None else '%7s' % '-'
+        lines.append('%-50s %s %s%s' % (entry['check'][:50], ' '.join(cells), slope,
+                                        '  SUPER LINEAR' if entry['superLinear'] else ''))
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    """
+    Entry point of the benchmark.
+    :return: 1 if a check scales super linearly.
+    :rtype: int
+    """
+    parser = argparse.ArgumentParser(description='Benchmark of the checks on synthetic scenes of growing size.')
+    parser.add_argument('--sizes', type=int, nargs='+', default=list(DEFAULT_SIZES))
+    for field in SceneSpec._fields:
+        parser.add_argument('--%s' % field, type=int, default=getattr(BASE_SPEC, field))
+    parser.add_argument('--project', default='bdg')
+    parser.add_argument('--repeat', type=int, default=1)
+    parser.add_argument('--check', action='append', help='only run this check class, can be repeated.')
+    parser.add_argument('--maya', action='store_true', help='run in mayapy instead of on the stand-in.')
+    parser.add_argument('--json', help='write the report to this file.')
+    args = parser.parse_args(sys.argv[1:] if argv is None else argv)
+
+    spec = SceneSpec(*[getattr(args, x) for x in SceneSpec._fields])
+    benchmark = Benchmark(args.sizes, spec, args.project, args.repeat, useMaya=args.maya, checkFilter=args.check)
+    stderr = sys.stderr
+    report = benchmark.run(lambda x: stderr.write(x + '\n'))
+    print formatReport(report)
+    if args.json:
+        with open(args.json, 'w') as writeId:
+            json.dump(report, writeId, indent=2, sort_keys=True)
+    return 1 if any(x['superLinear'] for x in report['checks']) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
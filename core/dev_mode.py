@@ -0,0 +1,27 @@
+"""
+Development mode of the validations, set VALIDATIONS_DEV_MODE=1 to have the modules reload their dependencies when
+they are imported, so the code edited in the maya session is picked up. Outside of it nothing is reloaded: a reload
+rebuilds the classes under the validations already made, whose super() calls then fail, and costs the full import
+again on every start of the window.
+"""
+# General Imports.
+import os
+
+DEV_MODE_ENV = 'VALIDATIONS_DEV_MODE'
+
+
+def isDevMode():
+    return os.environ.get(DEV_MODE_ENV, '') not in ('', '0')
+
+
+def devReload(module):
+    """
+    Reload the module in development mode only.
+    :param module: the module to reload.
+    :type module: module
+    :return: the module, reloaded or not.
+    :rtype: module
+    """
+    if isDevMode():
+        return reload(module)
+    return module
@@ -0,0 +1,354 @@
+"""
+Compact storage of the error nodes of the validations. The validations live as long as the validator window, with
+their error nodes kept as PyNodes and one formatted message per node every node of the last run stayed alive.
+
+The ErrorNodes store keeps the nodes as NodeHandles, just their name, turned back into PyNodes when they are used, so a
+deleted node is dropped instead of pinned. The components are kept as index ranges per mesh and component type
+(ComponentRanges) and only written as maya component names ("pCubeShape1.f[0:4999]") when they are shown. The messages
+about the error nodes (NodeMessages) are formatted when the log is read.
+
+The error nodes window shows a store through ErrorRows, the rows are made on demand as the list is scrolled.
+"""
+# General Imports.
+import re
+from array import array
+
+from Validations.core import mesh_analysis
+
+# a maya component name, like pCubeShape1.f[12] or pCubeShape1.vtx[0:4999].
+_COMPONENT_RE = re.compile(r'^(?P<node>[^\[\]]+)\.(?P<component>\w+)\[(?P<start>\d+)(?::(?P<end>\d+))?\]$')
+
+
+class NodeHandle(object):
+    """
+    A maya node referenced by its name, it doesn't keep the node alive.
+    """
+    __slots__ = ('name',)
+
+    def __init__(self, name):
+        self.name = name
+
+    def resolve(self):
+        """
+        Return the PyNode of the node, None if it doesn't exist anymore.
+        :return:
+        :rtype: pm.PyNode
+        """
+        import pymel.core as pm
+
+        if not pm.objExists(self.name):
+            return None
+        return pm.PyNode(self.name)
+
+    def __str__(self):
+        return self.name
+
+    def __repr__(self):
+        return 'NodeHandle(%r)' % self.name
+
+
+class ComponentRanges(object):
+    """
+    The components of one type of one mesh, as (start, end) index ranges, end included.
+    """
+    __slots__ = ('node', 'component', '_bounds')
+
+    def __init__(self, node, component, indices=()):
+        self.node = node
+        self.component = component
+        # start and end of every range, one after the other.
+        self._bounds = array('l')
+        self.addIndices(indices)
+
+    def addRange(self, start, end):
+        bounds = self._bounds
+        if bounds and bounds[-2] <= start <= bounds[-1] + 1:
+            bounds[-1] = max(bounds[-1], end)
+        else:
+            bounds.extend((start, end))
+
+    def addIndices(self, indices):
+        for start, end in mesh_analysis.indexRanges(indices):
+            self.addRange(start, end)
+
+    def ranges(self):
+        bounds = self._bounds
+        return [(bounds[x], bounds[x + 1]) for x in xrange(0, len(bounds), 2)]
+
+    def componentCount(self):
+        """
+        Number of components in the ranges.
+        :return:
+        :rtype: int
+        """
+        return sum(end - start + 1 for start, end in self.ranges())
+
+    def names(self):
+        """
+        Yield the maya component name of every range.
+        :return:
+        :rtype: generator
+        """
+        for start, end in self.ranges():
+            if start == end:
+                yield '%s.%s[%s]' % (self.node, self.component, start)
+            else:
+                yield '%s.%s[%s:%s]' % (self.node, self.component, start, end)
+
+    def __len__(self):
+        return len(self._bounds) // 2
+
+
+class ErrorNodes(object):
+    """
+    The error nodes of a validation, in the order they were added. The nodes are kept as NodeHandles, the component
+    names are folded into the ComponentRanges of their mesh and the other strings are kept as they are. Iterating
+    gives the PyNodes of the nodes still in the scene, names() gives everything as strings without touching maya.
+    """
+    def __init__(self, values=()):
+        super(ErrorNodes, self).__init__()
+        self._entries = list()
+        self._components = dict()
+        self.extend(values)
+
+    def _getComponents(self, node, component):
+        key = (node, component)
+        if key not in self._components:
+            self._components[key] = ComponentRanges(node, component)
+            self._entries.append(self._components[key])
+        return self._components[key]
+
+    def append(self, value):
+        """
+        Add an error node, a component name, a ComponentRanges or any other string.
+        :param value: PyNode, ComponentRanges or str.
+        :type value: object
+        :return:
+        :rtype: None
+        """
+        if isinstance(value, ComponentRanges):
+            if not len(value):
+                return
+            components = self._getComponents(value.node, value.component)
+            for start, end in value.ranges():
+                components.addRange(start, end)
+        elif isinstance(value, (list, tuple)):
+            self.extend(value)
+        elif isinstance(value, basestring):
+            match = _COMPONENT_RE.match(value)
+            if match is None:
+                self._entries.append(value)
+                return
+            start = int(match.group('start'))
+            end = int(match.group('end') or start)
+            self._getComponents(match.group('node'), match.group('component')).addRange(start, end)
+        else:
+            self._entries.append(NodeHandle(str(value)))
+
+    def extend(self, values):
+        for value in values:
+            self.append(value)
+
+    def addComponents(self, node, component, indices):
+        """
+        Add components of a mesh by index.
+        :param node: the mesh the components belong to.
+        :type node: str
+        :param component: the component type, vtx, f, e or map.
+        :type component: str
+        :param indices: the component indices.
+        :type indices: iterable
+        :return:
+        :rtype: None
+        """
+        ranges = mesh_analysis.indexRanges(indices)
+        if not ranges:
+            return
+        components = self._getComponents(str(node), component)
+        for start, end in ranges:
+            components.addRange(start, end)
+
+    def entries(self):
+        """
+        Return the NodeHandles, ComponentRanges and strings of the store.
+        :return:
+        :rtype: list
+        """
+        return list(self._entries)
+
+    def names(self):
+        """
+        Yield the name of every error node and component range.
+        :return:
+        :rtype: generator
+        """
+        for entry in self._entries:
+            if isinstance(entry, ComponentRanges):
+                for name in entry.names():
+                    yield name
+            else:
+                yield str(entry)
+
+    def resolve(self):
+        """
+        Return the PyNodes of the error nodes still in the scene and the names of the components and the strings.
+        :return:
+        :rtype: list
+        """
+        resolved = list()
+        for entry in self._entries:
+            if isinstance(entry, ComponentRanges):
+                resolved.extend(entry.names())
+            elif isinstance(entry, NodeHandle):
+                node = entry.resolve()
+                if node is not None:
+                    resolved.append(node)
+            else:
+                resolved.append(entry)
+        return resolved
+
+    def copy(self):
+        store = ErrorNodes()
+        for entry in self._entries:
+            if isinstance(entry, ComponentRanges):
+                store.append(entry)
+            else:
+                store._entries.append(entry)
+        return store
+
+    def __iter__(self):
+        return iter(self.resolve())
+
+    def __len__(self):
+        return sum(len(x) if isinstance(x, ComponentRanges) else 1 for x in self._entries)
+
+    def __nonzero__(self):
+        return len(self) > 0
+
+
+class NodeMessages(object):
+    """
+    One message per name of an ErrorNodes store, formatted when they are read.
+    """
+    __slots__ = ('template', 'store')
+
+    def __init__(self, template, store):
+        self.template = template
+        self.store = store
+
+    def __iter__(self):
+        for name in self.store.names():
+            yield self.template % name
+
+
+class ErrorRows(object):
+    """
+    The rows of the error nodes window over an ErrorNodes store, made on demand by fetch. Every row is a (label,
+    target) pair, the target being the name to select or the ComponentRanges of a mesh when the components are grouped
+    by mesh. The filter keeps the rows with its text in their label, a filter narrowing the previous one only goes
+    through the rows already made.
+    """
+    def __init__(self, store, grouped=False):
+        super(ErrorRows, self).__init__()
+        self.store = store
+        self.grouped = grouped
+        self.filterText = ''
+        self.rows = list()
+        self.exhausted = False
+        self._source = None
+        self.reset()
+
+    def reset(self):
+        self.rows = list()
+        self.exhausted = False
+        self._source = self._iterRows()
+
+    def _iterRows(self):
+        entries = self.store.entries()
+        if not self.grouped:
+            for entry in entries:
+                if isinstance(entry, ComponentRanges):
+                    for name in entry.names():
+                        yield name, name
+                else:
+                    yield str(entry), str(entry)
+            return
+
+        # the component ranges of a mesh make one row, at the place of its first ranges, the other entries keep theirs.
+        groups = dict()
+        targets = list()
+        for entry in entries:
+            if not isinstance(entry, ComponentRanges):
+                targets.append(str(entry))
+            elif entry.node in groups:
+                groups[entry.node].append(entry)
+            else:
+                groups[entry.node] = [entry]
+                targets.append(groups[entry.node])
+        for target in targets:
+            if isinstance(target, list):
+                yield '%s  (%s)' % (target[0].node, ', '.join('%s %s' % (x.componentCount(), x.component)
+                                                              for x in target)), target
+            else:
+                yield target, target
+
+    def fetch(self, count):
+        """
+        Make up to count more rows matching the filter.
+        :param count: the number of rows to add.
+        :type count: int
+        :return: the number of rows added.
+        :rtype: int
+        """
+        added = 0
+        while added < count and not self.exhausted:
+            try:
+                row = next(self._source)
+            except StopIteration:
+                self.exhausted = True
+                break
+            if self.filterText in row[0].lower():
+                self.rows.append(row)
+                added += 1
+        return added
+
+    def fetchAll(self):
+        while not self.exhausted:
+            self.fetch(4096)
+
+    def setFilter(self, text):
+        """
+        Keep only the rows with the text in their label, case insensitive.
+        :param text: the filter, empty for all the rows.
+        :type text: str
+        :return:
+        :rtype: None
+        """
+        text = text.lower()
+        narrowing = self.filterText in text
+        self.filterText = text
+        if narrowing:
+            self.rows = [x for x in self.rows if text in x[0].lower()]
+        else:
+            self.reset()
+
+    def setGrouped(self, grouped):
+        self.grouped = grouped
+        self.reset()
+
+    def names(self, rows):
+        """
+        Return the names to select for the rows, the components of a mesh row included.
+        :param rows: rows of this ErrorRows.
+        :type rows: list
+        :return:
+        :rtype: list
+        """
+        names = list()
+        for label, target in rows:
+            if isinstance(target, list):
+                for components in target:
+                    names.extend(components.names())
+            else:
+                names.append(target)
+        return names
@@ -0,0 +1,237 @@
+"""
+Instrumentation of the validation runs. Given to a ValidationRun, it records for every check its wall time, the number
+of nodes it got from the scene snapshot and, when the call counting is on, the number of pymel/cmds calls it made.
+The records can be written as a json run report.
+
+The call counting replaces the functions of pymel.core and maya.cmds by counting wrappers for the time of the run, it
+slows the calls down a little so it is off by default (VALIDATIONS_COUNT_CALLS=1 turns it on in the UI).
+"""
+# General Imports.
+import contextlib
+import getpass
+import json
+import os
+import socket
+import time
+
+COUNT_CALLS_ENV = 'VALIDATIONS_COUNT_CALLS'
+REPORT_FOLDER_ENV = 'VALIDATIONS_REPORT_FOLDER'
+
+
+class CheckRecord(object):
+    """
+    The measures of one check.
+    """
+    def __init__(self, className, name, category):
+        super(CheckRecord, self).__init__()
+        self.className = className
+        self.name = name
+        self.category = category
+        self.status = ''
+        self.wallTime = 0.0
+        # time the check spent stopped between two chunks, taken out of its wall time.
+        self.idleTime = 0.0
+        self.nodesInspected = 0
+        self.calls = dict()
+
+    def _getCallCount(self):
+        return sum(self.calls.values())
+
+    callCount = property(_getCallCount)
+
+    def toDict(self):
+        return {'class': self.className,
+                'name': self.name,
+                'category': self.category,
+                'status': self.status,
+                'wallTime': self.wallTime,
+                'nodesInspected': self.nodesInspected,
+                'callCount': self.callCount,
+                'calls': dict(self.calls)}
+
+
+class CallCounter(object):
+    """
+    Counting shim over the functions of modules, like pymel.core and maya.cmds.
+    """
+    def __init__(self):
+        super(CallCounter, self).__init__()
+        self.counts = dict()
+        self._originals = list()
+
+    def _wrap(self, label, function):
+        counts = self.counts
+
+        def wrapper(*args, **kwargs):
+            counts[label] = counts.get(label, 0) + 1
+            return function(*args, **kwargs)
+        wrapper.__name__ = getattr(function, '__name__', label)
+        wrapper.__doc__ = getattr(function, '__doc__', None)
+        return wrapper
+
+    def install(self, modules):
+        """
+        Wrap the plain functions of the modules, the classes are left alone.
+        :param modules: (prefix, module) pairs, like ('cmds', maya.cmds).
+        :type modules: list
+        :return:
+        :rtype: None
+        """
+        for prefix, module in modules:
+            for attrName, value in vars(module).items():
+                if attrName.startswith('_') or isinstance(value, type) or not callable(value):
+                    continue
+                self._originals.append((module, attrName, value))
+                setattr(module, attrName, self._wrap('%s.%s' % (prefix, attrName), value))
+
+    def uninstall(self):
+        for module, attrName, value in reversed(self._originals):
+            setattr(module, attrName, value)
+        self._originals = list()
+
+    def snapshot(self):
+        return dict(self.counts)
+
+
+def getMayaModules():
+    """
+    Return the (prefix, module) pairs of pymel.core and maya.cmds, the ones that can't be imported are skipped.
+    :return:
+    :rtype: list
+    """
+    modules = list()
+    try:
+        import maya.cmds as cmds
+        modules.append(('cmds', cmds))
+    except ImportError:
+        pass
+    try:
+        import pymel.core as pm
+        modules.append(('pm', pm))
+    except ImportError:
+        pass
+    return modules
+
+
+class Instrumentation(object):
+    """
+    Collects the CheckRecords of a run, see ValidationRun.measure.
+    """
+    def __init__(self, countCalls=False, modules=None):
+        """
+        :param countCalls: install the call counting shim.
+        :type countCalls: bool
+        :param modules: the (prefix, module) pairs to count the calls of, pymel.core and maya.cmds by default.
+        :type modules: list
+        """
+        super(Instrumentation, self).__init__()
+        self.records = list()
+        self.started = time.time()
+        self.finished = None
+        self.counter = None
+        if countCalls:
+            self.counter = CallCounter()
+            self.counter.install(getMayaModules() if modules is None else modules)
+
+    @classmethod
+    def fromEnvironment(cls):
+        """
+        Instrumentation with the call counting on if VALIDATIONS_COUNT_CALLS is set.
+        """
+        return cls(countCalls=os.environ.get(COUNT_CALLS_ENV, '') not in ('', '0'))
+
+    @contextlib.contextmanager
+    def measure(self, validation, snapshot=None):
+        """
+        Record the check running in the block.
+        :param validation: Validations or CheckAbstract instance.
+        :type validation: object
+        :param snapshot: callable returning the scene snapshot of the run, or None while it is not built.
+        :type snapshot: callable
+        :return:
+        :rtype: CheckRecord
+        """
+        record = CheckRecord(type(validation).__name__, getattr(validation, '_name', ''),
+                             getattr(validation, '_category', ''))
+        self.records.append(record)
+        before = snapshot() if snapshot else None
+        inspectedBefore = before.inspectedCount if before is not None else 0
+        callsBefore = self.counter.snapshot() if self.counter else dict()
+        start = time.time()
+        try:
+            yield record
+        finally:
+            record.wallTime = time.time() - start - record.idleTime
+            after = snapshot() if snapshot else None
+            if after is not None:
+                record.nodesInspected = after.inspectedCount - (inspectedBefore if after is before else 0)
+            if self.counter:
+                for label, count in self.counter.snapshot().iteritems():
+                    if count != callsBefore.get(label, 0):
+                        record.calls[label] = count - callsBefore.get(label, 0)
+            record.status = str(getattr(validation, 'status', ''))
+
+    def getRecord(self, validation):
+        """
+        Return the last record of the validation class, None if it didn't run.
+        """
+        className = type(validation).__name__
+        for record in reversed(self.records):
+            if record.className == className:
+                return record
+        return None
+
+    def close(self):
+        """
+        Remove the call counting shim, the records are kept.
+        """
+        if self.finished is None:
+            self.finished = time.time()
+        if self.counter:
+            self.counter.uninstall()
+
+    def report(self, **extra):
+        """
+        Return the run report, the slowest checks first.
+        :return:
+        :rtype: dict
+        """
+        records = sorted(self.records, key=lambda x: x.wallTime, reverse=True)
+        report = {'started': self.started,
+                  'wallTime': (self.finished or time.time()) - self.started,
+                  'user': getpass.getuser(),
+                  'host': socket.gethostname(),
+                  'callCounting': self.counter is not None,
+                  'checks': [x.toDict() for x in records]}
+        report.update(extra)
+        return report
+
+    def writeReport(self, reportFile, **extra):
+        """
+        Write the run report as json.
+        :param reportFile: the json file to write.
+        :type reportFile: str
+        :return: the written file.
+        :rtype: str
+        """
+        folder = os.path.dirname(reportFile)
+        if folder and not os.path.isdir(folder):
+            os.makedirs(folder)
+        with open(reportFile, 'w') as writeId:
+            json.dump(self.report(**extra), writeId, indent=2, sort_keys=True)
+        return reportFile
+
+
+def getReportFile(sceneName=''):
+    """
+    Return a new report file in VALIDATIONS_REPORT_FOLDER, or in the temp folder.
+    :param sceneName: the validated scene, used in the file name.
+    :type sceneName: str
+    :return:
+    :rtype: str
+    """
+    import tempfile
+
+    folder = os.environ.get(REPORT_FOLDER_ENV) or os.path.join(tempfile.gettempdir(), 'validation_reports')
+    baseName = os.path.splitext(os.path.basename(sceneName))[0] or 'untitled'
+    return os.path.join(folder, '%s_%s.json' % (baseName, time.strftime('%Y%m%d_%H%M%S'))).replace('\\', '/')
@@ -0,0 +1,369 @@
+"""
+Live mode of the validations. The scene change notifications are turned into SceneEvents, the DirtyTracker matches
+them against what every check declares to read (_watchTypes, _watchAttrs and _watchEvents on the Validations classes)
+and only the checks marked dirty are run again.
+
+The events come from a callback source: MayaCallbackSource listens to the maya messages, FakeCallbackSource is fed by
+hand so the dirty tracking can be exercised without maya.
+"""
+# General Imports.
+import collections
+import contextlib
+
+# kind is one of EVENT_KINDS, nodeTypes holds the inherited types of the node, attr the long attribute name.
+SceneEvent = collections.namedtuple('SceneEvent', ['kind', 'node', 'nodeTypes', 'attr'])
+
+STRUCTURE_EVENTS = ('added', 'removed', 'renamed', 'reparented')
+ATTRIBUTE_EVENTS = ('attributeChanged', 'connectionChanged')
+# every check is dirty after a scene open, new or save.
+SCENE_CHANGED = 'sceneChanged'
+EVENT_KINDS = STRUCTURE_EVENTS + ATTRIBUTE_EVENTS + (SCENE_CHANGED, 'playbackChanged')
+
+
+class WatchedCheck(object):
+    """
+    What one check reads, taken from its class declaration or from the check itself when what it reads depends on the
+    config of its project.
+    """
+    def __init__(self, validation):
+        super(WatchedCheck, self).__init__()
+        self.types = getattr(validation, '_watchTypes', None)
+        self.attrs = getattr(validation, '_watchAttrs', None)
+        self.events = tuple(getattr(validation, '_watchEvents', ()))
+        self.requires = [x.__name__ for x in getattr(validation, '_requires', ())]
+        self.className = (validation if isinstance(validation, type) else type(validation)).__name__
+
+    def _matchesType(self, event):
+        # an event without node types can't be told apart, it matches every check watching some type.
+        if self.types is None:
+            return True
+        if not event.nodeTypes:
+            return bool(self.types)
+        return bool(set(self.types).intersection(event.nodeTypes))
+
+    def matches(self, event):
+        """
+        Check if the event can change the result of the check.
+        :param event: the scene event.
+        :type event: SceneEvent
+        :return:
+        :rtype: bool
+        """
+        if event.kind == SCENE_CHANGED:
+            return True
+        if event.kind in STRUCTURE_EVENTS:
+            return self._matchesType(event)
+        if event.kind in ATTRIBUTE_EVENTS:
+            if self.types is None or not self._matchesType(event):
+                return False
+            if self.attrs is None:
+                return True
+            return any((event.attr or '').startswith(x) for x in self.attrs)
+        return event.kind in self.events
+
+
+class DirtyTracker(object):
+    """
+    Keeps which of the registered checks need to run again.
+    """
+    def __init__(self):
+        super(DirtyTracker, self).__init__()
+        self._checks = collections.OrderedDict()
+        self._dirty = set()
+
+    def register(self, key, validation):
+        """
+        Start tracking a check, it is dirty until it is taken the first time.
+        :param key: the key the check is known by, like its class name.
+        :type key: str
+        :param validation: the Validations class of the check, or the check itself.
+        :type validation: type
+        :return:
+        :rtype: None
+        """
+        self._checks[key] = WatchedCheck(validation)
+        self._dirty.add(key)
+
+    def unregister(self, key):
+        self._checks.pop(key, None)
+        self._dirty.discard(key)
+
+    def clear(self):
+        self._checks.clear()
+        self._dirty.clear()
+
+    def attributeTypes(self):
+        """
+        The node types the attribute changes are needed for. The checks without _watchTypes are only run again on the
+        structure changes, listening to the attributes of every node would slow maya down.
+        :return:
+        :rtype: set
+        """
+        types = set()
+        for watched in self._checks.values():
+            if watched.attrs == () or watched.types is None:
+                continue
+            types.update(watched.types)
+        return types
+
+    def handle(self, event):
+        """
+        Mark dirty the checks the event matters to, and the checks requiring them.
+        :param event: the scene event.
+        :type event: SceneEvent
+        :return: the keys that became dirty.
+        :rtype: set
+        """
+        newlyDirty = set()
+        for key, watched in self._checks.iteritems():
+            if key not in self._dirty and watched.matches(event):
+                newlyDirty.add(key)
+        if newlyDirty:
+            self._dirty.update(newlyDirty)
+            self._propagate(newlyDirty)
+        return newlyDirty
+
+    def _propagate(self, keys):
+        dirtyClasses = set(self._checks[x].className for x in keys)
+        changed = True
+        while changed:
+            changed = False
+            for key, watched in self._checks.iteritems():
+                if key in self._dirty:
+                    continue
+                if dirtyClasses.intersection(watched.requires):
+                    self._dirty.add(key)
+                    dirtyClasses.add(watched.className)
+                    changed = True
+
+    def isDirty(self, key):
+        return key in self._dirty
+
+    def takeDirty(self):
+        """
+        Return the dirty checks in the registration order and mark them clean.
+        :return:
+        :rtype: list
+        """
+        dirty = [x for x in self._checks if x in self._dirty]
+        self._dirty.clear()
+        return dirty
+
+
+class CallbackSource(object):
+    """
+    Base of the event sources, start() hands every SceneEvent to the handler until stop().
+    """
+    def start(self, handler, attributeTypes=None):
+        """
+        :param handler: callable receiving the SceneEvents.
+        :type handler: callable
+        :param attributeTypes: node types to report the attribute changes of, None for all.
+        :type attributeTypes: set
+        """
+        raise NotImplementedError
+
+    def stop(self):
+        raise NotImplementedError
+
+
+class FakeCallbackSource(CallbackSource):
+    """
+    Event source fed by hand, to drive the live mode without maya.
+    """
+    def __init__(self):
+        super(FakeCallbackSource, self).__init__()
+        self.handler = None
+        self.attributeTypes = None
+
+    def start(self, handler, attributeTypes=None):
+        self.handler = handler
+        self.attributeTypes = attributeTypes
+
+    def stop(self):
+        self.handler = None
+
+    def emit(self, kind, node='', nodeTypes=(), attr=None):
+        """
+        Send an event to the handler, like maya would.
+        """
+        if self.handler is None:
+            return
+        if kind in ATTRIBUTE_EVENTS and self.attributeTypes is not None:
+            if not set(nodeTypes).intersection(self.attributeTypes):
+                return
+        self.handler(SceneEvent(kind, node, tuple(nodeTypes), attr))
+
+
+class MayaCallbackSource(CallbackSource):
+    """
+    Event source listening to the maya messages. The attribute changes are only listened to on the nodes of the
+    attribute types, the nodes created later included.
+    """
+    def __init__(self):
+        super(MayaCallbackSource, self).__init__()
+        self.handler = None
+        self.attributeTypes = None
+        self._callbackIds = list()
+        self._nodeCallbackIds = dict()
+        self._inheritedTypes = dict()
+
+    def _getNodeTypes(self, mObject):
+        import maya.api.OpenMaya as om
+        import maya.cmds as cmds
+
+        typeName = om.MFnDependencyNode(mObject).typeName
+        if typeName not in self._inheritedTypes:
+            inherited = cmds.nodeType(typeName, inherited=True, isTypeName=True) or [typeName]
+            self._inheritedTypes[typeName] = tuple(inherited)
+        return self._inheritedTypes[typeName]
+
+    def _emit(self, kind, mObject, attr=None):
+        import maya.api.OpenMaya as om
+
+        if self.handler is None or mObject.isNull():
+            return
+        name = om.MFnDependencyNode(mObject).name()
+        self.handler(SceneEvent(kind, name, self._getNodeTypes(mObject), attr))
+
+    def _wantsAttributes(self, mObject):
+        if self.attributeTypes is None:
+            return True
+        return bool(self.attributeTypes.intersection(self._getNodeTypes(mObject)))
+
+    def _watchAttributes(self, mObject):
+        import maya.api.OpenMaya as om
+
+        handle = om.MObjectHandle(mObject)
+        if handle.hashCode() in self._nodeCallbackIds or not self._wantsAttributes(mObject):
+            return
+        self._nodeCallbackIds[handle.hashCode()] = om.MNodeMessage.addAttributeChangedCallback(mObject,
+                                                                                               self._attributeChanged)
+
+    def _nodeAdded(self, mObject, clientData):
+        self._emit('added', mObject)
+        self._watchAttributes(mObject)
+
+    def _nodeRemoved(self, mObject, clientData):
+        import maya.api.OpenMaya as om
+
+        callbackId = self._nodeCallbackIds.pop(om.MObjectHandle(mObject).hashCode(), None)
+        if callbackId is not None:
+            om.MMessage.removeCallback(callbackId)
+        self._emit('removed', mObject)
+
+    def _nameChanged(self, mObject, previousName, clientData):
+        if previousName:
+            self._emit('renamed', mObject)
+
+    def _dagChanged(self, message, child, parent, clientData):
+        self._emit('reparented', child.node())
+
+    def _attributeChanged(self, message, plug, otherPlug, clientData):
+        import maya.api.OpenMaya as om
+
+        if message & (om.MNodeMessage.kConnectionMade | om.MNodeMessage.kConnectionBroken):
+            kind = 'connectionChanged'
+        elif message & om.MNodeMessage.kAttributeSet:
+            kind = 'attributeChanged'
+        else:
+            return
+        self._emit(kind, plug.node(), plug.partialName(useLongNames=True))
+
+    def _sceneChanged(self, clientData):
+        if self.handler is not None:
+            self.handler(SceneEvent(SCENE_CHANGED, '', (), None))
+        self._watchAllAttributes()
+
+    def _playbackChanged(self, clientData):
+        if self.handler is not None:
+            self.handler(SceneEvent('playbackChanged', '', (), None))
+
+    def _watchAllAttributes(self):
+        import maya.api.OpenMaya as om
+
+        self._removeNodeCallbacks()
+        iterator = om.MItDependencyNodes()
+        while not iterator.isDone():
+            self._watchAttributes(iterator.thisNode())
+            iterator.next()
+
+    def _removeNodeCallbacks(self):
+        import maya.api.OpenMaya as om
+
+        if self._nodeCallbackIds:
+            om.MMessage.removeCallbacks(self._nodeCallbackIds.values())
+        self._nodeCallbackIds = dict()
+
+    def start(self, handler, attributeTypes=None):
+        import maya.api.OpenMaya as om
+
+        self.stop()
+        self.handler = handler
+        self.attributeTypes = None if attributeTypes is None else set(attributeTypes)
+        self._callbackIds = [
+            om.MDGMessage.addNodeAddedCallback(self._nodeAdded, 'dependNode'),
+            om.MDGMessage.addNodeRemovedCallback(self._nodeRemoved, 'dependNode'),
+            om.MNodeMessage.addNameChangedCallback(om.MObject(), self._nameChanged),
+            om.MDagMessage.addAllDagChangesCallback(self._dagChanged),
+            om.MSceneMessage.addCallback(om.MSceneMessage.kAfterOpen, self._sceneChanged),
+            om.MSceneMessage.addCallback(om.MSceneMessage.kAfterNew, self._sceneChanged),
+            om.MSceneMessage.addCallback(om.MSceneMessage.kAfterSave, self._sceneChanged),
+            om.MEventMessage.addEventCallback('playbackRangeChanged', self._playbackChanged)]
+        if self.attributeTypes != set():
+            self._watchAllAttributes()
+
+    def stop(self):
+        import maya.api.OpenMaya as om
+
+        if self._callbackIds:
+            om.MMessage.removeCallbacks(self._callbackIds)
+        self._callbackIds = list()
+        self._removeNodeCallbacks()
+        self.handler = None
+
+
+class LiveValidation(object):
+    """
+    Ties an event source to a DirtyTracker, onDirty is called whenever checks become dirty so the caller can schedule
+    the run of takeDirty().
+    """
+    def __init__(self, source, onDirty=None):
+        super(LiveValidation, self).__init__()
+        self.source = source
+        self.onDirty = onDirty
+        self.tracker = DirtyTracker()
+        self.isRunning = False
+        self._suspended = 0
+
+    def watch(self, key, validation):
+        self.tracker.register(key, validation)
+
+    def start(self):
+        self.source.start(self._handle, self.tracker.attributeTypes())
+        self.isRunning = True
+
+    def stop(self):
+        if self.isRunning:
+            self.source.stop()
+        self.isRunning = False
+
+    @contextlib.contextmanager
+    def suspended(self):
+        """
+        Ignore the events while the validations run, a check touching the scene would make itself dirty forever.
+        """
+        self._suspended += 1
+        try:
+            yield self
+        finally:
+            self._suspended -= 1
+
+    def _handle(self, event):
+        if self._suspended:
+            return
+        if self.tracker.handle(event) and self.onDirty is not None:
+            self.onDirty()
+
+    def takeDirty(self):
+        return self.tracker.takeDirty()
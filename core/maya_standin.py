@@ -0,0 +1,910 @@
+"""
+In-memory stand-in for pymel.core, maya.cmds, maya.mel and maya.api.OpenMaya. install() puts fake modules in
+sys.modules that answer from a memory_scene.MemoryScene, so the check modules can be imported and run on a plain python
+without maya, by the benchmarks and the tests of the checks. The MemoryBackend is the validations backend built on it:
+
+    validations.setBackend(maya_standin.MemoryBackend.fromAsciiFile(path))
+    from Validations.core.rig import RigValidations
+
+Only the calls and flags the checks use are implemented. Everything else raises StandInUnsupported, so a check using
+it fails clearly instead of giving a wrong answer.
+"""
+# General Imports.
+import contextlib
+import os
+import sys
+import types
+
+from Validations.core import memory_scene
+from Validations.core import validations
+
+# the modules replaced by install, the parents first.
+STANDIN_MODULES = ('maya', 'maya.cmds', 'maya.mel', 'maya.api', 'maya.api.OpenMaya', 'pymel', 'pymel.core',
+                   'pymel.core.datatypes')
+
+_STATE = {'scene': None, 'saved': None}
+
+
+class StandInUnsupported(NotImplementedError):
+    """
+    Raised by the calls the stand-in doesn't implement.
+    """
+
+
+class StandInModule(types.ModuleType):
+    """
+    Module whose missing functions raise StandInUnsupported when they are used.
+    """
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(name)
+        raise StandInUnsupported('%s.%s is not supported by the maya stand-in.' % (self.__name__, name))
+
+
+def getScene():
+    """
+    Return the scene the stand-in answers from.
+    :return:
+    :rtype: memory_scene.MemoryScene
+    """
+    if _STATE['scene'] is None:
+        _STATE['scene'] = memory_scene.MemoryScene()
+    return _STATE['scene']
+
+
+def setScene(scene):
+    """
+    Make the stand-in answer from another scene, the modules already imported see the change.
+    :param scene: the new scene.
+    :type scene: memory_scene.MemoryScene
+    :return:
+    :rtype: None
+    """
+    _STATE['scene'] = scene
+
+
+def _flag(kwargs, *names, **options):
+    for name in names:
+        if name in kwargs:
+            return kwargs[name]
+    return options.get('default')
+
+
+def _flatten(args):
+    flat = list()
+    for arg in args:
+        if isinstance(arg, (list, tuple, set)):
+            flat.extend(_flatten(arg))
+        elif arg is not None:
+            flat.append(arg)
+    return flat
+
+
+def _toMemoryNode(value):
+    if isinstance(value, DependNode):
+        return value._node
+    if isinstance(value, (Attribute, memory_scene.MemoryNode)):
+        return getattr(value, '_node', value)
+    return getScene().getNode(str(value))
+
+
+def _component(name):
+    """
+    Split "mesh.vtx[*]" into the mesh node and the component name.
+    """
+    nodeName, _, component = str(name).partition('.')
+    return getScene().getNode(nodeName), component
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# pymel.core
+# ----------------------------------------------------------------------------------------------------------------------
+class Vector(tuple):
+    """
+    The pymel.core.datatypes.Vector, compared by value.
+    """
+    def __new__(cls, *args):
+        if len(args) == 1:
+            args = args[0]
+        return super(Vector, cls).__new__(cls, [float(x) for x in args])
+
+    x = property(lambda self: self[0])
+    y = property(lambda self: self[1])
+    z = property(lambda self: self[2])
+
+
+class EulerRotation(Vector):
+    pass
+
+
+class PyNode(object):
+    """
+    The pymel PyNode, "node.attr" gives an Attribute and a node name a DependNode.
+    """
+    def __new__(cls, name, *args):
+        if cls is PyNode:
+            cls = Attribute if '.' in str(name) and not isinstance(name, memory_scene.MemoryNode) else DependNode
+        return super(PyNode, cls).__new__(cls)
+
+    def __ne__(self, other):
+        return not self == other
+
+
+class DependNode(PyNode):
+    """
+    A node of the stand-in scene.
+    """
+    def __init__(self, name):
+        super(DependNode, self).__init__()
+        self._node = _toMemoryNode(name)
+
+    def __str__(self):
+        return getScene().shortestName(self._node)
+
+    def __repr__(self):
+        return "nt.%s(u'%s')" % (self._node.nodeType[:1].upper() + self._node.nodeType[1:], self)
+
+    def __eq__(self, other):
+        if isinstance(other, DependNode):
+            return other._node is self._node
+        if isinstance(other, basestring):
+            return other in (self._node.name, self._node.longName, str(self))
+        return False
+
+    def __hash__(self):
+        return hash(id(self._node))
+
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(name)
+        if getScene().hasAttr(self._node, name):
+            return Attribute(self, name)
+        raise StandInUnsupported('%s has no attribute or stand-in method "%s".' % (self, name))
+
+    def name(self, long=False):
+        return self._node.longName if long else str(self)
+
+    def nodeName(self):
+        return str(self)
+
+    def longName(self):
+        return self._node.longName
+
+    def shortName(self):
+        return self._node.name
+
+    def nodeType(self):
+        return self._node.nodeType
+
+    type = nodeType
+
+    def exists(self):
+        return not self._node.deleted
+
+    def namespace(self):
+        namespace = self._node.name.rpartition(':')[0]
+        return '%s:' % namespace if namespace else ''
+
+    def isReferenced(self):
+        return self._node.referenced
+
+    def isInstanced(self):
+        return False
+
+    def attr(self, name):
+        if not getScene().hasAttr(self._node, name):
+            raise AttributeError('%s has no attribute %s' % (self, name))
+        return Attribute(self, name)
+
+    def hasAttr(self, name):
+        return getScene().hasAttr(self._node, name)
+
+    def getParent(self):
+        return DependNode(self._node.parent) if self._node.parent is not None else None
+
+    def getChildren(self):
+        return [DependNode(x) for x in self._node.children]
+
+    def getShapes(self):
+        return [DependNode(x) for x in self._node.children if 'shape' in memory_scene.resolveInheritedTypes(x.nodeType)]
+
+    def getShape(self):
+        shapes = self.getShapes()
+        return shapes[0] if shapes else None
+
+    def getTransform(self):
+        return self.getParent()
+
+    def listRelatives(self, **kwargs):
+        return listRelatives(self, **kwargs)
+
+    def listConnections(self, **kwargs):
+        return listConnections(self, **kwargs)
+
+    def members(self):
+        return [DependNode(x) for x in self._node.members]
+
+    def union(self, members):
+        for member in _flatten([members]):
+            node = _toMemoryNode(member)
+            if node not in self._node.members:
+                self._node.members.append(node)
+
+    def add(self, members):
+        self.union(members)
+
+
+class Attribute(PyNode):
+    """
+    An attribute of a stand-in node.
+    """
+    def __init__(self, node, attr=None):
+        super(Attribute, self).__init__()
+        if attr is None:
+            node, attr = str(node).split('.', 1)
+        self._pyNode = node if isinstance(node, DependNode) else DependNode(node)
+        self._node = self._pyNode._node
+        self._attr = attr
+        self._locked = False
+
+    def __str__(self):
+        return '%s.%s' % (self._pyNode, self._attr)
+
+    __repr__ = __str__
+
+    def __eq__(self, other):
+        if isinstance(other, Attribute):
+            return other._node is self._node and (memory_scene.longAttributeName(other._attr) ==
+                                                  memory_scene.longAttributeName(self._attr))
+        return isinstance(other, basestring) and other == str(self)
+
+    def __hash__(self):
+        return hash((id(self._node), memory_scene.longAttributeName(self._attr)))
+
+    def node(self):
+        return self._pyNode
+
+    def name(self):
+        return str(self)
+
+    def attrName(self, longName=False):
+        return memory_scene.longAttributeName(self._attr) if longName else self._attr
+
+    def exists(self):
+        return getScene().hasAttr(self._node, self._attr)
+
+    def get(self):
+        value = getScene().getAttr(self._node, self._attr)
+        if isinstance(value, tuple) and len(value) == 3:
+            return Vector(value)
+        return value
+
+    def set(self, *value, **kwargs):
+        getScene().setAttr(self._node, self._attr, value[0] if len(value) == 1 else value)
+
+    def isLocked(self):
+        return self._locked
+
+    def lock(self):
+        self._locked = True
+
+    def unlock(self):
+        self._locked = False
+
+
+def ls(*args, **kwargs):
+    """
+    pm.ls, the names are matched on the short names and the result is a list of PyNodes.
+    """
+    scene = getScene()
+    names = _flatten(args)
+    if _flag(kwargs, 'selection', 'sl'):
+        nodes = list(scene.selection)
+    elif _flag(kwargs, 'assemblies'):
+        nodes = scene.assemblies()
+    elif names:
+        nodes = list()
+        for name in names:
+            if isinstance(name, Attribute):
+                nodes.append(name)
+            elif isinstance(name, DependNode):
+                nodes.append(name._node)
+            elif '.' in str(name):
+                if scene.objExists(name):
+                    nodes.append(PyNode(name))
+            else:
+                nodes.extend(scene.match(str(name)))
+    else:
+        nodes = list(scene.nodes)
+    nodeType = _flag(kwargs, 'type', 'typ')
+    if nodeType is not None:
+        typed = set(scene.ls(type=nodeType))
+        nodes = [x for x in nodes if x in typed]
+    exactType = _flag(kwargs, 'exactType', 'et')
+    if exactType is not None:
+        typed = set(scene.ls(exactType=exactType))
+        nodes = [x for x in nodes if x in typed]
+    if _flag(kwargs, 'referencedNodes', 'rn'):
+        nodes = [x for x in nodes if x.referenced]
+    if _flag(kwargs, 'dag'):
+        nodes = [x for x in nodes if x.isDag]
+    if _flag(kwargs, 'transforms', 'tr'):
+        nodes = [x for x in nodes if 'transform' in memory_scene.resolveInheritedTypes(x.nodeType)]
+    if _flag(kwargs, 'shapes'):
+        nodes = [x for x in nodes if 'shape' in memory_scene.resolveInheritedTypes(x.nodeType)]
+    return [x if isinstance(x, PyNode) else DependNode(x) for x in nodes]
+
+
+def select(*args, **kwargs):
+    scene = getScene()
+    if _flag(kwargs, 'clear', 'cl'):
+        scene.selection = list()
+        return
+    nodes = list()
+    for name in _flatten(args):
+        if isinstance(name, PyNode):
+            nodes.append(name._node)
+        else:
+            nodes.extend(scene.match(str(name).split('.', 1)[0]))
+    if _flag(kwargs, 'add', 'af'):
+        scene.selection.extend(x for x in nodes if x not in scene.selection)
+    elif _flag(kwargs, 'deselect', 'd'):
+        scene.selection = [x for x in scene.selection if x not in nodes]
+    else:
+        scene.selection = nodes
+
+
+def selected(**kwargs):
+    return [DependNode(x) for x in getScene().selection]
+
+
+def objExists(name):
+    if isinstance(name, PyNode):
+        return name.exists()
+    return getScene().objExists(str(name))
+
+
+def delete(*args, **kwargs):
+    scene = getScene()
+    for name in _flatten(args):
+        node = _toMemoryNode(name)
+        if not node.deleted:
+            scene.delete(node)
+
+
+def nodeType(name, **kwargs):
+    node = _toMemoryNode(name)
+    if _flag(kwargs, 'inherited', 'i'):
+        return memory_scene.resolveInheritedTypes(node.nodeType)
+    return node.nodeType
+
+
+def listRelatives(*args, **kwargs):
+    """
+    pm.listRelatives, the children, the descendants or the parent of the nodes.
+    """
+    scene = getScene()
+    found = list()
+    for name in _flatten(args):
+        node = _toMemoryNode(name)
+        if _flag(kwargs, 'parent', 'p'):
+            relatives = [node.parent] if node.parent is not None else list()
+        elif _flag(kwargs, 'allDescendents', 'ad'):
+            relatives = scene.descendants(node)
+        elif _flag(kwargs, 'allParents', 'ap'):
+            relatives = list()
+            parent = node.parent
+            while parent is not None:
+                relatives.append(parent)
+                parent = parent.parent
+        else:
+            relatives = list(node.children)
+        shapes = _flag(kwargs, 'shapes', 's')
+        if shapes is not None:
+            relatives = [x for x in relatives if ('shape' in memory_scene.resolveInheritedTypes(x.nodeType)) == shapes]
+        relativeType = _flag(kwargs, 'type', 'typ')
+        if relativeType is not None:
+            types = set([relativeType] if isinstance(relativeType, basestring) else relativeType)
+            relatives = [x for x in relatives if types.intersection(memory_scene.resolveInheritedTypes(x.nodeType))]
+        found.extend(x for x in relatives if x not in found)
+    return [DependNode(x) for x in found]
+
+
+def listConnections(*args, **kwargs):
+    """
+    pm.listConnections, the connected nodes, once per connection like maya does.
+    """
+    if _flag(kwargs, 'plugs', 'p') or _flag(kwargs, 'connections', 'c'):
+        raise StandInUnsupported('listConnections with plugs or connections is not supported by the maya stand-in.')
+    scene = getScene()
+    source = _flag(kwargs, 'source', 's', default=True)
+    destination = _flag(kwargs, 'destination', 'd', default=True)
+    connectionType = _flag(kwargs, 'type', 't')
+    found = list()
+    for name in _flatten(args):
+        attr = None
+        if isinstance(name, Attribute):
+            attr = memory_scene.longAttributeName(name._attr)
+        elif not isinstance(name, DependNode) and '.' in str(name):
+            attr = memory_scene.longAttributeName(str(name).split('.', 1)[1])
+        for plug, other, otherPlug in scene.listConnections(_toMemoryNode(name), source, destination):
+            if attr is not None and memory_scene.longAttributeName(plug) != attr:
+                continue
+            if connectionType is not None and connectionType not in memory_scene.resolveInheritedTypes(
+                    other.nodeType):
+                continue
+            found.append(other)
+    return [DependNode(x) for x in found]
+
+
+def listTransforms(*args, **kwargs):
+    """
+    pm.listTransforms(type=...), the transforms of the shapes of the type.
+    """
+    shapeType = _flag(kwargs, 'type', default='shape')
+    found = list()
+    for shape in getScene().ls(type=shapeType):
+        if shape.parent is not None and shape.parent not in found:
+            found.append(shape.parent)
+    return [DependNode(x) for x in found]
+
+
+def sets(*args, **kwargs):
+    """
+    pm.sets, create an objectSet of the nodes.
+    """
+    if _flag(kwargs, 'query', 'q') or _flag(kwargs, 'edit', 'e'):
+        raise StandInUnsupported('sets query and edit are not supported by the maya stand-in.')
+    scene = getScene()
+    objectSet = scene.createNode('objectSet', _flag(kwargs, 'name', 'n'))
+    objectSet.members.extend(_toMemoryNode(x) for x in _flatten(args))
+    return DependNode(objectSet)
+
+
+def namespaceInfo(*args, **kwargs):
+    """
+    pm.namespaceInfo(listOnlyNamespaces=True), the namespaces of the root, all of them with recurse.
+    """
+    if not _flag(kwargs, 'listOnlyNamespaces', 'lon'):
+        raise StandInUnsupported('namespaceInfo is only supported with listOnlyNamespaces by the maya stand-in.')
+    namespaces = list(getScene().namespaces)
+    if not _flag(kwargs, 'recurse', 'r'):
+        namespaces = [x for x in namespaces if ':' not in x]
+    if _flag(kwargs, 'internal', 'i', default=True):
+        namespaces = ['UI', 'shared'] + namespaces
+    return namespaces
+
+
+def sceneName():
+    return getScene().sceneName
+
+
+def playbackOptions(**kwargs):
+    """
+    pm.playbackOptions, query or edit of the playback and animation ranges.
+    """
+    playback = getScene().playback
+    flags = {'minTime': 'min', 'min': 'min', 'maxTime': 'max', 'max': 'max', 'animationStartTime': 'animationStartTime',
+             'ast': 'animationStartTime', 'animationEndTime': 'animationEndTime', 'aet': 'animationEndTime'}
+    if _flag(kwargs, 'query', 'q'):
+        for flag, key in flags.items():
+            if kwargs.get(flag):
+                return playback[key]
+        raise StandInUnsupported('playbackOptions query flags %s are not supported.' % sorted(kwargs))
+    for flag, key in flags.items():
+        if flag in kwargs:
+            playback[key] = float(kwargs[flag])
+
+
+def createNode(nodeType, **kwargs):
+    node = getScene().createNode(nodeType, _flag(kwargs, 'name', 'n'), _flag(kwargs, 'parent', 'p'))
+    return DependNode(node)
+
+
+def rename(node, name):
+    return DependNode(getScene().rename(_toMemoryNode(node), name))
+
+
+def parent(*args, **kwargs):
+    args = _flatten(args)
+    if _flag(kwargs, 'world', 'w'):
+        children, parentNode = args, None
+    else:
+        children, parentNode = args[:-1], _toMemoryNode(args[-1])
+    moved = list()
+    for child in children:
+        node = _toMemoryNode(child)
+        getScene().parent(node, parentNode)
+        moved.append(DependNode(node))
+    return moved
+
+
+def getAttr(plug, **kwargs):
+    return PyNode(str(plug)).get()
+
+
+def setAttr(plug, *values, **kwargs):
+    PyNode(str(plug)).set(*values)
+
+
+def addAttr(*args, **kwargs):
+    name = _flag(kwargs, 'longName', 'ln')
+    for node in _flatten(args):
+        getScene().addAttr(_toMemoryNode(node), name, _flag(kwargs, 'defaultValue', 'dv'))
+
+
+def connectAttr(source, destination, **kwargs):
+    getScene().connectAttr(str(source), str(destination))
+
+
+def polyPlane(**kwargs):
+    transform, shape = getScene().polyPlane(_flag(kwargs, 'name', 'n', default='pPlane1'),
+                                            int(_flag(kwargs, 'subdivisionsX', 'sx', default=10)),
+                                            int(_flag(kwargs, 'subdivisionsY', 'sy', default=10)),
+                                            float(_flag(kwargs, 'width', 'w', default=1.0)),
+                                            float(_flag(kwargs, 'height', 'h', default=1.0)))
+    return [DependNode(transform), DependNode(shape)]
+
+
+_PYMEL_FUNCTIONS = (ls, select, selected, objExists, delete, nodeType, listRelatives, listConnections, listTransforms,
+                    sets, namespaceInfo, sceneName, playbackOptions, createNode, rename, parent, getAttr, setAttr,
+                    addAttr, connectAttr, polyPlane)
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# maya.cmds
+# ----------------------------------------------------------------------------------------------------------------------
+def _names(nodes, long=False):
+    scene = getScene()
+    return [x.longName if long else scene.shortestName(x) for x in nodes]
+
+
+def cmdsLs(*args, **kwargs):
+    """
+    cmds.ls, names instead of PyNodes and the showType pairs.
+    """
+    nodes = [x._node for x in ls(*args, **kwargs) if isinstance(x, DependNode)]
+    names = _names(nodes, _flag(kwargs, 'long', 'l'))
+    if _flag(kwargs, 'showType', 'st'):
+        return [x for name, node in zip(names, nodes) for x in (name, node.nodeType)]
+    return names
+
+
+def cmdsNodeType(name, **kwargs):
+    if _flag(kwargs, 'isTypeName', 'itn'):
+        return memory_scene.resolveInheritedTypes(name) if _flag(kwargs, 'inherited', 'i') else name
+    return nodeType(name, **kwargs)
+
+
+def cmdsGetAttr(plug, **kwargs):
+    """
+    cmds.getAttr, the multi attributes give their values or their indices with multiIndices.
+    """
+    node, attr = _component(plug)
+    scene = getScene()
+    if _flag(kwargs, 'multiIndices', 'mi'):
+        return scene.getMultiIndices(node, attr) or None
+    value = scene.getAttr(node, attr)
+    if isinstance(value, tuple) and len(value) == 3:
+        return [value]
+    return value
+
+
+def cmdsSetAttr(plug, *values, **kwargs):
+    node, attr = _component(plug)
+    if '[' in attr:
+        attr, _, index = attr.partition('[')
+        getScene().setMulti(node, attr, int(index.rstrip(']')), tuple(values))
+        return
+    getScene().setAttr(node, attr, values[0] if len(values) == 1 else values)
+
+
+def cmdsCreateNode(nodeType, **kwargs):
+    node = getScene().createNode(nodeType, _flag(kwargs, 'name', 'n'), _flag(kwargs, 'parent', 'p'))
+    return getScene().shortestName(node)
+
+
+def cmdsListRelatives(*args, **kwargs):
+    return _names([x._node for x in listRelatives(*args, **kwargs)], _flag(kwargs, 'fullPath', 'f')) or None
+
+
+def cmdsListConnections(*args, **kwargs):
+    return _names([x._node for x in listConnections(*args, **kwargs)]) or None
+
+
+def cmdsSets(*args, **kwargs):
+    return str(sets(*args, **kwargs))
+
+
+def cmdsFile(*args, **kwargs):
+    """
+    cmds.file, only the new scene, the rename, the scene name query and the save. The nodes are kept in memory, the
+    save only writes the header of an ascii file to the scene name.
+    """
+    scene = getScene()
+    if kwargs.get('new'):
+        scene.clear()
+        return ''
+    if _flag(kwargs, 'query', 'q') and _flag(kwargs, 'sceneName', 'sn'):
+        return scene.sceneName
+    if _flag(kwargs, 'rename', 'rn'):
+        scene.sceneName = kwargs.get('rename', kwargs.get('rn'))
+        return scene.sceneName
+    if _flag(kwargs, 'save', 's'):
+        if not scene.sceneName:
+            raise RuntimeError('The scene has no name, rename it before saving.')
+        with open(scene.sceneName, 'w') as fileId:
+            fileId.write('//Maya ASCII 2017 scene\n//Name: %s\nrequires maya "2017";\n'
+                         % os.path.basename(scene.sceneName))
+        return scene.sceneName
+    raise StandInUnsupported('file with %s is not supported by the maya stand-in.' % sorted(kwargs))
+
+
+def cmdsNamespace(*args, **kwargs):
+    name = _flag(kwargs, 'add', 'add')
+    if not name:
+        raise StandInUnsupported('namespace is only supported with add by the maya stand-in.')
+    getScene().addNamespace(name)
+    return name
+
+
+def cmdsPolyPlane(**kwargs):
+    return [str(x) for x in polyPlane(**kwargs)]
+
+
+def cmdsXform(name, **kwargs):
+    """
+    cmds.xform query of the object space position of all the vertices of a mesh.
+    """
+    node, component = _component(name)
+    if not (_flag(kwargs, 'query', 'q') and _flag(kwargs, 'translation', 't') and component == 'vtx[*]'):
+        raise StandInUnsupported('xform is only supported for the vertex positions by the maya stand-in.')
+    return list(_getMeshNode(node).mesh['points'])
+
+
+def cmdsPolyNormalPerVertex(name, **kwargs):
+    """
+    cmds.polyNormalPerVertex query of the frozen normals, the stand-in meshes don't have any.
+    """
+    node, component = _component(name)
+    if not (_flag(kwargs, 'query', 'q') and _flag(kwargs, 'freezeNormal', 'fn')):
+        raise StandInUnsupported('polyNormalPerVertex is only supported for the freezeNormal query.')
+    return [False] * len(_getMeshNode(node).mesh['faceVertices'])
+
+
+_CMDS_FUNCTIONS = {'ls': cmdsLs, 'nodeType': cmdsNodeType, 'getAttr': cmdsGetAttr, 'setAttr': cmdsSetAttr,
+                   'createNode': cmdsCreateNode, 'listRelatives': cmdsListRelatives,
+                   'listConnections': cmdsListConnections, 'sets': cmdsSets, 'file': cmdsFile,
+                   'namespace': cmdsNamespace, 'polyPlane': cmdsPolyPlane, 'xform': cmdsXform,
+                   'polyNormalPerVertex': cmdsPolyNormalPerVertex, 'objExists': objExists, 'delete': delete,
+                   'select': select, 'namespaceInfo': namespaceInfo, 'playbackOptions': playbackOptions,
+                   'rename': lambda node, name: str(rename(node, name)),
+                   'parent': lambda *args, **kwargs: [str(x) for x in parent(*args, **kwargs)], 'addAttr': addAttr,
+                   'connectAttr': connectAttr}
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# maya.api.OpenMaya
+# ----------------------------------------------------------------------------------------------------------------------
+def _getMeshNode(node):
+    if node.mesh is None:
+        shapes = [x for x in node.children if x.mesh is not None]
+        if not shapes:
+            raise RuntimeError('%s is not a mesh.' % node.longName)
+        node = shapes[0]
+    return node
+
+
+class MDagPath(object):
+    def __init__(self, node=None):
+        super(MDagPath, self).__init__()
+        self._node = node
+
+    def fullPathName(self):
+        return self._node.longName
+
+    def partialPathName(self):
+        return getScene().shortestName(self._node)
+
+
+class MSelectionList(object):
+    def __init__(self):
+        super(MSelectionList, self).__init__()
+        self._nodes = list()
+
+    def add(self, name):
+        self._nodes.append(getScene().getNode(str(name)))
+        return self
+
+    def length(self):
+        return len(self._nodes)
+
+    def getDagPath(self, index):
+        return MDagPath(self._nodes[index])
+
+
+class MFnMesh(object):
+    """
+    The mesh function set of the stand-in meshes, one uv set and one uv shell.
+    """
+    def __init__(self, dagPath):
+        super(MFnMesh, self).__init__()
+        self._mesh = _getMeshNode(dagPath._node).mesh
+        self._edges = None
+
+    @property
+    def numVertices(self):
+        return len(self._mesh['points']) // 3
+
+    @property
+    def numPolygons(self):
+        return len(self._mesh['faceCounts'])
+
+    def getVertices(self):
+        return list(self._mesh['faceCounts']), list(self._mesh['faceVertices'])
+
+    def _getEdges(self):
+        # the edges are numbered in the order the faces first use them.
+        if self._edges is not None:
+            return self._edges
+        edges = list()
+        known = set()
+        offset = 0
+        faceVertices = self._mesh['faceVertices']
+        for count in self._mesh['faceCounts']:
+            vertices = faceVertices[offset:offset + count]
+            offset += count
+            for index in range(count):
+                edge = tuple(sorted((vertices[index], vertices[(index + 1) % count])))
+                if edge not in known:
+                    known.add(edge)
+                    edges.append(edge)
+        self._edges = edges
+        return edges
+
+    @property
+    def numEdges(self):
+        return len(self._getEdges())
+
+    def getEdgeVertices(self, edgeId):
+        return self._getEdges()[edgeId]
+
+    def getUVSetNames(self):
+        return ['map1']
+
+    def getUVs(self, uvSet='map1'):
+        return list(self._mesh['us']), list(self._mesh['vs'])
+
+    def getAssignedUVs(self, uvSet='map1'):
+        return list(self._mesh['faceCounts']), list(self._mesh['uvIds'])
+
+    def getUvShellsIds(self, uvSet='map1'):
+        return 1, [0] * len(self._mesh['us'])
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# install
+# ----------------------------------------------------------------------------------------------------------------------
+def buildModules():
+    """
+    Build the stand-in modules.
+    :return: the modules by name.
+    :rtype: dict
+    """
+    modules = dict((name, StandInModule(name)) for name in STANDIN_MODULES)
+    for name, module in modules.items():
+        parentName, _, childName = name.rpartition('.')
+        if parentName:
+            setattr(modules[parentName], childName, module)
+
+    datatypes = modules['pymel.core.datatypes']
+    datatypes.Vector = Vector
+    datatypes.EulerRotation = EulerRotation
+
+    pymelCore = modules['pymel.core']
+    for function in _PYMEL_FUNCTIONS:
+        setattr(pymelCore, function.__name__, function)
+    pymelCore.PyNode = PyNode
+    pymelCore.Attribute = Attribute
+    pymelCore.dt = datatypes
+
+    cmds = modules['maya.cmds']
+    for name, function in _CMDS_FUNCTIONS.items():
+        setattr(cmds, name, function)
+
+    openMaya = modules['maya.api.OpenMaya']
+    openMaya.MSelectionList = MSelectionList
+    openMaya.MDagPath = MDagPath
+    openMaya.MFnMesh = MFnMesh
+    return modules
+
+
+def isInstalled():
+    return _STATE['saved'] is not None
+
+
+def install(scene=None):
+    """
+    Put the stand-in modules in sys.modules, the replaced modules are restored by uninstall.
+    :param scene: the scene to answer from, the current one (a new one the first time) if not given.
+    :type scene: memory_scene.MemoryScene
+    :return: the scene.
+    :rtype: memory_scene.MemoryScene
+    """
+    if scene is not None:
+        setScene(scene)
+    if not isInstalled():
+        _STATE['saved'] = dict((x, sys.modules.get(x)) for x in STANDIN_MODULES)
+        sys.modules.update(buildModules())
+    return getScene()
+
+
+def uninstall():
+    """
+    Restore the modules replaced by install. The check modules imported meanwhile keep the stand-in.
+    """
+    if not isInstalled():
+        return
+    for name, module in _STATE['saved'].items():
+        if module is None:
+            sys.modules.pop(name, None)
+        else:
+            sys.modules[name] = module
+    _STATE['saved'] = None
+
+
+@contextlib.contextmanager
+def installed(scene=None):
+    """
+    The stand-in installed for the block.
+    :rtype: memory_scene.MemoryScene
+    """
+    wasInstalled = isInstalled()
+    previousScene = _STATE['scene']
+    try:
+        yield install(scene)
+    finally:
+        _STATE['scene'] = previousScene
+        if not wasInstalled:
+            uninstall()
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# backend
+# ----------------------------------------------------------------------------------------------------------------------
+class MemoryBackend(validations.SceneBackend):
+    """
+    The validations backend of a MemoryScene, the checks reach it through the stand-in modules.
+    """
+    name = 'memory'
+
+    def __init__(self, scene=None):
+        """
+        :param scene: the scene to validate, an empty new scene if not given.
+        :type scene: memory_scene.MemoryScene
+        """
+        super(MemoryBackend, self).__init__()
+        self.scene = scene if scene is not None else memory_scene.MemoryScene()
+        self._previousScenes = list()
+
+    @classmethod
+    def fromAsciiFile(cls, path):
+        """
+        The backend of the scene written in a maya ascii file.
+        :param path: the .ma file.
+        :type path: str
+        :return:
+        :rtype: MemoryBackend
+        """
+        return cls(memory_scene.MemoryScene.fromAsciiFile(path))
+
+    def activate(self):
+        self._previousScenes.append(_STATE['scene'])
+        install(self.scene)
+
+    def deactivate(self):
+        if self._previousScenes:
+            setScene(self._previousScenes.pop())
+
+    def buildSnapshot(self):
+        return self.scene.snapshot()
@@ -0,0 +1,685 @@
+"""
+In-memory maya scene graph. It holds the nodes with their type, dag parent, attributes and connections, the references
+and the mesh arrays of the mesh nodes, enough to answer the queries the checks make. It is what the maya stand-in (see
+maya_standin) answers from, so the checks and the benchmarks can run on a plain python without maya.
+
+A scene is filled from a maya ascii file (MemoryScene.fromAsciiFile) or with a SceneBuilder in the fixtures. Only the
+node types the checks look at are known, with their inheritance, the other types derive from dependNode.
+"""
+# General Imports.
+import fnmatch
+import re
+
+from Validations.core import scene_snapshot
+from Validations.core.ascii import maReader
+
+# parent type of every known node type, like nodeType(inherited=True) resolves it.
+NODE_TYPE_PARENTS = {'dependNode': None,
+                     'entity': 'dependNode',
+                     'containerBase': 'entity',
+                     'dagNode': 'entity',
+                     'transform': 'dagNode',
+                     'joint': 'transform',
+                     'ikHandle': 'transform',
+                     'constraint': 'transform',
+                     'unknownTransform': 'transform',
+                     'unknownDag': 'dagNode',
+                     'shape': 'dagNode',
+                     'camera': 'shape',
+                     'imagePlane': 'shape',
+                     'locator': 'shape',
+                     'light': 'shape',
+                     'renderLight': 'light',
+                     'nonAmbientLightShapeNode': 'renderLight',
+                     'nonExtendedLightShapeNode': 'nonAmbientLightShapeNode',
+                     'pointLight': 'nonExtendedLightShapeNode',
+                     'directionalLight': 'nonExtendedLightShapeNode',
+                     'geometryShape': 'shape',
+                     'deformableShape': 'geometryShape',
+                     'controlPoint': 'deformableShape',
+                     'surfaceShape': 'controlPoint',
+                     'mesh': 'surfaceShape',
+                     'nurbsSurface': 'surfaceShape',
+                     'curveShape': 'controlPoint',
+                     'nurbsCurve': 'curveShape',
+                     'objectSet': 'entity',
+                     'shadingEngine': 'objectSet',
+                     'texture2d': 'dependNode',
+                     'file': 'texture2d',
+                     'aiImage': 'dependNode',
+                     'shot': 'dependNode',
+                     'sequencer': 'dependNode',
+                     'audio': 'dependNode',
+                     'reference': 'dependNode',
+                     'displayLayer': 'dependNode',
+                     'renderLayer': 'dependNode',
+                     'unknown': 'dependNode'}
+
+# the short names of the attributes, the values are kept under the long names.
+ATTRIBUTE_ALIASES = {'t': 'translate', 'tx': 'translateX', 'ty': 'translateY', 'tz': 'translateZ',
+                     'r': 'rotate', 'rx': 'rotateX', 'ry': 'rotateY', 'rz': 'rotateZ',
+                     's': 'scale', 'sx': 'scaleX', 'sy': 'scaleY', 'sz': 'scaleZ',
+                     'v': 'visibility', 'ftn': 'fileTextureName', 'st': 'startFrame', 'et': 'endFrame',
+                     'sst': 'sequenceStartFrame', 'se': 'sequenceEndFrame', 'dsm': 'dagSetMembers'}
+
+# the double3 attributes, their children read and write one value of the parent.
+COMPOUND_CHILDREN = {'translate': ('translateX', 'translateY', 'translateZ'),
+                     'rotate': ('rotateX', 'rotateY', 'rotateZ'),
+                     'scale': ('scaleX', 'scaleY', 'scaleZ')}
+
+_COMPOUND_PARENTS = dict((child, (parent, index)) for parent, children in COMPOUND_CHILDREN.items()
+                         for index, child in enumerate(children))
+
+# the attributes every node of the type has, with their default value.
+DEFAULT_ATTRIBUTES = {'dagNode': {'visibility': True},
+                      'transform': {'translate': (0.0, 0.0, 0.0), 'rotate': (0.0, 0.0, 0.0),
+                                    'scale': (1.0, 1.0, 1.0)},
+                      'surfaceShape': {'castsShadows': True, 'receiveShadows': True, 'motionBlur': True,
+                                       'primaryVisibility': True, 'smoothShading': True, 'visibleInReflections': True,
+                                       'visibleInRefractions': True, 'doubleSided': False, 'opposite': False},
+                      'file': {'fileTextureName': ''},
+                      'aiImage': {'filename': ''},
+                      'shot': {'startFrame': 1.0, 'endFrame': 1.0, 'sequenceStartFrame': 1.0,
+                               'sequenceEndFrame': 1.0}}
+
+
+# the nodes of a new maya scene, (name, type, parent).
+DEFAULT_NODES = (('persp', 'transform', None), ('perspShape', 'camera', 'persp'),
+                 ('top', 'transform', None), ('topShape', 'camera', 'top'),
+                 ('front', 'transform', None), ('frontShape', 'camera', 'front'),
+                 ('side', 'transform', None), ('sideShape', 'camera', 'side'),
+                 ('defaultLayer', 'displayLayer', None), ('defaultRenderLayer', 'renderLayer', None))
+
+
+# the playback ranges saved in the sceneConfigurationScriptNode of the maya ascii files.
+_PLAYBACK_RE = re.compile(r'-(min|max|ast|aet)\s+([-0-9.]+)')
+_PLAYBACK_FLAGS = {'min': 'min', 'max': 'max', 'ast': 'animationStartTime', 'aet': 'animationEndTime'}
+
+
+def resolveInheritedTypes(nodeType):
+    """
+    Return the types the node type derives from, the root first and itself last, like nodeType(inherited=True).
+    :param nodeType: the node type.
+    :type nodeType: str
+    :return:
+    :rtype: list
+    """
+    types = list()
+    current = nodeType
+    while current:
+        types.insert(0, current)
+        if current in NODE_TYPE_PARENTS:
+            current = NODE_TYPE_PARENTS[current]
+        elif current.endswith('Constraint'):
+            current = 'constraint'
+        else:
+            current = 'dependNode'
+    return types
+
+
+def isDagType(nodeType):
+    return 'dagNode' in resolveInheritedTypes(nodeType)
+
+
+def longAttributeName(attr):
+    return ATTRIBUTE_ALIASES.get(attr, attr)
+
+
+def gridMesh(subdivisionsX, subdivisionsY, width=1.0, height=1.0):
+    """
+    Return the arrays of a plane of quads on the xz plane, like polyPlane builds it.
+    :param subdivisionsX: the number of faces along x.
+    :type subdivisionsX: int
+    :param subdivisionsY: the number of faces along z.
+    :type subdivisionsY: int
+    :return: points (flat x, y, z), faceCounts, faceVertices, us, vs
+    :rtype: tuple
+    """
+    points = list()
+    us = list()
+    vs = list()
+    for row in range(subdivisionsY + 1):
+        for column in range(subdivisionsX + 1):
+            u = float(column) / subdivisionsX
+            v = float(row) / subdivisionsY
+            points.extend(((u - 0.5) * width, 0.0, (0.5 - v) * height))
+            us.append(u)
+            vs.append(v)
+    faceCounts = list()
+    faceVertices = list()
+    rowSize = subdivisionsX + 1
+    for row in range(subdivisionsY):
+        for column in range(subdivisionsX):
+            first = row * rowSize + column
+            faceCounts.append(4)
+            faceVertices.extend((first, first + 1, first + rowSize + 1, first + rowSize))
+    return points, faceCounts, faceVertices, us, vs
+
+
+class MemoryNode(object):
+    """
+    One node of the MemoryScene.
+    """
+    def __init__(self, name, nodeType, parent=None, referenced=False):
+        super(MemoryNode, self).__init__()
+        self.name = name
+        self.nodeType = nodeType
+        self.parent = parent
+        self.children = list()
+        self.referenced = referenced
+        self.isDag = isDagType(nodeType)
+        self.attrs = dict()
+        for eachType in resolveInheritedTypes(nodeType):
+            self.attrs.update(DEFAULT_ATTRIBUTES.get(eachType, dict()))
+        # the multi attributes, by attribute the values by logical index.
+        self.multis = dict()
+        # members of the sets.
+        self.members = list()
+        # mesh arrays, see MemoryScene.setMesh.
+        self.mesh = None
+        self.deleted = False
+
+    @property
+    def longName(self):
+        if not self.isDag:
+            return self.name
+        names = list()
+        node = self
+        while node is not None:
+            names.insert(0, node.name)
+            node = node.parent
+        return '|' + '|'.join(names)
+
+    def __repr__(self):
+        return 'MemoryNode(%r, %r)' % (self.longName, self.nodeType)
+
+
+class MemoryScene(object):
+    """
+    The scene graph, the nodes are kept in their creation order like maya lists them.
+    """
+    def __init__(self, sceneName='', defaultNodes=True):
+        super(MemoryScene, self).__init__()
+        self.clear(sceneName, defaultNodes)
+
+    def clear(self, sceneName='', defaultNodes=True):
+        """
+        Empty the scene, like a new file.
+        :param sceneName: the file of the scene.
+        :type sceneName: str
+        :param defaultNodes: create the default cameras and layers of a new maya scene.
+        :type defaultNodes: bool
+        """
+        self.sceneName = sceneName
+        self.nodes = list()
+        self._byName = dict()
+        self.connections = list()
+        self.namespaces = list()
+        self.requires = list()
+        self.references = list()
+        self.playback = {'min': 1.0, 'max': 24.0, 'animationStartTime': 1.0, 'animationEndTime': 24.0}
+        self.selection = list()
+        if defaultNodes:
+            for name, nodeType, parent in DEFAULT_NODES:
+                self.createNode(nodeType, name, parent)
+
+    def __len__(self):
+        return len(self.nodes)
+
+    @classmethod
+    def fromAsciiFile(cls, path):
+        """
+        Build the scene written in a maya ascii file, in one streaming pass. The content of the references is not
+        read, only their reference node and namespace, and the meshes have no geometry.
+        :param path: the .ma file.
+        :type path: str
+        :return:
+        :rtype: MemoryScene
+        """
+        if not path.lower().endswith('.ma'):
+            raise ValueError('Only the maya ascii files can be read in memory : %s' % path)
+        scene = cls(path, defaultNodes=False)
+        with open(path, 'r') as readId:
+            SceneGraphReader(readId, scene).parse()
+        return scene
+
+    def snapshot(self):
+        """
+        The SceneSnapshot of the scene, built without going through the maya stand-in.
+        :return:
+        :rtype: scene_snapshot.SceneSnapshot
+        """
+        return scene_snapshot.SceneSnapshot([(x.longName, x.nodeType) for x in self.nodes],
+                                            [x.longName for x in self.nodes if x.referenced],
+                                            resolveInheritedTypes)
+
+    # ------------------------------------------------------------------------------------------------------------------
+    # nodes
+    # ------------------------------------------------------------------------------------------------------------------
+    def _uniqueName(self, name, parent):
+        siblings = [x for x in self._byName.get(name, list()) if not x.isDag or x.parent is parent]
+        if not siblings:
+            return name
+        base = name.rstrip('0123456789')
+        index = 1
+        while True:
+            candidate = '%s%s' % (base, index)
+            if not [x for x in self._byName.get(candidate, list()) if not x.isDag or x.parent is parent]:
+                return candidate
+            index += 1
+
+    def createNode(self, nodeType, name=None, parent=None, referenced=False):
+        """
+        Create a node, the name is made unique like maya does.
+        :param nodeType: the node type.
+        :type nodeType: str
+        :param name: the node name, "<type>1" if not given.
+        :type name: str
+        :param parent: the dag parent, a name or a MemoryNode.
+        :type parent: str
+        :param referenced: the node comes from a reference.
+        :type referenced: bool
+        :return:
+        :rtype: MemoryNode
+        """
+        parentNode = self.getNode(parent) if parent is not None else None
+        name = self._uniqueName(name or '%s1' % nodeType, parentNode)
+        namespace = name.rpartition(':')[0]
+        if namespace:
+            self.addNamespace(namespace)
+        node = MemoryNode(name, nodeType, referenced=referenced)
+        if parentNode is not None:
+            node.isDag = True
+            parentNode.isDag = True
+            node.parent = parentNode
+            parentNode.children.append(node)
+        self.nodes.append(node)
+        self._byName.setdefault(name, list()).append(node)
+        return node
+
+    def findNodes(self, name):
+        """
+        Return the nodes matching a short name, a partial or full dag path.
+        :param name: the node name, the attribute or component part is ignored.
+        :type name: str
+        :return:
+        :rtype: list
+        """
+        if isinstance(name, MemoryNode):
+            return [name] if not name.deleted else list()
+        name = str(name).split('.', 1)[0]
+        leaf = name.rsplit('|', 1)[-1]
+        candidates = self._byName.get(leaf, list())
+        if '|' not in name:
+            return list(candidates)
+        return [x for x in candidates if x.longName.endswith(name if name.startswith('|') else '|' + name)]
+
+    def getNode(self, name):
+        """
+        Return the node of the name, error if it doesn't exist or isn't unique.
+        :rtype: MemoryNode
+        """
+        nodes = self.findNodes(name)
+        if not nodes:
+            raise ValueError('No object matches name: %s' % name)
+        if len(nodes) > 1:
+            raise ValueError('More than one object matches name: %s' % name)
+        return nodes[0]
+
+    def objExists(self, name):
+        """
+        Check if the node, or the node attribute when the name has one, exists.
+        """
+        nodes = self.findNodes(name)
+        if not nodes:
+            return False
+        if '.' in str(name):
+            attr = str(name).split('.', 1)[1]
+            return '[' in attr or self.hasAttr(nodes[0], attr)
+        return True
+
+    def shortestName(self, node):
+        """
+        The shortest unique name of the node, like pymel prints it.
+        """
+        if not node.isDag or len(self._byName.get(node.name, list())) < 2:
+            return node.name
+        return node.longName
+
+    def rename(self, node, name):
+        self._byName[node.name].remove(node)
+        node.name = self._uniqueName(name, node.parent)
+        self._byName.setdefault(node.name, list()).append(node)
+        return node
+
+    def parent(self, node, parent=None):
+        """
+        Move a dag node under the parent, to the world if it is None.
+        """
+        if node.parent is not None:
+            node.parent.children.remove(node)
+        node.parent = parent
+        node.isDag = True
+        if parent is not None:
+            parent.isDag = True
+            parent.children.append(node)
+
+    def delete(self, node):
+        """
+        Delete the node with its dag children and their connections.
+        """
+        for child in list(node.children):
+            self.delete(child)
+        if node.parent is not None and node in node.parent.children:
+            node.parent.children.remove(node)
+        node.deleted = True
+        self.nodes.remove(node)
+        self._byName[node.name].remove(node)
+        self.connections = [x for x in self.connections if x[0] is not node and x[2] is not node]
+        for each in self.nodes:
+            if node in each.members:
+                each.members.remove(node)
+
+    def ls(self, type=None, exactType=None, referenced=None):
+        """
+        Return the nodes in the creation order, filtered by inherited or exact type.
+        :rtype: list
+        """
+        nodes = self.nodes
+        if type is not None:
+            types = set([type] if isinstance(type, basestring) else type)
+            inherited = dict()
+            result = list()
+            for node in nodes:
+                if node.nodeType not in inherited:
+                    inherited[node.nodeType] = bool(types.intersection(resolveInheritedTypes(node.nodeType)))
+                if inherited[node.nodeType]:
+                    result.append(node)
+            nodes = result
+        if exactType is not None:
+            types = set([exactType] if isinstance(exactType, basestring) else exactType)
+            nodes = [x for x in nodes if x.nodeType in types]
+        if referenced is not None:
+            nodes = [x for x in nodes if x.referenced == referenced]
+        return list(nodes)
+
+    def match(self, pattern):
+        """
+        Return the nodes whose short name matches the fnmatch pattern.
+        """
+        if not any(x in pattern for x in '*?['):
+            return self.findNodes(pattern)
+        return [x for x in self.nodes if fnmatch.fnmatchcase(x.name, pattern.rsplit('|', 1)[-1])]
+
+    def assemblies(self):
+        return [x for x in self.nodes if x.isDag and x.parent is None]
+
+    def descendants(self, node):
+        found = list()
+        for child in node.children:
+            found.append(child)
+            found.extend(self.descendants(child))
+        return found
+
+    # ------------------------------------------------------------------------------------------------------------------
+    # attributes
+    # ------------------------------------------------------------------------------------------------------------------
+    def hasAttr(self, node, attr):
+        attr = longAttributeName(attr)
+        if attr in node.attrs or attr in node.multis:
+            return True
+        return attr in _COMPOUND_PARENTS and _COMPOUND_PARENTS[attr][0] in node.attrs
+
+    def addAttr(self, node, attr, defaultValue=None):
+        node.attrs.setdefault(longAttributeName(attr), defaultValue)
+
+    def getAttr(self, node, attr):
+        """
+        Return the value of the attribute, error if the node doesn't have it.
+        """
+        attr = longAttributeName(attr)
+        if attr in node.attrs:
+            return node.attrs[attr]
+        if attr in _COMPOUND_PARENTS and _COMPOUND_PARENTS[attr][0] in node.attrs:
+            parentAttr, index = _COMPOUND_PARENTS[attr]
+            return node.attrs[parentAttr][index]
+        if attr in node.multis:
+            multi = node.multis[attr]
+            return [multi[x] for x in sorted(multi)]
+        raise ValueError('No attribute named %s on %s' % (attr, node.longName))
+
+    def setAttr(self, node, attr, value):
+        attr = longAttributeName(attr)
+        if attr in _COMPOUND_PARENTS and _COMPOUND_PARENTS[attr][0] in node.attrs:
+            parentAttr, index = _COMPOUND_PARENTS[attr]
+            values = list(node.attrs[parentAttr])
+            values[index] = value
+            node.attrs[parentAttr] = tuple(values)
+        elif attr in COMPOUND_CHILDREN:
+            node.attrs[attr] = tuple(float(x) for x in value)
+        else:
+            node.attrs[attr] = value
+
+    def setMulti(self, node, attr, index, value):
+        node.multis.setdefault(longAttributeName(attr), dict())[index] = value
+
+    def getMultiIndices(self, node, attr):
+        return sorted(node.multis.get(longAttributeName(attr), dict()))
+
+    def connectAttr(self, source, destination):
+        """
+        Connect two plugs given as "node.attr".
+        """
+        sourceNode, sourceAttr = source.split('.', 1)
+        destinationNode, destinationAttr = destination.split('.', 1)
+        self.connections.append((self.getNode(sourceNode), sourceAttr, self.getNode(destinationNode),
+                                 destinationAttr))
+
+    def listConnections(self, node, source=True, destination=True):
+        """
+        Return the (attr, other node, other attr) of the connections of the node, its inputs first.
+        """
+        found = list()
+        for sourceNode, sourceAttr, destinationNode, destinationAttr in self.connections:
+            if source and destinationNode is node:
+                found.append((destinationAttr, sourceNode, sourceAttr))
+            if destination and sourceNode is node:
+                found.append((sourceAttr, destinationNode, destinationAttr))
+        return found
+
+    # ------------------------------------------------------------------------------------------------------------------
+    # scene
+    # ------------------------------------------------------------------------------------------------------------------
+    def addNamespace(self, namespace):
+        parts = namespace.strip(':').split(':')
+        for index in range(len(parts)):
+            name = ':'.join(parts[:index + 1])
+            if name not in self.namespaces:
+                self.namespaces.append(name)
+
+    def addReference(self, path, namespace='', referenceNode=None):
+        """
+        Add a reference, its reference node and its namespace.
+        :param path: the referenced file.
+        :type path: str
+        :param namespace: the namespace of the reference.
+        :type namespace: str
+        :param referenceNode: the reference node name, <namespace>RN by default.
+        :type referenceNode: str
+        :return: the reference node.
+        :rtype: MemoryNode
+        """
+        referenceNode = referenceNode or '%sRN' % (namespace or 'reference')
+        nodes = self.findNodes(referenceNode)
+        node = nodes[0] if nodes else self.createNode('reference', referenceNode)
+        if namespace:
+            self.addNamespace(namespace)
+        if (path, namespace, node.name) not in self.references:
+            self.references.append((path, namespace, node.name))
+        return node
+
+    def setMesh(self, node, points, faceCounts, faceVertices, us=None, vs=None, uvIds=None):
+        """
+        Give the arrays of a mesh node, the uvs default to one uv per vertex.
+        :param points: flat x, y, z positions.
+        :type points: list
+        :param faceCounts: the number of vertices of every face.
+        :type faceCounts: list
+        :param faceVertices: the vertices of every face, face by face.
+        :type faceVertices: list
+        """
+        vertexCount = len(points) // 3
+        node.mesh = {'points': list(points),
+                     'faceCounts': list(faceCounts),
+                     'faceVertices': list(faceVertices),
+                     'us': list(us) if us is not None else [0.0] * vertexCount,
+                     'vs': list(vs) if vs is not None else [0.0] * vertexCount,
+                     'uvIds': list(uvIds) if uvIds is not None else list(faceVertices)}
+
+    def polyPlane(self, name='pPlane1', subdivisionsX=10, subdivisionsY=10, width=1.0, height=1.0, parent=None):
+        """
+        Create a plane mesh with its transform.
+        :return: the transform and the shape.
+        :rtype: tuple
+        """
+        transform = self.createNode('transform', name, parent)
+        shape = self.createNode('mesh', '%sShape' % transform.name, transform)
+        points, faceCounts, faceVertices, us, vs = gridMesh(subdivisionsX, subdivisionsY, width, height)
+        self.setMesh(shape, points, faceCounts, faceVertices, us, vs)
+        return transform, shape
+
+
+class SceneGraphReader(maReader.MayaAsciiReader):
+    """
+    Fills a MemoryScene from a maya ascii file, every attribute set in the file is kept.
+    """
+    def __init__(self, stream, scene):
+        super(SceneGraphReader, self).__init__(stream)
+        self.scene = scene
+        # the node the setAttr and addAttr without a node name go to, the last created or selected one.
+        self.currentMemoryNode = None
+        self._handlers['addAttr'] = self._addAttr
+
+    def _getNode(self, name):
+        """
+        Return the node of the name used in a statement, a short name or a partial or full dag path. When it matches
+        several nodes the last one created wins.
+        :rtype: MemoryNode
+        """
+        nodes = self.scene.findNodes(name.lstrip(':')) if name else list()
+        return nodes[-1] if nodes else None
+
+    def _addAttr(self, args):
+        flags, positional = maReader.splitArgs(maReader.tokenize(args), ('-ln', '-longName', '-sn', '-shortName',
+                                                                         '-nn', '-at', '-dt', '-dv', '-p', '-nc',
+                                                                         '-min', '-max', '-smn', '-smx', '-en', '-ci',
+                                                                         '-h', '-k', '-r', '-w', '-s'))
+        name = flags.get('-ln') or flags.get('-longName')
+        node = self._getNode(positional[0]) if positional else self.currentMemoryNode
+        if name and node is not None:
+            self.scene.addAttr(node, name, maReader.toValue(flags['-dv'], False) if '-dv' in flags else None)
+
+    def on_requires(self, plugin, version):
+        self.scene.requires.append((plugin, version))
+
+    def on_file_reference(self, path, namespace, referenceNode):
+        self.scene.addReference(path, namespace, referenceNode or None)
+
+    def on_create_node(self, nodetype, name, parent):
+        if nodetype == 'reference' and self._getNode(name) is not None:
+            self.currentMemoryNode = self._getNode(name)
+            return
+        parentNode = self._getNode(parent) if parent else None
+        self.currentMemoryNode = self.scene.createNode(nodetype, name, parentNode)
+
+    def on_select(self, name):
+        self.currentMemoryNode = self._getNode(name)
+
+    def wants_set_attr(self, name):
+        return '[' not in name
+
+    def on_set_attr(self, name, value, type):
+        nodeName, _, attr = name.rpartition('.')
+        node = self._getNode(nodeName) if nodeName else self.currentMemoryNode
+        if node is None:
+            return
+        if attr in ('b', 'before') and node.name == 'sceneConfigurationScriptNode':
+            for flag, frame in _PLAYBACK_RE.findall(str(value)):
+                self.scene.playback[_PLAYBACK_FLAGS[flag]] = float(frame)
+        if isinstance(value, list) and len(value) == 3 and longAttributeName(attr) in COMPOUND_CHILDREN:
+            value = tuple(value)
+        self.scene.setAttr(node, attr, value)
+
+    def on_connect_attr(self, source, destination):
+        sourceNode, sourceAttr = source.lstrip(':').split('.', 1)
+        destinationNode, destinationAttr = destination.lstrip(':').split('.', 1)
+        sourceNode = self._getNode(sourceNode)
+        destinationNode = self._getNode(destinationNode)
+        if sourceNode is not None and destinationNode is not None:
+            self.scene.connections.append((sourceNode, sourceAttr, destinationNode, destinationAttr))
+
+
+class SceneBuilder(object):
+    """
+    Builds the scenes of the fixtures in a few chained calls:
+
+        scene = SceneBuilder().transform('rig_group').transform('Main_CTRL', parent='rig_group', translate=(1, 0, 0))
+                              .node('shot', 'SH0010', startFrame=1, endFrame=100).build()
+    """
+    def __init__(self, sceneName='', defaultNodes=True):
+        super(SceneBuilder, self).__init__()
+        self.scene = MemoryScene(sceneName, defaultNodes)
+
+    def node(self, nodeType, name, parent=None, referenced=False, **attrs):
+        """
+        Add a node with the given attribute values, the custom attributes are added.
+        """
+        node = self.scene.createNode(nodeType, name, parent, referenced)
+        for attr, value in attrs.items():
+            if not self.scene.hasAttr(node, attr):
+                self.scene.addAttr(node, attr)
+            self.scene.setAttr(node, attr, value)
+        return self
+
+    def transform(self, name, parent=None, **attrs):
+        return self.node('transform', name, parent, **attrs)
+
+    def mesh(self, name, parent=None, subdivisions=1, **attrs):
+        """
+        Add a plane mesh with its transform, the attributes go on the shape.
+        """
+        transform, shape = self.scene.polyPlane(name, subdivisions, subdivisions, parent=parent)
+        for attr, value in attrs.items():
+            if not self.scene.hasAttr(shape, attr):
+                self.scene.addAttr(shape, attr)
+            self.scene.setAttr(shape, attr, value)
+        return self
+
+    def set(self, name, members, nodeType='objectSet'):
+        objectSet = self.scene.createNode(nodeType, name)
+        objectSet.members.extend(self.scene.getNode(x) for x in members)
+        return self
+
+    def connect(self, source, destination):
+        self.scene.connectAttr(source, destination)
+        return self
+
+    def reference(self, path, namespace, referencedNodes=()):
+        """
+        Add a reference with the (type, name) of the nodes it brings, their names get the namespace.
+        """
+        self.scene.addReference(path, namespace)
+        for nodeType, name in referencedNodes:
+            self.scene.createNode(nodeType, '%s:%s' % (namespace, name), referenced=True)
+        return self
+
+    def requires(self, plugin, version=''):
+        self.scene.requires.append((plugin, version))
+        return self
+
+    def playback(self, start, end):
+        self.scene.playback.update({'min': float(start), 'max': float(end)})
+        return self
+
+    def build(self):
+        return self.scene
@@ -0,0 +1,611 @@
+"""
+Bulk mesh data for the geometry checks. Every array of a mesh is read with one call and kept on a MeshData, the per
+component tests are then done on the whole arrays at once, with numpy when it is installed and in plain python
+otherwise. The offending components are reported as index ranges, like maya does ("pCubeShape1.vtx[0:12]").
+
+The MeshData and the analysis results are cached on the ValidationRun (getMeshData, getTopology), so the checks of a
+run looking at the same mesh share one read and one analysis.
+"""
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# a corner is concave when its turn goes against the face normal by more than this, relative to the vector lengths.
+CONCAVE_TOLERANCE = 1e-6
+# border vertices closer than this are taken as the two sides of an unmerged seam.
+MERGE_TOLERANCE = 1e-4
+
+
+def indexRanges(indices):
+    """
+    Compact the indices into (start, end) ranges, end included.
+    :param indices: the component indices, in any order.
+    :type indices: iterable
+    :return:
+    :rtype: list
+    """
+    ranges = list()
+    for index in sorted(set(indices)):
+        if ranges and index == ranges[-1][1] + 1:
+            ranges[-1][1] = index
+        else:
+            ranges.append([index, index])
+    return [tuple(x) for x in ranges]
+
+
+def componentRanges(meshName, indices, component='vtx'):
+    """
+    Return the maya component names covering the indices, one per range.
+    :param meshName: the mesh the components belong to.
+    :type meshName: str
+    :param indices: the component indices.
+    :type indices: iterable
+    :param component: the component type, vtx, f, e or map.
+    :type component: str
+    :return:
+    :rtype: list
+    """
+    components = list()
+    for start, end in indexRanges(indices):
+        if start == end:
+            components.append('%s.%s[%s]' % (meshName, component, start))
+        else:
+            components.append('%s.%s[%s:%s]' % (meshName, component, start, end))
+    return components
+
+
+def nonZeroRows(indices, values, tolerance=0.0):
+    """
+    Return the indices whose row of values has a component further than the tolerance from zero.
+    :param indices: the index of every row.
+    :type indices: list
+    :param values: the rows, like the (x, y, z) of the tweaks.
+    :type values: list
+    :param tolerance: the largest absolute value taken as zero.
+    :type tolerance: float
+    :return:
+    :rtype: list
+    """
+    if not len(indices):
+        return list()
+    if numpy is not None:
+        rows = numpy.asarray(values, dtype=float).reshape(len(indices), -1)
+        mask = (numpy.abs(rows) > tolerance).any(axis=1)
+        return numpy.asarray(indices)[mask].tolist()
+    return [index for index, row in zip(indices, values) if any(abs(x) > tolerance for x in row)]
+
+
+def faceVertexOwners(faceVertices, vertexCount):
+    """
+    Return the vertex of every vertex-face, in the vertex major order maya expands vtxFace[*][*] in.
+    :param faceVertices: the vertex of every face-vertex, face by face.
+    :type faceVertices: list
+    :param vertexCount: the number of vertices of the mesh.
+    :type vertexCount: int
+    :return:
+    :rtype: list
+    """
+    if numpy is not None:
+        counts = numpy.bincount(numpy.asarray(faceVertices, dtype=int), minlength=vertexCount)
+        return numpy.repeat(numpy.arange(vertexCount), counts)
+    counts = [0] * vertexCount
+    for vertex in faceVertices:
+        counts[vertex] += 1
+    owners = list()
+    for vertex, count in enumerate(counts):
+        owners.extend([vertex] * count)
+    return owners
+
+
+def flaggedOwners(owners, flags):
+    """
+    Return the sorted owners of the flags that are set.
+    :param owners: the owner of every flag.
+    :type owners: list
+    :param flags: the flags.
+    :type flags: list
+    :return:
+    :rtype: list
+    """
+    if numpy is not None:
+        return numpy.unique(numpy.asarray(owners)[numpy.asarray(flags, dtype=bool)]).tolist()
+    return sorted(set(owner for owner, flag in zip(owners, flags) if flag))
+
+
+class MeshData(object):
+    """
+    The arrays of one mesh, each one read from maya the first time it is asked for. They can be given to the
+    constructor instead, for a mesh that is not in a maya scene.
+    """
+    def __init__(self, name, **arrays):
+        super(MeshData, self).__init__()
+        self.name = name
+        self._arrays = dict(arrays)
+
+    def _get(self, key, reader):
+        if key not in self._arrays:
+            self._arrays[key] = reader()
+        return self._arrays[key]
+
+    def _getFnMesh(self):
+        import maya.api.OpenMaya as om
+
+        selection = om.MSelectionList()
+        selection.add(self.name)
+        return om.MFnMesh(selection.getDagPath(0))
+
+    def _readTopology(self):
+        counts, vertices = self._getFnMesh().getVertices()
+        self._arrays['faceCounts'] = list(counts)
+        self._arrays['faceVertices'] = list(vertices)
+
+    def _getVertexCount(self):
+        return self._get('vertexCount', lambda: self._getFnMesh().numVertices)
+
+    vertexCount = property(_getVertexCount)
+
+    def _getFaceCounts(self):
+        if 'faceCounts' not in self._arrays:
+            self._readTopology()
+        return self._arrays['faceCounts']
+
+    faceCounts = property(_getFaceCounts)
+
+    def _getFaceVertices(self):
+        if 'faceVertices' not in self._arrays:
+            self._readTopology()
+        return self._arrays['faceVertices']
+
+    faceVertices = property(_getFaceVertices)
+
+    def _readEdgeVertices(self):
+        fnMesh = self._getFnMesh()
+        edgeVertices = list()
+        for edgeId in xrange(fnMesh.numEdges):
+            edgeVertices.extend(fnMesh.getEdgeVertices(edgeId))
+        return edgeVertices
+
+    def _getEdgeVertices(self):
+        return self._get('edgeVertices', self._readEdgeVertices)
+
+    edgeVertices = property(_getEdgeVertices, doc='the two vertices of every edge in edge id order, flat list.')
+
+    def _readTweaks(self):
+        import maya.cmds as cmds
+
+        indices = cmds.getAttr('%s.pnts' % self.name, multiIndices=True) or list()
+        values = cmds.getAttr('%s.pnts' % self.name) if indices else list()
+        self._arrays['tweakIndices'] = indices
+        self._arrays['tweakValues'] = values
+
+    def _getTweakIndices(self):
+        if 'tweakIndices' not in self._arrays:
+            self._readTweaks()
+        return self._arrays['tweakIndices']
+
+    tweakIndices = property(_getTweakIndices)
+
+    def _getTweakValues(self):
+        if 'tweakValues' not in self._arrays:
+            self._readTweaks()
+        return self._arrays['tweakValues']
+
+    tweakValues = property(_getTweakValues)
+
+    def _readPoints(self):
+        import maya.cmds as cmds
+
+        return cmds.xform('%s.vtx[*]' % self.name, q=True, objectSpace=True, translation=True) or list()
+
+    def _getPoints(self):
+        return self._get('points', self._readPoints)
+
+    points = property(_getPoints, doc='the object space positions, flat x, y, z list.')
+
+    def _getUvSetNames(self):
+        return self._get('uvSetNames', lambda: list(self._getFnMesh().getUVSetNames()))
+
+    uvSetNames = property(_getUvSetNames)
+
+    def getUvSet(self, uvSet):
+        """
+        Return the arrays of a uv set : the u and v of every uv, the number of uvs and the uv ids of every face and the
+        shell of every uv.
+        :param uvSet: the uv set name.
+        :type uvSet: str
+        :return: us, vs, uvCounts, uvIds, shellIds
+        :rtype: tuple
+        """
+        def read():
+            fnMesh = self._getFnMesh()
+            us, vs = fnMesh.getUVs(uvSet)
+            uvCounts, uvIds = fnMesh.getAssignedUVs(uvSet)
+            shellIds = fnMesh.getUvShellsIds(uvSet)[1] if len(us) else list()
+            return list(us), list(vs), list(uvCounts), list(uvIds), list(shellIds)
+        return self._get(('uvSet', uvSet), read)
+
+    def _readLockedNormals(self):
+        import maya.cmds as cmds
+
+        return cmds.polyNormalPerVertex('%s.vtxFace[*][*]' % self.name, q=True, freezeNormal=True) or list()
+
+    def _getLockedNormals(self):
+        return self._get('lockedNormals', self._readLockedNormals)
+
+    lockedNormals = property(_getLockedNormals, doc='the frozen flag of every vertex-face, vertex major.')
+
+    def tweakedVertices(self, tolerance=0.0):
+        """
+        Return the vertices with a tweak (pnts) further than the tolerance from zero.
+        :param tolerance: the largest absolute tweak taken as zero.
+        :type tolerance: float
+        :return: the sorted vertex indices.
+        :rtype: list
+        """
+        return sorted(nonZeroRows(self.tweakIndices, self.tweakValues, tolerance))
+
+    def lockedNormalVertices(self):
+        """
+        Return the vertices with at least one locked vertex-face normal.
+        :return: the sorted vertex indices.
+        :rtype: list
+        """
+        flags = self.lockedNormals
+        if not any(flags):
+            return list()
+        faceVertices = self.faceVertices
+        if len(flags) != len(faceVertices):
+            raise RuntimeError('%s has %s vertex-face normals for %s face-vertices.' % (self.name, len(flags),
+                                                                                         len(faceVertices)))
+        return flaggedOwners(faceVertexOwners(faceVertices, self.vertexCount), flags)
+
+
+class Topology(object):
+    """
+    Result of the topology analysis of a mesh, the component indices are sorted and the border edges are the
+    (first, second) vertex pairs of the edges used by only one face.
+    """
+    def __init__(self, meshName, ngons=(), concaveFaces=(), loneVertices=(), borderEdges=(), edgeReader=None):
+        """
+        :param edgeReader: returns the flat edge vertices of the mesh (MeshData.edgeVertices), only called when the
+        edge ids are asked for.
+        :type edgeReader: callable
+        """
+        super(Topology, self).__init__()
+        self.meshName = meshName
+        self.ngons = list(ngons)
+        self.concaveFaces = list(concaveFaces)
+        self.loneVertices = list(loneVertices)
+        self.borderEdges = [tuple(x) for x in borderEdges]
+        self.edgeReader = edgeReader
+        self._edgeIds = None
+
+    @property
+    def edgeIds(self):
+        """
+        The edge id of every (first, second) vertex pair, first lower than second.
+        :return:
+        :rtype: dict
+        """
+        if self._edgeIds is None:
+            edgeVertices = self.edgeReader() if self.edgeReader is not None else list()
+            self._edgeIds = dict((tuple(sorted(edgeVertices[x:x + 2])), x // 2)
+                                 for x in xrange(0, len(edgeVertices), 2))
+        return self._edgeIds
+
+
+def _cross(a, b):
+    return (a[1] * b[2] - a[2] * b[1], a[2] * b[0] - a[0] * b[2], a[0] * b[1] - a[1] * b[0])
+
+
+def _dot(a, b):
+    return a[0] * b[0] + a[1] * b[1] + a[2] * b[2]
+
+
+def _sub(a, b):
+    return (a[0] - b[0], a[1] - b[1], a[2] - b[2])
+
+
+def _analyzePython(meshData):
+    counts = meshData.faceCounts
+    faceVertices = meshData.faceVertices
+    flat = meshData.points
+    points = [tuple(flat[x:x + 3]) for x in range(0, len(flat), 3)]
+
+    ngons = list()
+    concaveFaces = list()
+    edgeFaces = dict()
+    offset = 0
+    for face, count in enumerate(counts):
+        vertices = faceVertices[offset:offset + count]
+        offset += count
+        for index in range(count):
+            edge = tuple(sorted((vertices[index], vertices[(index + 1) % count])))
+            edgeFaces[edge] = edgeFaces.get(edge, 0) + 1
+        if count > 4:
+            ngons.append(face)
+        if count < 4:
+            continue
+        corners = [points[x] for x in vertices]
+        # Newell normal, right for the non planar faces too.
+        normal = (0.0, 0.0, 0.0)
+        for index in range(count):
+            cross = _cross(corners[index], corners[(index + 1) % count])
+            normal = (normal[0] + cross[0], normal[1] + cross[1], normal[2] + cross[2])
+        normalLength = _dot(normal, normal) ** 0.5
+        for index in range(count):
+            turn = _cross(_sub(corners[index], corners[index - 1]), _sub(corners[(index + 1) % count], corners[index]))
+            if _dot(turn, normal) < -CONCAVE_TOLERANCE * normalLength * _dot(turn, turn) ** 0.5:
+                concaveFaces.append(face)
+                break
+
+    valence = dict()
+    border = set()
+    for edge, faceCount in edgeFaces.iteritems():
+        for vertex in edge:
+            valence[vertex] = valence.get(vertex, 0) + 1
+        if faceCount == 1:
+            border.update(edge)
+    loneVertices = sorted(x for x, y in valence.iteritems() if y == 2 and x not in border)
+    borderEdges = sorted(x for x, y in edgeFaces.iteritems() if y == 1)
+    return Topology(meshData.name, ngons, concaveFaces, loneVertices, borderEdges, meshData._getEdgeVertices)
+
+
+def _analyzeNumpy(meshData):
+    counts = numpy.asarray(meshData.faceCounts, dtype=numpy.int64)
+    faceVertices = numpy.asarray(meshData.faceVertices, dtype=numpy.int64)
+    points = numpy.asarray(meshData.points, dtype=float).reshape(-1, 3)
+    if not len(counts):
+        return Topology(meshData.name, edgeReader=meshData._getEdgeVertices)
+
+    faceOf = numpy.repeat(numpy.arange(len(counts)), counts)
+    offsets = numpy.cumsum(counts) - counts
+    local = numpy.arange(len(faceVertices)) - offsets[faceOf]
+    nextIndex = offsets[faceOf] + (local + 1) % counts[faceOf]
+    previousIndex = offsets[faceOf] + (local - 1) % counts[faceOf]
+
+    ngons = numpy.nonzero(counts > 4)[0]
+
+    corners = points[faceVertices]
+    nextCorners = corners[nextIndex]
+    # Newell normal, right for the non planar faces too.
+    crosses = numpy.cross(corners, nextCorners)
+    normals = numpy.column_stack([numpy.bincount(faceOf, weights=crosses[:, x], minlength=len(counts))
+                                  for x in range(3)])
+    turns = numpy.cross(corners - corners[previousIndex], nextCorners - corners)
+    dots = (turns * normals[faceOf]).sum(axis=1)
+    limits = CONCAVE_TOLERANCE * numpy.sqrt((normals ** 2).sum(axis=1))[faceOf] * numpy.sqrt((turns ** 2).sum(axis=1))
+    concave = (dots < -limits) & (counts[faceOf] > 3)
+    concaveFaces = numpy.unique(faceOf[concave])
+
+    vertexCount = int(max(faceVertices.max() + 1, len(points)))
+    edges = numpy.sort(numpy.column_stack([faceVertices, faceVertices[nextIndex]]), axis=1)
+    keys, edgeFaceCounts = numpy.unique(edges[:, 0] * vertexCount + edges[:, 1], return_counts=True)
+    edgeVertices = numpy.column_stack([keys // vertexCount, keys % vertexCount])
+    valence = numpy.bincount(edgeVertices.ravel(), minlength=vertexCount)
+    borderEdges = edgeVertices[edgeFaceCounts == 1]
+    border = numpy.zeros(vertexCount, dtype=bool)
+    border[borderEdges.ravel()] = True
+    loneVertices = numpy.nonzero((valence == 2) & ~border)[0]
+    return Topology(meshData.name, ngons.tolist(), concaveFaces.tolist(), loneVertices.tolist(), borderEdges.tolist(),
+                    meshData._getEdgeVertices)
+
+
+def analyzeTopology(meshData):
+    """
+    Find in one pass over the arrays of the mesh the n-gons, the concave faces and the lone vertices, the vertices
+    inside the mesh shared by only two edges.
+    :param meshData: the mesh to analyze.
+    :type meshData: MeshData
+    :return:
+    :rtype: Topology
+    """
+    if numpy is not None:
+        return _analyzeNumpy(meshData)
+    return _analyzePython(meshData)
+
+
+def coincidentPoints(points, indices, tolerance=MERGE_TOLERANCE):
+    """
+    Pair the points closer than the tolerance with a spatial hash, every point is only compared to the points of its
+    cell and of the neighbour cells so the time grows linearly with the number of points.
+    :param points: the flat x, y, z list of all the points.
+    :type points: list
+    :param indices: the indices of the points to pair.
+    :type indices: iterable
+    :param tolerance: the largest distance between two coincident points.
+    :type tolerance: float
+    :return: the coincident indices of every index having some.
+    :rtype: dict
+    """
+    cellSize = tolerance or 1e-9
+    cells = dict()
+    positions = dict()
+    for index in indices:
+        position = tuple(points[index * 3:index * 3 + 3])
+        positions[index] = position
+        cell = tuple(int(x // cellSize) for x in position)
+        cells.setdefault(cell, list()).append(index)
+
+    squaredTolerance = tolerance * tolerance
+    neighbours = [(x, y, z) for x in (-1, 0, 1) for y in (-1, 0, 1) for z in (-1, 0, 1)]
+    partners = dict()
+    for cell, cellIndices in cells.iteritems():
+        candidates = list()
+        for offset in neighbours:
+            candidates.extend(cells.get((cell[0] + offset[0], cell[1] + offset[1], cell[2] + offset[2]), ()))
+        for index in cellIndices:
+            position = positions[index]
+            for other in candidates:
+                if other == index:
+                    continue
+                otherPosition = positions[other]
+                distance = sum((position[x] - otherPosition[x]) ** 2 for x in range(3))
+                if distance <= squaredTolerance:
+                    partners.setdefault(index, set()).add(other)
+    return partners
+
+
+def findUnmergedBorders(meshData, topology, tolerance=MERGE_TOLERANCE):
+    """
+    Return the border edges lying on another border edge of the mesh, the two sides of a seam that was not merged.
+    Nothing is changed in the scene.
+    :param meshData: the mesh to check.
+    :type meshData: MeshData
+    :param topology: the topology analysis of the mesh.
+    :type topology: Topology
+    :param tolerance: the largest distance between two vertices taken as the same.
+    :type tolerance: float
+    :return: the (first, second) vertex pairs of the unmerged edges.
+    :rtype: list
+    """
+    borderEdges = set(topology.borderEdges)
+    if not borderEdges:
+        return list()
+    borderVertices = set(x for edge in borderEdges for x in edge)
+    partners = coincidentPoints(meshData.points, borderVertices, tolerance)
+    unmerged = list()
+    for first, second in sorted(borderEdges):
+        if first not in partners or second not in partners:
+            continue
+        for other in partners[first]:
+            if any(tuple(sorted((other, x))) in borderEdges for x in partners[second]):
+                unmerged.append((first, second))
+                break
+    return unmerged
+
+
+class UvAnalysis(object):
+    """
+    Result of the uv analysis of one uv set of a mesh, the flipped shells are the uv ids of each shell.
+    """
+    def __init__(self, meshName, uvSet, flippedFaces=(), unmappedFaces=(), flippedShells=()):
+        super(UvAnalysis, self).__init__()
+        self.meshName = meshName
+        self.uvSet = uvSet
+        self.flippedFaces = list(flippedFaces)
+        self.unmappedFaces = list(unmappedFaces)
+        self.flippedShells = [list(x) for x in flippedShells]
+
+
+def _shellUvs(shellIds, shells):
+    uvs = dict((x, list()) for x in shells)
+    for uv, shell in enumerate(shellIds):
+        if shell in uvs:
+            uvs[shell].append(uv)
+    return [uvs[x] for x in sorted(shells)]
+
+
+def _analyzeUvSetPython(meshName, uvSet, us, vs, uvCounts, uvIds, shellIds):
+    flippedFaces = list()
+    unmappedFaces = list()
+    shellAreas = dict()
+    offset = 0
+    for face, count in enumerate(uvCounts):
+        ids = uvIds[offset:offset + count]
+        offset += count
+        if count < 3:
+            unmappedFaces.append(face)
+            continue
+        # shoelace, negative when the face is clockwise in uv space.
+        area = 0.0
+        for index in range(count):
+            current, following = ids[index], ids[(index + 1) % count]
+            area += us[current] * vs[following] - us[following] * vs[current]
+        if area < 0:
+            flippedFaces.append(face)
+        if shellIds:
+            shell = shellIds[ids[0]]
+            shellAreas[shell] = shellAreas.get(shell, 0.0) + area
+    flippedShells = [x for x, y in shellAreas.iteritems() if y < 0]
+    return UvAnalysis(meshName, uvSet, flippedFaces, unmappedFaces, _shellUvs(shellIds, flippedShells))
+
+
+def _analyzeUvSetNumpy(meshName, uvSet, us, vs, uvCounts, uvIds, shellIds):
+    counts = numpy.asarray(uvCounts, dtype=numpy.int64)
+    ids = numpy.asarray(uvIds, dtype=numpy.int64)
+    unmappedFaces = numpy.nonzero(counts < 3)[0]
+    if not len(ids):
+        return UvAnalysis(meshName, uvSet, unmappedFaces=unmappedFaces.tolist())
+    us = numpy.asarray(us, dtype=float)
+    vs = numpy.asarray(vs, dtype=float)
+
+    faceOf = numpy.repeat(numpy.arange(len(counts)), counts)
+    offsets = numpy.cumsum(counts) - counts
+    nextIndex = offsets[faceOf] + (numpy.arange(len(ids)) - offsets[faceOf] + 1) % counts[faceOf]
+    following = ids[nextIndex]
+    # shoelace, negative when the face is clockwise in uv space.
+    terms = us[ids] * vs[following] - us[following] * vs[ids]
+    areas = numpy.bincount(faceOf, weights=terms, minlength=len(counts))
+    mapped = counts >= 3
+    flippedFaces = numpy.nonzero((areas < 0) & mapped)[0]
+
+    flippedShells = list()
+    if len(shellIds):
+        shellIds = numpy.asarray(shellIds, dtype=numpy.int64)
+        faceShells = shellIds[ids[offsets[mapped]]]
+        shellAreas = numpy.bincount(faceShells, weights=areas[mapped], minlength=int(shellIds.max()) + 1)
+        for shell in numpy.nonzero(shellAreas < 0)[0]:
+            flippedShells.append(numpy.nonzero(shellIds == shell)[0].tolist())
+    return UvAnalysis(meshName, uvSet, flippedFaces.tolist(), unmappedFaces.tolist(), flippedShells)
+
+
+def analyzeUvs(meshData):
+    """
+    Find the faces with a negative signed uv area and the shells whose total area is negative, for every uv set of the
+    mesh. The faces without uvs are listed apart.
+    :param meshData: the mesh to analyze.
+    :type meshData: MeshData
+    :return: one UvAnalysis per uv set.
+    :rtype: list
+    """
+    analyzeUvSet = _analyzeUvSetNumpy if numpy is not None else _analyzeUvSetPython
+    return [analyzeUvSet(meshData.name, x, *meshData.getUvSet(x)) for x in meshData.uvSetNames]
+
+
+def getMeshData(validationRun, meshName):
+    """
+    Return the MeshData of the mesh for the run, shared by all its checks.
+    :param validationRun: the current run, None for an unshared MeshData.
+    :type validationRun: ValidationRun
+    :param meshName: the mesh name.
+    :type meshName: str
+    :return:
+    :rtype: MeshData
+    """
+    if validationRun is None:
+        return MeshData(meshName)
+    return validationRun.getCached(('mesh_analysis.MeshData', meshName), lambda: MeshData(meshName))
+
+
+def getTopology(validationRun, meshName):
+    """
+    Return the topology analysis of the mesh for the run, shared by all its checks.
+    :param validationRun: the current run, None for an unshared analysis.
+    :type validationRun: ValidationRun
+    :param meshName: the mesh name.
+    :type meshName: str
+    :return:
+    :rtype: Topology
+    """
+    if validationRun is None:
+        return analyzeTopology(MeshData(meshName))
+    return validationRun.getCached(('mesh_analysis.Topology', meshName),
+                                   lambda: analyzeTopology(getMeshData(validationRun, meshName)))
+
+
+def getUvAnalyses(validationRun, meshName):
+    """
+    Return the uv analysis of every uv set of the mesh for the run, shared by all its checks.
+    :param validationRun: the current run, None for an unshared analysis.
+    :type validationRun: ValidationRun
+    :param meshName: the mesh name.
+    :type meshName: str
+    :return:
+    :rtype: list
+    """
+    if validationRun is None:
+        return analyzeUvs(MeshData(meshName))
+    return validationRun.getCached(('mesh_analysis.UvAnalysis', meshName),
+                                   lambda: analyzeUvs(getMeshData(validationRun, meshName)))
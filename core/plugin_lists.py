@@ -0,0 +1,6 @@
+"""
+The plugin lists shared by the maya and the offline validations.
+"""
+
+# the plugins a scene must not require, matched anywhere in the plugin name of its requires statements.
+PROBLEMATIC_PLUGINS = ['sqtVelvetShader', 'poseReader', 'hairAndFur', 'rpmaya', 'nwPitNodes', 'nwLightingTools']
@@ -0,0 +1,167 @@
+"""
+This module holds the process wide registry of the project configs. Every config file is parsed once, the list values
+are turned into python lists, and it is read again only when its mtime changes.
+"""
+# General Imports.
+import ast
+import ConfigParser
+import os
+import threading
+import time
+
+CONFIG_FOLDER = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'config').replace('\\', '/')
+
+# seconds during which a config is trusted without checking its mtime again.
+STAT_INTERVAL = 2.0
+
+
+def getConfigFile(project):
+    """
+    Return the config file for the project, the default config is used if the project has none.
+    :param project: the project name.
+    :type project: str
+    :return: path of the config file.
+    :rtype: str
+    """
+    project = (project or 'default').lower()
+    projectConfig = os.path.join(CONFIG_FOLDER, project).replace('\\', '/')
+    if not os.path.isfile(projectConfig):
+        projectConfig = os.path.join(CONFIG_FOLDER, 'default').replace('\\', '/')
+    return projectConfig
+
+
+def listProjects():
+    """
+    Return the projects having a config file, without the default one.
+    :return:
+    :rtype: list
+    """
+    return sorted(x for x in os.listdir(CONFIG_FOLDER) if not x == 'default')
+
+
+def parseValue(value):
+    """
+    Turn the list, tuple and dict literals of the config into python objects, the other values stay strings like with
+    the ConfigParser.
+    :param value: raw config value.
+    :type value: str
+    :return:
+    :rtype: object
+    """
+    stripped = value.strip()
+    if stripped[:1] in ('[', '(', '{'):
+        try:
+            return ast.literal_eval(stripped)
+        except (ValueError, SyntaxError):
+            pass
+    return value
+
+
+class ProjectConfig(object):
+    """
+    The parsed config of one project, it answers get() like the ConfigParser it replaces but with typed values.
+    """
+    def __init__(self, path, mtime, sections):
+        super(ProjectConfig, self).__init__()
+        self.path = path
+        self.mtime = mtime
+        self.checkedAt = time.time()
+        self._sections = sections
+
+    @classmethod
+    def fromFile(cls, path):
+        """
+        Read and parse the config file.
+        :param path: the config file.
+        :type path: str
+        :return:
+        :rtype: ProjectConfig
+        """
+        mtime = os.stat(path).st_mtime
+        parser = ConfigParser.ConfigParser()
+        parser.read(path)
+        sections = dict()
+        for section in parser.sections():
+            sections[section] = dict((option, parseValue(value)) for option, value in parser.items(section, raw=True))
+        return cls(path, mtime, sections)
+
+    def sections(self):
+        return sorted(self._sections.keys())
+
+    def has_section(self, section):
+        return section in self._sections
+
+    def has_option(self, section, option):
+        return option.lower() in self._sections.get(section, dict())
+
+    def get(self, section, option):
+        """
+        Return the parsed value of the option.
+        :param section: the config section.
+        :type section: str
+        :param option: the option name.
+        :type option: str
+        :return:
+        :rtype: object
+        """
+        if section not in self._sections:
+            raise ConfigParser.NoSectionError(section)
+        options = self._sections[section]
+        if option.lower() not in options:
+            raise ConfigParser.NoOptionError(option, section)
+        return options[option.lower()]
+
+    def items(self, section):
+        if section not in self._sections:
+            raise ConfigParser.NoSectionError(section)
+        return sorted(self._sections[section].items())
+
+
+class ConfigRegistry(object):
+    """
+    Cache of the ProjectConfig keyed by project.
+    """
+    def __init__(self):
+        super(ConfigRegistry, self).__init__()
+        self._configs = dict()
+        self._lock = threading.Lock()
+
+    def get(self, project):
+        """
+        Return the config of the project, parsing it again only if the file changed on disk.
+        :param project: the project name.
+        :type project: str
+        :return:
+        :rtype: ProjectConfig
+        """
+        key = (project or 'default').lower()
+        with self._lock:
+            config = self._configs.get(key)
+            now = time.time()
+            if config and now - config.checkedAt < STAT_INTERVAL:
+                return config
+            path = getConfigFile(key)
+            if config and config.path == path and os.stat(path).st_mtime == config.mtime:
+                config.checkedAt = now
+                return config
+            config = ProjectConfig.fromFile(path)
+            self._configs[key] = config
+            return config
+
+    def clear(self):
+        with self._lock:
+            self._configs.clear()
+
+
+REGISTRY = ConfigRegistry()
+
+
+def getConfig(project):
+    """
+    Return the cached config of the project.
+    :param project: the project name.
+    :type project: str
+    :return:
+    :rtype: ProjectConfig
+    """
+    return REGISTRY.get(project)
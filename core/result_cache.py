@@ -0,0 +1,423 @@
+"""
+Persistent cache of the validation results, in a local SQLite file. A result is stored under the content hash of the
+saved scene and of the files it references, the hash of the project config, the scene backend and the version of the
+validation class, so running the validations again on a scene that didn't change since it was saved gives the stored
+results back without running them.
+
+The references of a .ma file are read from its header, the nested ones from the header of the referenced files. The
+references of a .mb file are only known once it was opened in maya (getMayaReferences), it isn't looked up before.
+
+A validation class is re-run after its _version is bumped, the classes whose result doesn't only depend on the scene
+(files on the server, data kept for the fix) set _cacheable to False. The entries not used for MAX_AGE seconds are
+evicted, then the least recently used ones until the cache is under MAX_SIZE bytes.
+
+VALIDATIONS_RESULT_CACHE gives the SQLite file, "0" turns the cache off.
+"""
+# General Imports.
+import collections
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import time
+
+from Validations.core.ascii import maReader
+
+RESULT_CACHE_ENV = 'VALIDATIONS_RESULT_CACHE'
+DEFAULT_CACHE_FILE = os.path.join(os.path.expanduser('~'), '.validations', 'result_cache.sqlite').replace('\\', '/')
+
+MAX_AGE = 30 * 24 * 3600
+MAX_SIZE = 64 * 1024 * 1024
+# the statuses worth keeping, a crashed or failed validation runs again.
+CACHED_STATUS = ('OK', 'WARNING', 'ERROR')
+HASH_BLOCK_SIZE = 1024 * 1024
+# the file hashes and reference lists kept, the oldest ones go first.
+MAX_FILE_HASHES = 10000
+
+_COPY_NUMBER_RE = re.compile(r'\{\d+\}$')
+
+# complete is set when the references come from maya, the nested ones are then in the list.
+_SCHEMA = ('CREATE TABLE IF NOT EXISTS file_hashes (path TEXT PRIMARY KEY, size INTEGER, mtime REAL, hash TEXT)',
+           'CREATE TABLE IF NOT EXISTS scene_references (path TEXT PRIMARY KEY, size INTEGER, mtime REAL, '
+           'refs TEXT, complete INTEGER)',
+           'CREATE TABLE IF NOT EXISTS results (sceneHash TEXT, configHash TEXT, project TEXT, backend TEXT, '
+           'checkKey TEXT, result TEXT, size INTEGER, lastUsed REAL, '
+           'PRIMARY KEY (sceneHash, configHash, project, backend, checkKey))',
+           'CREATE INDEX IF NOT EXISTS results_lastUsed ON results (lastUsed)')
+
+# what the results of a scene are stored under, see ResultCache.getSceneKey.
+SceneKey = collections.namedtuple('SceneKey', ['sceneHash', 'configHash', 'project', 'backend'])
+
+
+def hashFile(path):
+    """
+    Return the sha1 of the file content.
+    :param path: the file to hash.
+    :type path: str
+    :return:
+    :rtype: str
+    """
+    sha = hashlib.sha1()
+    with open(path, 'rb') as readId:
+        while True:
+            block = readId.read(HASH_BLOCK_SIZE)
+            if not block:
+                break
+            sha.update(block)
+    return sha.hexdigest()
+
+
+def getConfigHash(project):
+    """
+    Return the sha1 of the config of the project.
+    :param project: the project name.
+    :type project: str
+    :return:
+    :rtype: str
+    """
+    from Validations.core import project_config
+
+    return hashFile(project_config.getConfigFile(project))
+
+
+def resolveReference(path, sceneFile):
+    """
+    Return the absolute path of a reference of the scene, without its copy number. A relative path is taken from the
+    folder of the scene.
+    :param path: the reference path, as written in the scene.
+    :type path: str
+    :param sceneFile: the scene.
+    :type sceneFile: str
+    :return:
+    :rtype: str
+    """
+    path = _COPY_NUMBER_RE.sub('', os.path.expandvars(path))
+    if not os.path.isabs(path):
+        path = os.path.join(os.path.dirname(sceneFile), path)
+    return os.path.abspath(path).replace('\\', '/')
+
+
+def getMayaReferences():
+    """
+    Return the files of all the references of the scene opened in maya, the nested ones included.
+    :return:
+    :rtype: list
+    """
+    import maya.cmds as cmds
+
+    references = list()
+    for node in cmds.ls(references=True) or list():
+        try:
+            path = cmds.referenceQuery(node, filename=True, withoutCopyNumber=True)
+        except RuntimeError:
+            # the shared reference node has no file.
+            continue
+        if path not in references:
+            references.append(path)
+    return references
+
+
+def getCheckKey(validationClass):
+    """
+    Return the key of the validation class, its module, name and version.
+    :param validationClass: Validations or CheckAbstract class.
+    :type validationClass: type
+    :return:
+    :rtype: str
+    """
+    return '%s.%s:%s' % (validationClass.__module__.split('.')[-1], validationClass.__name__,
+                         getattr(validationClass, '_version', 0))
+
+
+def isCacheable(validationClass):
+    return getattr(validationClass, '_cacheable', False)
+
+
+def resultOf(validation):
+    """
+    Return the json-able result of a finished validation.
+    :param validation: Validations or CheckAbstract instance.
+    :type validation: object
+    :return:
+    :rtype: dict
+    """
+    errorLog = validation.errorLog
+    return {'class': type(validation).__name__,
+            'status': str(validation.status),
+            'message': str(validation.errorMessage),
+            'errorNodes': list(validation.errorStore.names()),
+            'errorLog': [errorLog] if isinstance(errorLog, basestring) else [str(x) for x in errorLog],
+            'isFixable': bool(getattr(validation, 'isFixable', False)),
+            'isNodes': bool(getattr(validation, 'isNodes', True))}
+
+
+def applyResult(validation, result):
+    """
+    Give a stored result to the validation, as if it just ran.
+    :param validation: Validations or CheckAbstract instance.
+    :type validation: object
+    :param result: the stored result.
+    :type result: dict
+    :return:
+    :rtype: None
+    """
+    validation.reset()
+    validation.status = result['status']
+    validation.errorMessage = result['message']
+    validation.errorNodes = result['errorNodes']
+    validation.errorLog = list(result.get('errorLog', ()))
+    if 'isFixable' in result:
+        validation.isFixable = result['isFixable']
+    if 'isNodes' in result:
+        validation.isNodes = result['isNodes']
+
+
+class ResultCache(object):
+    """
+    The SQLite file of the cached results.
+    """
+    def __init__(self, path=DEFAULT_CACHE_FILE, maxAge=MAX_AGE, maxSize=MAX_SIZE):
+        super(ResultCache, self).__init__()
+        self.path = path
+        self.maxAge = maxAge
+        self.maxSize = maxSize
+        folder = os.path.dirname(path)
+        if folder and not os.path.isdir(folder):
+            os.makedirs(folder)
+        # the farm workers of a machine share the file, wait for each other's writes.
+        self.connection = sqlite3.connect(path, timeout=30)
+        for statement in _SCHEMA:
+            self.connection.execute(statement)
+        self.connection.commit()
+        self.evict()
+
+    @classmethod
+    def fromEnvironment(cls):
+        """
+        Return the cache of VALIDATIONS_RESULT_CACHE, None when it is turned off or can't be opened.
+        :return:
+        :rtype: ResultCache
+        """
+        path = os.environ.get(RESULT_CACHE_ENV, '')
+        if path == '0':
+            return None
+        try:
+            return cls(path or DEFAULT_CACHE_FILE)
+        except (sqlite3.Error, OSError, IOError) as error:
+            print 'Result cache turned off : %s' % error
+            return None
+
+    def getFileHash(self, path):
+        """
+        Return the content hash of the file, hashed again only when its size or mtime changed.
+        :param path: the file to hash.
+        :type path: str
+        :return:
+        :rtype: str
+        """
+        path = os.path.abspath(path).replace('\\', '/')
+        stat = os.stat(path)
+        row = self.connection.execute('SELECT size, mtime, hash FROM file_hashes WHERE path = ?', (path,)).fetchone()
+        if row is not None and row[0] == stat.st_size and row[1] == stat.st_mtime:
+            return row[2]
+        fileHash = hashFile(path)
+        self.connection.execute('INSERT OR REPLACE INTO file_hashes VALUES (?, ?, ?, ?)',
+                                (path, stat.st_size, stat.st_mtime, fileHash))
+        self.connection.commit()
+        return fileHash
+
+    def setReferences(self, sceneFile, references, complete=False):
+        """
+        Store the references of the scene, until the scene file changes.
+        :param sceneFile: the scene.
+        :type sceneFile: str
+        :param references: the reference paths, as written in the scene or given by maya.
+        :type references: list
+        :param complete: the nested references are in the list, like the ones of getMayaReferences.
+        :type complete: bool
+        :return: the resolved reference paths.
+        :rtype: list
+        """
+        path = os.path.abspath(sceneFile).replace('\\', '/')
+        stat = os.stat(path)
+        resolved = list()
+        for reference in references:
+            reference = resolveReference(reference, path)
+            if reference not in resolved:
+                resolved.append(reference)
+        self.connection.execute('INSERT OR REPLACE INTO scene_references VALUES (?, ?, ?, ?, ?)',
+                                (path, stat.st_size, stat.st_mtime, json.dumps(resolved), int(complete)))
+        self.connection.commit()
+        return resolved
+
+    def getReferences(self, sceneFile):
+        """
+        Return the references of the scene, stored by setReferences or read from the header of a .ma file.
+        :param sceneFile: the scene.
+        :type sceneFile: str
+        :return: the resolved reference paths and if the nested references are in them, None when they are not known.
+        :rtype: tuple
+        """
+        path = os.path.abspath(sceneFile).replace('\\', '/')
+        stat = os.stat(path)
+        row = self.connection.execute('SELECT size, mtime, refs, complete FROM scene_references WHERE path = ?',
+                                      (path,)).fetchone()
+        if row is not None and row[0] == stat.st_size and row[1] == stat.st_mtime:
+            return json.loads(row[2]), bool(row[3])
+        if not path.lower().endswith('.ma'):
+            return None
+        with open(path, 'r') as readId:
+            reader = maReader.ReferenceReader(readId)
+            reader.parse()
+        return self.setReferences(path, reader.references), False
+
+    def _collectReferences(self, sceneFile, found):
+        listed = self.getReferences(sceneFile)
+        if listed is None:
+            return False
+        references, complete = listed
+        for reference in references:
+            if reference in found:
+                continue
+            found.append(reference)
+            if not complete and os.path.isfile(reference) and not self._collectReferences(reference, found):
+                return False
+        return True
+
+    def getSceneHash(self, sceneFile, references=None):
+        """
+        Return the hash of the scene content and of the content of all the files it references.
+        :param sceneFile: the saved scene.
+        :type sceneFile: str
+        :param references: the references given by maya for the opened scene (getMayaReferences), read from the file
+        when not given.
+        :type references: list
+        :return: None if the references are not known.
+        :rtype: str
+        """
+        found = list()
+        if references is not None:
+            found = self.setReferences(sceneFile, references, complete=True)
+        elif not self._collectReferences(sceneFile, found):
+            return None
+        sceneHash = self.getFileHash(sceneFile)
+        if not found:
+            return sceneHash
+        sha = hashlib.sha1(sceneHash)
+        for reference in sorted(found):
+            # a missing reference is part of the key too, the scene gives other results once it is back.
+            sha.update('\n%s %s' % (reference, self.getFileHash(reference) if os.path.isfile(reference) else ''))
+        return sha.hexdigest()
+
+    def getSceneKey(self, sceneFile, project, backend, references=None):
+        """
+        Return the key of the results of the saved scene.
+        :param sceneFile: the saved scene, unchanged since it was saved.
+        :type sceneFile: str
+        :param project: the project name.
+        :type project: str
+        :param backend: the name of the scene backend, "maya" or "memory".
+        :type backend: str
+        :param references: the references of the scene opened in maya, see getSceneHash.
+        :type references: list
+        :return: None if the scene file can't be read or its references are not known.
+        :rtype: SceneKey
+        """
+        try:
+            sceneHash = self.getSceneHash(sceneFile, references)
+            if sceneHash is None:
+                return None
+            return SceneKey(sceneHash, getConfigHash(project), str(project), backend)
+        except (OSError, IOError):
+            return None
+
+    def get(self, sceneKey, validationClass):
+        """
+        Return the stored result of the validation class for the scene.
+        :param sceneKey: the key of the scene.
+        :type sceneKey: SceneKey
+        :param validationClass: Validations or CheckAbstract class.
+        :type validationClass: type
+        :return: None if there is none.
+        :rtype: dict
+        """
+        return self.getMany(sceneKey, [validationClass]).get(validationClass.__name__)
+
+    def getMany(self, sceneKey, validationClasses):
+        """
+        Return the stored results of the validation classes for the scene, by class name.
+        :param sceneKey: the key of the scene.
+        :type sceneKey: SceneKey
+        :param validationClasses: Validations or CheckAbstract classes.
+        :type validationClasses: list
+        :return:
+        :rtype: dict
+        """
+        results = dict()
+        if sceneKey is None:
+            return results
+        checkKeys = dict((getCheckKey(x), x.__name__) for x in validationClasses if isCacheable(x))
+        if not checkKeys:
+            return results
+        rows = self.connection.execute('SELECT checkKey, result FROM results WHERE sceneHash = ? AND configHash = ? '
+                                       'AND project = ? AND backend = ? AND checkKey IN (%s)'
+                                       % ', '.join('?' * len(checkKeys)), tuple(sceneKey) + tuple(checkKeys))
+        for checkKey, result in rows.fetchall():
+            results[checkKeys[checkKey]] = json.loads(result)
+        if results:
+            self.connection.execute('UPDATE results SET lastUsed = ? WHERE sceneHash = ? AND configHash = ? '
+                                    'AND project = ? AND backend = ? AND checkKey IN (%s)'
+                                    % ', '.join('?' * len(checkKeys)),
+                                    (time.time(),) + tuple(sceneKey) + tuple(checkKeys))
+            self.connection.commit()
+        return results
+
+    def put(self, sceneKey, validationClass, result):
+        """
+        Store the result of the validation class for the scene.
+        :param sceneKey: the key of the scene.
+        :type sceneKey: SceneKey
+        :param validationClass: Validations or CheckAbstract class.
+        :type validationClass: type
+        :param result: the json-able result, see resultOf.
+        :type result: dict
+        :return: True if it was stored.
+        :rtype: bool
+        """
+        if sceneKey is None or not isCacheable(validationClass) or result.get('status') not in CACHED_STATUS:
+            return False
+        data = json.dumps(result, sort_keys=True)
+        self.connection.execute('INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                                tuple(sceneKey) + (getCheckKey(validationClass), data, len(data), time.time()))
+        self.connection.commit()
+        return True
+
+    def evict(self):
+        """
+        Remove the results not used for maxAge seconds, then the least recently used ones over maxSize bytes.
+        :return: the number of results removed.
+        :rtype: int
+        """
+        removed = self.connection.execute('DELETE FROM results WHERE lastUsed < ?',
+                                          (time.time() - self.maxAge,)).rowcount
+        total = self.connection.execute('SELECT COALESCE(SUM(size), 0) FROM results').fetchone()[0]
+        if total > self.maxSize:
+            rows = self.connection.execute('SELECT rowid, size FROM results ORDER BY lastUsed').fetchall()
+            toRemove = list()
+            for rowid, size in rows:
+                if total <= self.maxSize:
+                    break
+                toRemove.append((rowid,))
+                total -= size
+            self.connection.executemany('DELETE FROM results WHERE rowid = ?', toRemove)
+            removed += len(toRemove)
+        # the hashes of the referenced files are shared by many scenes, only the oldest ones are dropped.
+        for table in ('file_hashes', 'scene_references'):
+            self.connection.execute('DELETE FROM %s WHERE rowid NOT IN (SELECT rowid FROM %s ORDER BY rowid DESC '
+                                    'LIMIT ?)' % (table, table), (MAX_FILE_HASHES,))
+        self.connection.commit()
+        return removed
+
+    def close(self):
+        self.connection.close()
@@ -0,0 +1,220 @@
+"""
+Streaming exporters of the validation results, for the pipeline tools reading them. Every check is written and flushed
+as soon as it is finished, nothing is kept in memory:
+    jsonl   : one json object per check, for aggregating many files.
+    junit   : JUnit XML, one testsuite per scene and one testcase per check, for the build dashboard. The testsuites
+              don't carry the tests/failures counts, they are not known before the end.
+    csv     : one row per check, for production.
+
+The UI writes them next to the run report for the formats listed in VALIDATIONS_EXPORT_FORMATS (like "jsonl,csv"),
+batch_validate with its --jsonl, --junit and --csv options.
+"""
+# General Imports.
+import csv
+import json
+import os
+from xml.sax.saxutils import escape, quoteattr
+
+EXPORT_FORMATS_ENV = 'VALIDATIONS_EXPORT_FORMATS'
+
+CSV_COLUMNS = ('scene', 'class', 'name', 'category', 'status', 'message', 'errorNodeCount', 'errorNodes', 'isFixable',
+               'wallTime')
+# the junit element of the statuses failing a testcase.
+JUNIT_ELEMENTS = {'ERROR': 'failure', 'FAILED': 'error', 'CRASHED': 'error'}
+
+
+def checkResult(validation, record=None):
+    """
+    Turn a finished validation into its json-able result.
+    :param validation: the finished validation.
+    :type validation: Validations
+    :param record: the instrumentation record of the validation.
+    :type record: instrumentation.CheckRecord
+    :return:
+    :rtype: dict
+    """
+    result = {'class': type(validation).__name__,
+              'name': validation._name,
+              'category': validation._category,
+              'status': validation.status,
+              'message': str(validation.errorMessage),
+              'errorNodes': list(validation.errorStore.names()),
+              'isFixable': bool(validation.isFixable)}
+    if record is not None:
+        result['wallTime'] = record.wallTime
+        result['nodesInspected'] = record.nodesInspected
+    return result
+
+
+def _text(value):
+    if isinstance(value, unicode):
+        return value
+    return str(value).decode('utf-8', 'replace')
+
+
+class ResultExporter(object):
+    """
+    Base of the exporters, the results are written with write and the file is finished by close.
+    """
+    extension = ''
+
+    def __init__(self, path):
+        super(ResultExporter, self).__init__()
+        folder = os.path.dirname(path)
+        if folder and not os.path.isdir(folder):
+            os.makedirs(folder)
+        self.path = path
+        self.count = 0
+        self._file = open(path, 'wb')
+        self.begin()
+
+    def begin(self):
+        pass
+
+    def writeResult(self, result, scene):
+        raise NotImplementedError
+
+    def end(self):
+        pass
+
+    def write(self, result, scene=''):
+        """
+        Write the result of a check and flush it.
+        :param result: the check result, see checkResult.
+        :type result: dict
+        :param scene: the validated scene.
+        :type scene: str
+        :return:
+        :rtype: None
+        """
+        self.writeResult(result, scene)
+        self.count += 1
+        self._file.flush()
+
+    def close(self):
+        if self._file.closed:
+            return
+        self.end()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+class JsonLinesExporter(ResultExporter):
+    extension = '.jsonl'
+
+    def writeResult(self, result, scene):
+        self._file.write(json.dumps(dict(result, scene=scene), sort_keys=True) + '\n')
+
+
+class JUnitExporter(ResultExporter):
+    extension = '.xml'
+
+    def begin(self):
+        self._scene = None
+        self._file.write('<?xml version="1.0" encoding="utf-8"?>\n<testsuites>\n')
+
+    def _closeSuite(self):
+        if self._scene is not None:
+            self._file.write('  </testsuite>\n')
+        self._scene = None
+
+    def writeResult(self, result, scene):
+        if scene != self._scene or self._scene is None:
+            self._closeSuite()
+            self._file.write(('  <testsuite name=%s>\n' % quoteattr(_text(scene))).encode('utf-8'))
+            self._scene = scene
+
+        status = str(result.get('status', ''))
+        lines = ['    <testcase classname=%s name=%s time="%.4f">' % (
+            quoteattr(_text(result.get('category') or result.get('class', ''))),
+            quoteattr(_text(result.get('name') or result.get('class', ''))), result.get('wallTime', 0.0))]
+        message = _text(result.get('message', ''))
+        errorNodes = '\n'.join(_text(x) for x in result.get('errorNodes', ()))
+        if status in JUNIT_ELEMENTS:
+            lines.append('      <%s message=%s type=%s>%s</%s>' % (JUNIT_ELEMENTS[status], quoteattr(message),
+                                                                   quoteattr(status), escape(errorNodes),
+                                                                   JUNIT_ELEMENTS[status]))
+        elif status == 'WARNING':
+            lines.append('      <system-out>%s</system-out>' % escape('WARNING: %s\n%s' % (message, errorNodes)))
+        lines.append('    </testcase>\n')
+        self._file.write('\n'.join(lines).encode('utf-8'))
+
+    def end(self):
+        self._closeSuite()
+        self._file.write('</testsuites>\n')
+
+
+class CsvExporter(ResultExporter):
+    extension = '.csv'
+
+    def begin(self):
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(CSV_COLUMNS)
+
+    def writeResult(self, result, scene):
+        errorNodes = result.get('errorNodes', ())
+        row = {'scene': scene,
+               'errorNodeCount': len(errorNodes),
+               'errorNodes': ';'.join(_text(x) for x in errorNodes)}
+        self._writer.writerow([_text(row[x] if x in row else result.get(x, '')).encode('utf-8') for x in CSV_COLUMNS])
+
+
+FORMATS = {'jsonl': JsonLinesExporter, 'junit': JUnitExporter, 'csv': CsvExporter}
+
+
+class ExporterGroup(object):
+    """
+    Several exporters written together.
+    """
+    def __init__(self, exporters=()):
+        super(ExporterGroup, self).__init__()
+        self.exporters = list(exporters)
+
+    @classmethod
+    def fromFormats(cls, basePath, formats):
+        """
+        Open one exporter per format, the file of each is the base path with the extension of the format.
+        :param basePath: the file path without extension.
+        :type basePath: str
+        :param formats: format names, keys of FORMATS.
+        :type formats: list
+        :return:
+        :rtype: ExporterGroup
+        """
+        unknown = [x for x in formats if x not in FORMATS]
+        if unknown:
+            raise ValueError('Unknown export format(s) %s, use %s' % (', '.join(unknown), ', '.join(sorted(FORMATS))))
+        return cls(FORMATS[x](basePath + FORMATS[x].extension) for x in formats)
+
+    @classmethod
+    def fromEnvironment(cls, basePath):
+        """
+        The exporters of the formats listed in VALIDATIONS_EXPORT_FORMATS, None if there is none.
+        """
+        formats = [x.strip().lower() for x in os.environ.get(EXPORT_FORMATS_ENV, '').split(',') if x.strip()]
+        if not formats:
+            return None
+        return cls.fromFormats(basePath, formats)
+
+    @property
+    def paths(self):
+        return [x.path for x in self.exporters]
+
+    def write(self, result, scene=''):
+        for exporter in self.exporters:
+            exporter.write(result, scene)
+
+    def close(self):
+        for exporter in self.exporters:
+            exporter.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
@@ -3,15 +3,16 @@ This is the main module responsible for the RigValidations, which use the sub-cl
 process.
 """
 # General Imports.
-import ConfigParser
-import os
 import re
 
 import pymel.core as pm
 
+from Validations.core import dev_mode
+from Validations.core import plugin_lists
+from Validations.core import project_config
 from Validations.core import validations
 
-reload(validations)
+dev_mode.devReload(validations)
 
 
 class MayaValidations(validations.Validations):
@@ -36,22 +37,16 @@ class MayaValidations(validations.Validations):
         :return:
         :rtype:
         """
-        root_folder = os.path.dirname(os.path.dirname(__file__)).replace('core', 'config')
-        proj_config = os.path.join(root_folder, self.project.lower()).replace('\\', '/')
-        if not os.path.isfile(proj_config):
-            proj_config = os.path.join(root_folder, 'default').replace('\\', '/')
-        return proj_config
+        return project_config.getConfigFile(self.project)
 
     @property
     def get_parser(self):
         """
-        Make the parser here.
+        The cached config of the project, parsed once and reloaded only when the file changes.
         :return:
-        :rtype:
+        :rtype: project_config.ProjectConfig
         """
-        config_parser = ConfigParser.ConfigParser()
-        config_parser.read(self.get_config)
-        return config_parser
+        return project_config.getConfig(self.project)
 
     def selectErrorNodes(self):
         """
@@ -78,13 +73,15 @@ class CheckMasterCtrl(MayaValidations):
     """
     _name = "Top CTRL check"
     _category = "Rigging Validations"
+    _watchTypes = ('transform',)
+    _watchAttrs = ()
 
     def check(self):
         """@brief Check if a node with the name top_C_001_CTRL exist.
         """
         top_node_name = self.get_parser.get('MASTERCTRL', 'main_ctrl')
         print top_node_name
-        if pm.objExists(top_node_name):
+        if self.snapshot.objExists(top_node_name):
             self.setStatus('OK')
         else:
             self.setStatus('ERROR')
@@ -98,12 +95,13 @@ class CheckUselessConstrains(MayaValidations):
     """
     _name = "Useless constrainscheck"
     _category = "Rigging Validations"
+    _watchTypes = ('constraint',)
 
     def check(self):
         """@brief Check if they are constrains without output connections
         """
 
-        constrains = pm.ls(type='constraint')
+        constrains = self.snapshot.pyNodes(type='constraint')
         uselessConstrains = []
 
         for const in constrains:
@@ -132,18 +130,27 @@ class CheckCtrlTransform(MayaValidations):
     """
     _name = "CTRL Transform check"
     _category = "Rigging Validations"
+    _watchTypes = ('transform',)
+    _watchAttrs = ('translate', 'rotate', 'scale')
 
     def check(self):
-        """@brief Check if a node with the name top_C_001_CTRL exist.
+        """@brief Run the whole check at once, for the callers not going chunk by chunk.
+        """
+        for _ in self.iterCheck():
+            pass
+
+    def iterCheck(self):
+        """@brief Check if a node with the name top_C_001_CTRL exist, one CTRL at a time.
         """
         errorCTRLs = list()
         # warningNodes = list()
-        for each in pm.ls('*CTRL'):
+        for each in self.snapshot.pyNodes(suffix='CTRL'):
             translate_chk = each.t.get() == pm.datatypes.Vector([0.0, 0.0, 0.0])
             rotate_chk = each.r.get() == pm.datatypes.Vector([0.0, 0.0, 0.0])
             scale_chk = each.s.get() == pm.datatypes.Vector([1.0, 1.0, 1.0])
             if not translate_chk or not rotate_chk or not scale_chk:
                 errorCTRLs.append(each)
+            yield
         self.setStatus('OK')
         if errorCTRLs:
             self.setStatus('ERROR')
@@ -188,6 +195,8 @@ class CheckTopNodes(MayaValidations):
     """
     _name = "Number of Top Node check"
     _category = "Rigging Validations"
+    _watchTypes = ('dagNode',)
+    _watchAttrs = ()
 
     def check(self):
         """@brief Check if a node with the name top_C_001_CTRL exist.
@@ -195,10 +204,10 @@ class CheckTopNodes(MayaValidations):
         defaults = ['persp', 'top', 'front', 'side']
 
         wrong_names = list()
-        for each in pm.ls(assemblies=1):
-            if str(each) in defaults:
+        for each in self.snapshot.assemblies():
+            if each in defaults:
                 continue
-            wrong_names.append(str(each))
+            wrong_names.append(each)
         self.setStatus('OK')
         if len(wrong_names)-1:
             self.setStatus('ERROR')
@@ -224,6 +233,7 @@ class CheckCTRLNaming(MayaValidations):
     """
     _name = "CTRL Naming check"
     _category = "Rigging Validations"
+    _watchAttrs = ()
 
     def check(self):
         """@brief Check if a node with the name top_C_001_CTRL exist.
@@ -232,8 +242,8 @@ class CheckCTRLNaming(MayaValidations):
         has_numerics = list()
         node_name_mismatch = list()
         transform_node = None
-        for each in pm.ls(r=1):
-            if str(each).endswith('CTRL'):
+        for each in self.snapshot.ls(long=False):
+            if each.endswith('CTRL'):
                 continue
 
             if not transform_node:
@@ -269,6 +279,11 @@ class CheckUtilityNodeNaming(MayaValidations):
     """
     _name = "CTRL Transform check"
     _category = "Rigging Validations"
+    # the utility node types whose names are checked.
+    _utilityNodeTypes = ('addDoubleLinear', 'clamp', 'condition', 'multiplyDivide', 'plusMinusAverage', 'reverse',
+                         'setRange', 'vectorProduct', 'unitConversion')
+    _watchTypes = _utilityNodeTypes
+    _watchAttrs = ()
 
     def check(self):
         """@brief Check if a node with the name top_C_001_CTRL exist.
@@ -277,20 +292,19 @@ class CheckUtilityNodeNaming(MayaValidations):
         has_numeric = list()
         node_name_mismatch = list()
         # transform_node = None
-        utilityNodeTypes = ['addDoubleLinear', 'clamp', 'condition', 'multiplyDivide', 'plusMinusAverage', 'reverse',
-                            'setRange', 'vectorProduct', 'unitConversion']
-        for each in pm.ls(type=utilityNodeTypes):
+        utilityNodeTypes = list(self._utilityNodeTypes)
+        for each in self.snapshot.ls(type=utilityNodeTypes, long=False):
             tmp = each.split('_')
             # print tmp
             if len(tmp) == 4:
                 regex_ret = regex.search(tmp[-1])
                 if regex_ret:
-                    has_numeric.append(str(each))
+                    has_numeric.append(each)
                 if not regex_ret:
                     if len(tmp[-1]) != 4:
-                        node_name_mismatch.append(str(each))
+                        node_name_mismatch.append(each)
             else:
-                node_name_mismatch.append(str(each))
+                node_name_mismatch.append(each)
 
         has_numeric = list(set(has_numeric))
         node_name_mismatch = list(set(node_name_mismatch))
@@ -325,6 +339,7 @@ class CheckNamespace(MayaValidations):
     """
     _name = "Namespace"
     _category = "Rigging Validations"
+    _watchAttrs = ()
 
     _asSelection = True
     _asFix = False
@@ -358,6 +373,9 @@ class CheckPluginRequired(MayaValidations):
     """
     _name = "Plugins required check"
     _category = "Rigging Validations"
+    # reads the saved file, only a scene save or open changes it.
+    _watchTypes = ()
+    _watchAttrs = ()
 
     def check(self):
         """
@@ -369,8 +387,7 @@ class CheckPluginRequired(MayaValidations):
         self.isFixable = False
         self.isNodes = True
 
-        problematic_plugins = ['sqtVelvetShader', 'poseReader', 'hairAndFur', 'rpmaya', 'nwPitNodes', 'nwLightingTools',
-                               'nwLightingTools']
+        problematic_plugins = plugin_lists.PROBLEMATIC_PLUGINS
         sceneFileName = str(pm.sceneName())
         errorPlugins = list()
         with open(sceneFileName, 'r') as readId:
@@ -397,6 +414,8 @@ class CheckRenderSet(MayaValidations):
     """
     _name = "RenderSet Check"
     _category = "Rigging Validations"
+    _watchTypes = ('objectSet', 'transform')
+    _watchAttrs = ('dagSetMembers',)
 
     def check(self):
         """
@@ -413,7 +432,7 @@ class CheckRenderSet(MayaValidations):
         geomGroupName = parser.get('NAME', 'geomgroupname')
 
         self.setStatus('OK')
-        renderSets = pm.ls(renderSetName, type='objectSet')
+        renderSets = self.snapshot.pyNodes(name=renderSetName, type='objectSet')
         if not renderSets:
             self.setStatus('ERROR')
             self.setErrorMessage('There is no RenderSet in the scene.')
@@ -440,6 +459,8 @@ class TexturePathCheck(MayaValidations):
     """
     _name = "Texture Path Check"
     _category = "Rigging Validations"
+    _watchTypes = ('file',)
+    _watchAttrs = ('fileTextureName',)
 
     def check(self):
         """
@@ -452,13 +473,13 @@ class TexturePathCheck(MayaValidations):
         self.isNodes = True
 
         errorNodes = list()
-        for each in pm.ls(type='file'):
+        for each in self.snapshot.pyNodes(type='file'):
             if not (each.fileTextureName.get()).startswith('$PROD_SERVER'):
                 errorNodes.append(each)
         self.setStatus('OK')
         if len(errorNodes):
             self.setStatus('ERROR')
-            self.errorNodes.extend(errorNodes)
+            self.errorStore.extend(errorNodes)
             self.setErrorMessage('%s file textures are from invalid paths.' % len(errorNodes))
             msg = 'Following file texture paths are not valid : \n'
             msg += '\n'.join([str(x) for x in errorNodes])
@@ -471,6 +492,8 @@ class ShapeDeformedCheck(MayaValidations):
     """
     _name = "ShapeDeformed Check"
     _category = "Rigging Validations"
+    _watchTypes = ('mesh',)
+    _watchAttrs = ()
 
     def check(self):
         """
@@ -485,13 +508,13 @@ class ShapeDeformedCheck(MayaValidations):
         # to_match = 'ShapeOrig'
 
         errorNodes = list()
-        for each in pm.ls(type='mesh'):
-            if to_match in str(each):
-                errorNodes.append(str(each))
+        for each in self.snapshot.ls(type='mesh', long=False):
+            if to_match in each:
+                errorNodes.append(each)
         self.setStatus('OK')
         if len(errorNodes):
             self.setStatus('ERROR')
-            self.errorNodes.extend(errorNodes)
+            self.errorStore.extend(errorNodes)
             msg = 'Following Nodes as not valid :\n'
             msg += '\n'.join(errorNodes)
             self.setErrorLog(msg)
@@ -503,6 +526,8 @@ class BDGTopGroupCheck(MayaValidations):
     """
     _name = "BDGTopGroupCheck"
     _category = "Rigging Validations (BDG)"
+    _watchTypes = ('dagNode',)
+    _watchAttrs = ()
 
     def check(self):
         """
@@ -515,7 +540,7 @@ class BDGTopGroupCheck(MayaValidations):
         self.isNodes = False
 
         defaults = ['persp', 'top', 'front', 'side']
-        top_groups = [str(x) for x in pm.ls(assemblies=1) if str(x) not in defaults]
+        top_groups = [x for x in self.snapshot.assemblies() if x not in defaults]
         self.setStatus('OK')
         if len([str(x) for x in top_groups]) > 1:
             self.setStatus('ERROR')
@@ -7,9 +7,13 @@ Abstract check class.
 The CheckAbstract class also has some static method to perfom usual check.
 """
 import re
+import time
 
 import weakref
 
+from Validations.core import error_store
+from Validations.core import validations
+
 
 class CheckAbstract(object):
     """@brief Abstract class for all the check.
@@ -25,6 +29,11 @@ class CheckAbstract(object):
     _category = ""
     _asSelection = False
     _asFix = False
+    # bump when the check changes what it reports, see Validations._version.
+    _version = 1
+    # False when the result doesn't only depend on the scene, see Validations._cacheable.
+    _cacheable = True
+    validationRun = None
 
     def __init__(self, parent, errorMode=False):
         super(CheckAbstract, self).__init__()
@@ -73,11 +82,17 @@ class CheckAbstract(object):
 
     # errorLog
     def _getErrorLog(self):
-        """@brief Return the error log.
+        """@brief Return the error log, the messages added by addErrors are formatted here.
 
         @return errorLog  (list of string)
         """
-        return self._errorLog
+        errorLog = list()
+        for error in self._errorLog:
+            if isinstance(error, basestring):
+                errorLog.append(error)
+            else:
+                errorLog.extend(error)
+        return errorLog
 
     def _setErrorLog(self, errorList):
         """@brief Set the error log.
@@ -95,12 +110,20 @@ class CheckAbstract(object):
         """
         self._errorLog.append(error)
 
+    def addErrors(self, template, errorNodes):
+        """@brief Add one error per error node, formatted only when the log is read.
+
+        @param template The message with a %s for the node name. (string)
+        @param errorNodes The error nodes the messages are about. (ErrorNodes)
+        """
+        self._errorLog.append(error_store.NodeMessages(template, errorNodes))
+
     def _getErrorTxt(self):
         """@brief Return the error log formated in a text.
 
         @return errorTxt (string)
         """
-        return "\n".join(self._errorLog)
+        return "\n".join(self.errorLog)
 
     errorTxt = property(_getErrorTxt)
 
@@ -170,13 +193,44 @@ class CheckAbstract(object):
 
     errorMessage = property(_getErrorMessage, _setErrorMessage)
 
-    def run(self):
+    def _getSnapshot(self):
+        """@brief Return the scene snapshot of the current run.
+
+        Outside of a run a fresh snapshot is built by the default backend on each access.
+
+        @return snapshot The scene snapshot. (SceneSnapshot)
+        """
+        if self.validationRun is None:
+            return validations.getBackend().buildSnapshot()
+        return self.validationRun.snapshot
+
+    snapshot = property(_getSnapshot)
+
+    def run(self, validationRun=None):
         """@brief Call the check function.
 
+        @param validationRun The run shared with the other checks. (ValidationRun)
+
         @return ok If the check is successful. (bool)
         """
+        for _ in self.iterRun(validationRun):
+            pass
+
+    def iterRun(self, validationRun=None):
+        """@brief Call the check function a chunk at a time.
+
+        The generator stops after each chunk of the check, see Validations.iterRun.
+
+        @param validationRun The run shared with the other checks. (ValidationRun)
+        """
         self.reset()
-        self.check()
+        with validations.boundRun(self, validationRun) as currentRun:
+            with currentRun.measure(self) as record:
+                for _ in self.iterCheck():
+                    paused = time.time()
+                    yield
+                    if record is not None:
+                        record.idleTime += time.time() - paused
 
     @staticmethod
     def check(self):
@@ -185,6 +239,15 @@ class CheckAbstract(object):
         """
         raise NotImplemented
 
+    def iterCheck(self):
+        """@brief Perform the check a chunk at a time, yielding between the chunks.
+
+        The checks going through the meshes override it to give the hand back between two meshes, by default the
+        whole check is one chunk.
+        """
+        self.check()
+        yield
+
     def reset(self):
         """@brief Reset the instance.
 
@@ -15,8 +15,12 @@ import pymel.core as pm
 
 import checkClasses
 
-reload(checkClasses)
+from Validations.core import dev_mode
+
+dev_mode.devReload(checkClasses)
 from checkClasses import CheckAbstract
+from Validations.core import stat_cache
+from Validations.core import template_cache
 
 SHOW = None
 
@@ -32,6 +36,16 @@ if 'SHOW_NAME' in os.environ:
 from source.Validations.core.Validations import path_generator
 from source.Validations.core.Validations import Validations
 
+def getTextureTemplates():
+    """@brief Return the texture publish and texture low publish template names of the show.
+
+    @return templates The texture and texture low template names. (tuple)
+    """
+    if not TYPE == 'MULTI':
+        return ("texture_publish_seq", "textureLow_publish")
+    return ("texture_publish_multi_seq", "textureLow_publish_multi")
+
+
 class CheckMayaAbstract(CheckAbstract):
     """@brief Abstract class for all maya the check
     """
@@ -130,6 +144,30 @@ class CheckMayaAbstract(CheckAbstract):
         self.errorNodes = list()
         self._errorDict = {}
 
+    def getTextures(self):
+        """@brief Return the file and aiImage nodes with their texture path, read once per run.
+
+        @return textures The (node, texture path) of every texture node. (list of tuple)
+        """
+        def read():
+            textures = [(node, node.fileTextureName.get()) for node in pm.ls(type="file")]
+            textures.extend((node, node.filename.get()) for node in pm.ls(type="aiImage"))
+            return textures
+
+        if self.validationRun is None:
+            return read()
+        return self.validationRun.getCached(("mayaChecks.textures",), read)
+
+    def getTemplateVerdicts(self):
+        """@brief Return the texture template verdicts of the run, with every texture validated against the
+        single or multi texture templates in one pass.
+
+        @return verdicts The template verdicts. (TemplateVerdicts)
+        """
+        verdicts = template_cache.getTemplateVerdicts(self.validationRun, self.parent.app)
+        verdicts.prefetch(getTextureTemplates(), [path for node, path in self.getTextures()])
+        return verdicts
+
 
 # ==============================================================================
 # Rigging
@@ -636,18 +674,11 @@ class CheckTextureLowInLibrary(CheckMayaAbstract):
         """
         badTextures = list()
 
-        textLowPublishTemplate = self.parent.app.get_template_by_name(
-            "textureLow_publish")
+        verdicts = self.getTemplateVerdicts()
 
-        for fileNode in pm.ls(type="file"):
-            filePath = os.path.abspath(fileNode.fileTextureName.get())
-            if not textLowPublishTemplate.validate(filePath, skip_keys=["udim"]):
-                badTextures.append(fileNode)
-
-        for aiImageNode in pm.ls(type="aiImage"):
-            filePath = os.path.abspath(aiImageNode.filename.get())
-            if not textLowPublishTemplate.validate(filePath, skip_keys=["udim"]):
-                badTextures.append(aiImageNode)
+        for textureNode, filePath in self.getTextures():
+            if not verdicts.validate("textureLow_publish", filePath):
+                badTextures.append(textureNode)
 
         if not badTextures:
             self.status = "OK"
@@ -688,24 +719,13 @@ class CheckTextureInLibrary(CheckMayaAbstract):
         """
         badTextures = list()
 
-        if not TYPE == 'MULTI':
-            textPublishTemplate = self.parent.app.get_template_by_name(
-                "texture_publish_seq")
-        else:
-            textPublishTemplate = self.parent.app.get_template_by_name(
-                "texture_publish_multi_seq")
-
-        for fileNode in pm.ls(type="file"):
-            print fileNode
-            filePath = os.path.abspath(fileNode.fileTextureName.get())
-            if not textPublishTemplate.validate(filePath, skip_keys=["udim"]):
-                badTextures.append(fileNode)
+        textPublishTemplate = getTextureTemplates()[0]
+        verdicts = self.getTemplateVerdicts()
 
-        for aiImageNode in pm.ls(type="aiImage"):
-            print aiImageNode
-            filePath = os.path.abspath(aiImageNode.filename.get())
-            if not textPublishTemplate.validate(filePath, skip_keys=["udim"]):
-                badTextures.append(aiImageNode)
+        for textureNode, filePath in self.getTextures():
+            print textureNode
+            if not verdicts.validate(textPublishTemplate, filePath):
+                badTextures.append(textureNode)
 
         if not badTextures:
             self.status = "OK"
@@ -746,27 +766,12 @@ class CheckTextureInAnyLibrary(CheckMayaAbstract):
         """
         badTextures = list()
 
-        if not TYPE == 'MULTI':
-            textPublishTemplate = self.parent.app.get_template_by_name(
-                "texture_publish_seq")
-            textLowPublishTemplate = self.parent.app.get_template_by_name(
-                "textureLow_publish")
-        else:
-            textPublishTemplate = self.parent.app.get_template_by_name(
-                "texture_publish_multi_seq")
-            textLowPublishTemplate = self.parent.app.get_template_by_name(
-                "textureLow_publish_multi")
-
-        for fileNode in pm.ls(type="file"):
-            filePath = os.path.abspath(fileNode.fileTextureName.get())
-
-            if not textPublishTemplate.validate(filePath, skip_keys=["udim"]) and not textLowPublishTemplate.validate(filePath, skip_keys=["udim"]):
-                badTextures.append(fileNode)
+        textPublishTemplate, textLowPublishTemplate = getTextureTemplates()
+        verdicts = self.getTemplateVerdicts()
 
-        for aiImageNode in pm.ls(type="aiImage"):
-            filePath = os.path.abspath(aiImageNode.filename.get())
-            if not textPublishTemplate.validate(filePath, skip_keys=["udim"]) and not textLowPublishTemplate.validate(filePath, skip_keys=["udim"]):
-                badTextures.append(aiImageNode)
+        for textureNode, filePath in self.getTextures():
+            if not verdicts.validate(textPublishTemplate, filePath) and not verdicts.validate(textLowPublishTemplate, filePath):
+                badTextures.append(textureNode)
 
         if not badTextures:
             self.status = "OK"
@@ -807,7 +812,7 @@ class CheckCacheInLibrary(CheckMayaAbstract):
         """
         badCachePath = list()
         badCacheNode = list()
-        cacheIn = getCacheInfoFromMaya()
+        cacheIn = getCacheInfoFromMaya(stat_cache.getStatCache(self.validationRun))
         cacheInScene = cacheIn.getCacheFromScene()
         # get the templates
 
@@ -869,7 +874,7 @@ class CheckCacheInWork(CheckMayaAbstract):
         """
         badCachePath = list()
         badCacheNode = list()
-        cacheIn = getCacheInfoFromMaya()
+        cacheIn = getCacheInfoFromMaya(stat_cache.getStatCache(self.validationRun))
         cacheInScene = cacheIn.getCacheFromScene()
         # get the templates
 
@@ -934,6 +939,15 @@ class CheckCacheInWork(CheckMayaAbstract):
 
 class getCacheInfoFromMaya(object):
 
+    def __init__(self, statCache=None):
+        """@brief The existence of the cache files is answered by the stat cache, one listing per cache folder.
+
+        @param statCache The stat cache of the run, a private one if not given. (StatCache)
+        """
+        super(getCacheInfoFromMaya, self).__init__()
+        self.statCache = statCache or stat_cache.StatCache()
+        self._cacheFiles = dict()
+
     def getCacheFromScene(self):
         cacheInfo = {}
 
@@ -952,6 +966,9 @@ class getCacheInfoFromMaya(object):
             cacheInfo['alembic'] = alembicFileNode
 
         mayaNCacheNode = cmds.ls(type='cacheFile')
+        for cacheNode in mayaNCacheNode:
+            self._cacheFiles[cacheNode] = cmds.cacheFile(cacheNode, query=True, f=True) or []
+        self.statCache.prefetch([x for files in self._cacheFiles.values() for x in files])
 
         mayaCacheInfo = {}
         for cacheNode in mayaNCacheNode:
@@ -965,10 +982,12 @@ class getCacheInfoFromMaya(object):
     def getMayaCachePath(self, mayaCacheFileNode):
         mayaCacheInfo = {}
         mayaCaches = {}
-        mayaNCache = cmds.cacheFile(mayaCacheFileNode, query=True, f=True)
+        mayaNCache = self._cacheFiles.get(mayaCacheFileNode)
+        if mayaNCache is None:
+            mayaNCache = cmds.cacheFile(mayaCacheFileNode, query=True, f=True) or []
         for cache in mayaNCache:
             if cache.endswith('mc'):
-                if os.path.exists(cache):
+                if self.statCache.exists(cache):
                     mayaCacheInfo['path'] = cache
                     mayaCacheInfo['type'] = 'mc'
                     mayaCaches['cacheFile'] = mayaCacheInfo
@@ -22,6 +22,13 @@ import maya.mel as mayaMel
 
 
 from checkClasses import CheckAbstract
+from Validations.core import error_store
+from Validations.core import mesh_analysis
+from Validations.core import template_cache
+
+
+# the texture templates of the library checks, all validated in one pass on the first check asking.
+TEXTURE_TEMPLATES = ("texture_publish", "textureLow_publish")
 
 
 
@@ -33,7 +40,7 @@ class CheckMayaAbstract(CheckAbstract):
 
     def __init__(self, *args):
         super(CheckMayaAbstract, self).__init__(*args)
-        self._errorNodes = list()
+        self.errorStore = error_store.ErrorNodes()
 
     def _getAsSelection(self):
         """@brief Return if the Check can select the error nodes.
@@ -55,18 +62,18 @@ class CheckMayaAbstract(CheckAbstract):
 
 
     def _getErrorNodes(self):
-        """@brief Return the error nodes.
+        """@brief Return the error nodes still in the scene, they are kept in the compact errorStore.
 
         @return errorNodes The list of the nodes that fails the check. (list of pm.node)
         """
-        return self._errorNodes
+        return self.errorStore.resolve()
 
     def _setErrorNodes(self, errorNodes):
         """@brief Set the error nodes.
 
         @param errorNodes list of nodes that fails the check. (list of pm.node)
         """
-        self._errorNodes = errorNodes
+        self.errorStore = error_store.ErrorNodes(errorNodes)
 
     errorNodes = property(_getErrorNodes, _setErrorNodes)
 
@@ -75,7 +82,7 @@ class CheckMayaAbstract(CheckAbstract):
 
         @param errorNode A node that fails the check. (pm.node)
         """
-        self.errorNodes.append(errorNode)
+        self.errorStore.append(errorNode)
 
     def selectErrorNodes(self):
         """@brief select the nodes that fails the check.
@@ -96,6 +103,29 @@ class CheckMayaAbstract(CheckAbstract):
         super(CheckMayaAbstract, self).reset()
         self.errorNodes = list()
 
+    def getTextures(self):
+        """@brief Return the file and aiImage nodes with their texture path, read once per run.
+
+        @return textures The (node, texture path) of every texture node. (list of tuple)
+        """
+        def read():
+            textures = [(node, node.fileTextureName.get()) for node in self.snapshot.pyNodes(type="file")]
+            textures.extend((node, node.filename.get()) for node in self.snapshot.pyNodes(type="aiImage"))
+            return textures
+
+        if self.validationRun is None:
+            return read()
+        return self.validationRun.getCached(("mayaSanityCheck.textures",), read)
+
+    def getTemplateVerdicts(self):
+        """@brief Return the texture template verdicts of the run, with every texture validated.
+
+        @return verdicts The template verdicts. (TemplateVerdicts)
+        """
+        verdicts = template_cache.getTemplateVerdicts(self.validationRun, self.parent.app)
+        verdicts.prefetch(TEXTURE_TEMPLATES, [path for node, path in self.getTextures()])
+        return verdicts
+
 
 
 
@@ -118,7 +148,7 @@ class CheckUnknownNodes(CheckMayaAbstract):
     def check(self):
         """@brief Check for unknown node and add them to errors node.
         """
-        unknownNodes = pm.ls(type="unknown")
+        unknownNodes = self.snapshot.pyNodes(type="unknown")
         if not unknownNodes :
             self.status = "OK"
         else :
@@ -156,7 +186,7 @@ class CheckDuplicateName(CheckMayaAbstract):
         """@brief Check for nodes with duplicate name and add them to errors node.
         """
         duplicateNames = list()
-        for node in pm.ls() :
+        for node in self.snapshot.pyNodes() :
             if "|" in str(node) :
                 if not node.isInstanced():
                     duplicateNames.append(node)
@@ -190,6 +220,8 @@ class CheckFilePathAsset(CheckMayaAbstract):
 
     _asSelection = False
     _asFix = False
+    # the textures are looked for on the server.
+    _cacheable = False
 
     def check(self):
         """@brief Check if the filename contains a version number in the right format.
@@ -217,7 +249,7 @@ class CheckImagesPlanes(CheckMayaAbstract):
     def check(self):
         """@brief Check for images planes on the scene
         """
-        imagesP = pm.ls(type="imagePlane")
+        imagesP = self.snapshot.pyNodes(type="imagePlane")
         if not imagesP :
             self.status = "OK"
         else :
@@ -254,7 +286,7 @@ class CheckCameras(CheckMayaAbstract):
     def check(self):
         """@brief Check cameras on scene
         """
-        cams = pm.ls(type="camera")
+        cams = self.snapshot.pyNodes(type="camera")
 
         for defaultCam in ("frontShape", "perspShape", "sideShape", "topShape"):
             cams.remove(defaultCam)
@@ -310,7 +342,7 @@ class CheckUnusedNodes(CheckMayaAbstract):
 
         # # List what kind of objects exits on scene
         for shadeNode in fullShadeList:
-            typeOfNode = pm.ls(type=shadeNode)
+            typeOfNode = self.snapshot.pyNodes(type=shadeNode)
             if not type:
                 pass
             else:
@@ -405,7 +437,7 @@ class CheckLights(CheckMayaAbstract):
     def check(self):
         """@brief Check for Maya lights in scene
         """
-        lights = pm.ls(type="light")
+        lights = self.snapshot.pyNodes(type="light")
         if not lights :
             self.status = "OK"
         else :
@@ -457,7 +489,7 @@ class CheckEmptyGroups(CheckMayaAbstract):
         """
         emptyGroup = list()
         
-        for group in pm.ls(exactType="transform") :
+        for group in self.snapshot.pyNodes(exactType="transform") :
             if not group.getShapes() and not group.listRelatives() :
                 emptyGroup.append(group)
         
@@ -541,7 +573,7 @@ class CheckCleanHierarchy(CheckMayaAbstract):
         """
 
 
-        if len(pm.ls(assemblies=True)) < 6 :
+        if len(self.snapshot.assemblies()) < 6 :
             self.status = "OK"
         else :
             self.status = self.errorMode
@@ -648,7 +680,7 @@ class CheckRenderStats(CheckMayaAbstract):
         lib["visibleInRefractions"] = True
         lib["doubleSided"] = False
         lib["opposite"] = False
-        geometries = pm.ls(type="mesh")
+        geometries = self.snapshot.pyNodes(type="mesh")
         checkValue = "OK"
         meshes = []
         for geo in geometries:
@@ -706,7 +738,7 @@ class CheckDefaultShader(CheckMayaAbstract):
     def check(self):
         """@brief Check if the geometry have the default Lambert shader applied to them
         """
-        meshes = pm.ls(type="mesh")
+        meshes = self.snapshot.pyNodes(type="mesh")
         objects = list()
         self.shaders = list()
 
@@ -775,30 +807,34 @@ class CheckNgons(CheckMayaAbstract):
         
         @param dagName The name of the object that need to be checked. (string)
         
-        @return badFaces Face with more that 4 vertices. (list of string)
+        @return badFaces Face ranges with more that 4 vertices. (ComponentRanges)
         """
-        cmds.select('{0}.f[*]'.format(dagName))
-        cmds.polySelectConstraint(type=8, size=3, mode=2)
-        cmds.polySelectConstraint(disable=True)
-        return cmds.ls(sl=True)
+        topology = mesh_analysis.getTopology(self.validationRun, str(dagName))
+        return error_store.ComponentRanges(str(dagName), 'f', topology.ngons)
 
 
     def check(self):
-        """@brief Check if the geometry has more than 4 vertices per face
+        """@brief Run the whole check at once, for the callers not going chunk by chunk.
+        """
+        for _ in self.iterCheck():
+            pass
+
+    def iterCheck(self):
+        """@brief Check if the geometry has more than 4 vertices per face, one mesh at a time.
         """
-        badFaces = list()
+        badFaces = error_store.ErrorNodes()
 
-        for mesh in pm.ls(type="mesh"):
+        for mesh in self.snapshot.pyNodes(type="mesh"):
             if not pm.objExists(mesh.name() + ".grid_noCheck") and pm.objExists(mesh.name() + ".grid_renderGeo"):
-                badFaces.extend(self.checkNgons(mesh))
+                badFaces.append(self.checkNgons(mesh))
+                yield
 
         if not badFaces :
             self.status = "OK"
         else :
             self.status = self.errorMode
-            self.errorNodes = badFaces
-            for obj in badFaces :
-                self.addError("%s faces have more than 4 vertex" % obj)
+            self.errorStore = badFaces
+            self.addErrors("%s faces have more than 4 vertex", badFaces)
             self.errorMessage = "%s faces have more than 4 vertex" % (len(badFaces))
         
 
@@ -824,30 +860,34 @@ class CheckConcaveFaces(CheckMayaAbstract):
         
         @param dagName The name of the object that need to be checked. (string)
         
-        @return badFaces Concave face. (list of string)
+        @return badFaces Concave face ranges. (ComponentRanges)
         """
-        cmds.select('{0}.f[*]'.format(dagName))
-        cmds.polySelectConstraint(type=8, convexity=1, mode=2)
-        cmds.polySelectConstraint(disable=True)
-        return cmds.ls(sl=True)
+        topology = mesh_analysis.getTopology(self.validationRun, str(dagName))
+        return error_store.ComponentRanges(str(dagName), 'f', topology.concaveFaces)
 
 
     def check(self):
-        """@brief Check if the geometry contains concave face.
+        """@brief Run the whole check at once, for the callers not going chunk by chunk.
         """
-        badFaces = list()
+        for _ in self.iterCheck():
+            pass
 
-        for mesh in pm.ls(type="mesh"):
+    def iterCheck(self):
+        """@brief Check if the geometry contains concave face, one mesh at a time.
+        """
+        badFaces = error_store.ErrorNodes()
+
+        for mesh in self.snapshot.pyNodes(type="mesh"):
             if not pm.objExists(mesh.name() + ".grid_noCheck") and pm.objExists(mesh.name() + ".grid_renderGeo"):
-                badFaces.extend(self.checkConcaveFaces(mesh))
+                badFaces.append(self.checkConcaveFaces(mesh))
+                yield
 
         if not badFaces :
             self.status = "OK"
         else :
             self.status = self.errorMode
-            self.errorNodes = badFaces
-            for obj in badFaces :
-                self.addError("%s is concave" % obj)
+            self.errorStore = badFaces
+            self.addErrors("%s is concave", badFaces)
             self.errorMessage = "%s concave face(s)" % (len(badFaces))
         
 
@@ -873,30 +913,34 @@ class CheckLoneVertex(CheckMayaAbstract):
         
         @param dagName The name of the object that need to be checked. (string)
         
-        @return loneVertex Lone vertexs. (list of string)
+        @return loneVertex Lone vertex ranges. (ComponentRanges)
         """
-        cmds.select('{0}.vtx[*]'.format(dagName))
-        cmds.polySelectConstraint(type=1, angle=True, anglebound=[0, 180], mode=2, w=2)
-        cmds.polySelectConstraint(disable=True)
-        return cmds.ls(sl=True)
+        topology = mesh_analysis.getTopology(self.validationRun, str(dagName))
+        return error_store.ComponentRanges(str(dagName), 'vtx', topology.loneVertices)
 
 
     def check(self):
-        """@brief Check if the geometry contains lone vertex.
+        """@brief Run the whole check at once, for the callers not going chunk by chunk.
+        """
+        for _ in self.iterCheck():
+            pass
+
+    def iterCheck(self):
+        """@brief Check if the geometry contains lone vertex, one mesh at a time.
         """
-        loneVertexs = list()
+        loneVertexs = error_store.ErrorNodes()
 
-        for mesh in pm.ls(type="mesh"):
+        for mesh in self.snapshot.pyNodes(type="mesh"):
             if not pm.objExists(mesh.name() + ".grid_noCheck") and pm.objExists(mesh.name() + ".grid_renderGeo"):
-                loneVertexs.extend(self.checkLoneVertex(mesh))
+                loneVertexs.append(self.checkLoneVertex(mesh))
+                yield
 
         if not loneVertexs :
             self.status = "OK"
         else :
             self.status = self.errorMode
-            self.errorNodes = loneVertexs
-            for obj in loneVertexs :
-                self.addError("%s is a lone vertex" % obj)
+            self.errorStore = loneVertexs
+            self.addErrors("%s is a lone vertex", loneVertexs)
             self.errorMessage = "%s lone vertex(s)" % (len(loneVertexs))
         
 
@@ -965,41 +1009,51 @@ class CheckNonMergedOpenBorders(CheckMayaAbstract):
 
     _asSelection = True
     _asFix = False
-    
+    # border vertices closer than this are taken as not merged.
+    _mergeTolerance = mesh_analysis.MERGE_TOLERANCE
+
     def checkNonMergedOpenBorders(self, dagName):
         """@brief Check for non merged open borders.
+
+        Read only, the border edges come from the edge face incidence and the coincident border vertices from a
+        spatial hash, so the history of the mesh is kept.
         
         @param dagName The name of the object that need to be checked. (string)
         
-        @return edges Non merged edges. (list of string)
+        @return edges Non merged edge ranges. (ComponentRanges)
         """
-        node = pm.polyCloseBorder(dagName, constructionHistory=True)[0]
-        cmds.select('{0}.f[*]'.format(dagName))
-        cmds.polySelectConstraint(type=8, geometricarea=True, geometricareabound=[0, 0.000001], mode=2)
-        cmds.polySelectConstraint(disable=True)
-        edges = cmds.polyListComponentConversion(fromFace=True, toEdge=True)
-        pm.delete(node)
-        pm.delete(dagName, ch=True)
-        return edges
+        meshData = mesh_analysis.getMeshData(self.validationRun, dagName)
+        topology = mesh_analysis.getTopology(self.validationRun, dagName)
+        unmerged = mesh_analysis.findUnmergedBorders(meshData, topology, self._mergeTolerance)
+        if not unmerged:
+            return error_store.ComponentRanges(dagName, 'e')
+        edgeIds = topology.edgeIds
+        return error_store.ComponentRanges(dagName, 'e', [edgeIds[x] for x in unmerged])
 
 
 
     def check(self):
-        """@brief Check Non merged open borders.
+        """@brief Run the whole check at once, for the callers not going chunk by chunk.
+        """
+        for _ in self.iterCheck():
+            pass
+
+    def iterCheck(self):
+        """@brief Check Non merged open borders, one mesh at a time.
         """
-        nonMerged = list()
+        nonMerged = error_store.ErrorNodes()
 
-        for mesh in pm.ls(type="mesh"):
+        for mesh in self.snapshot.pyNodes(type="mesh"):
             if not pm.objExists(mesh.name() + ".grid_noCheck") and pm.objExists(mesh.name() + ".grid_renderGeo"):
-                nonMerged.extend(self.checkNonMergedOpenBorders(mesh.getParent().name()))
+                nonMerged.append(self.checkNonMergedOpenBorders(mesh.name()))
+                yield
 
         if not nonMerged :
             self.status = "OK"
         else :
             self.status = self.errorMode
-            self.errorNodes = nonMerged
-            for obj in nonMerged :
-                self.addError("%s is a non merged edge" % obj)
+            self.errorStore = nonMerged
+            self.addErrors("%s is a non merged edge", nonMerged)
             self.errorMessage = "%s Non merged open border(s)" % (len(nonMerged))
         
 
@@ -1025,7 +1079,7 @@ class CheckAttrsLimits(CheckMayaAbstract):
     def check(self):
         """@brief Check if all transform nodes have no limits on them
         """
-        transformNodes = pm.ls(type="transform")
+        transformNodes = self.snapshot.pyNodes(type="transform")
         objects = []
 
         checkValue = "OK"
@@ -1083,7 +1137,7 @@ class CheckTransforms(CheckMayaAbstract):
     def check(self):
         """@brief Check if the geometry have values on translate, rotate or scale
         """
-        meshes = pm.ls(type="mesh")
+        meshes = self.snapshot.pyNodes(type="mesh")
         objects = []
 
         attributesToCheck = "translate", "rotate"
@@ -1143,7 +1197,7 @@ class CheckPivots(CheckMayaAbstract):
     def check(self):
         """@brief Check if the geometry has the pivot on a different place than Maya's origin
         """
-        meshes = pm.ls(type="mesh")
+        meshes = self.snapshot.pyNodes(type="mesh")
         objects = []
 
         for mesh in meshes:
@@ -1198,7 +1252,7 @@ class CheckDisplayLayers(CheckMayaAbstract):
     def check(self):
         """@brief Check if the Maya scene has more than 1 display layers
         """
-        layers = pm.ls(type="displayLayer")
+        layers = self.snapshot.pyNodes(type="displayLayer")
         layers.remove("defaultLayer")
 
         if not layers :
@@ -1240,7 +1294,7 @@ class CheckLockAttrs(CheckMayaAbstract):
     def check(self):
         """@brief Check if any object has any locked attribute
         """
-        transformNode = pm.ls(type="transform")
+        transformNode = self.snapshot.pyNodes(type="transform")
         if pm.objExists("*GAST"):
             transformNode.remove("*GAST")
         objects = []
@@ -1294,7 +1348,7 @@ class CheckKeyframes(CheckMayaAbstract):
     def check(self):
         """@brief Check if scene has keyframes
         """
-        keys = pm.ls(type="animCurve")
+        keys = self.snapshot.pyNodes(type="animCurve")
 
         if not keys :
             self.status = "OK"
@@ -1333,7 +1387,7 @@ class CheckPolySmooth(CheckMayaAbstract):
     def check(self):
         """@brief Check if polySmooth nodes exists on scene
         """
-        polySmoothNode = pm.ls(type="polySmoothFace")
+        polySmoothNode = self.snapshot.pyNodes(type="polySmoothFace")
 
         if not polySmoothNode :
             self.status = "OK"
@@ -1378,7 +1432,7 @@ class CheckSmooth(CheckMayaAbstract):
     def check(self):
         """@brief Check if geometries are been displayed with smooth on viewport
         """
-        meshes = pm.ls(type="mesh")
+        meshes = self.snapshot.pyNodes(type="mesh")
         objects = []
 
         for mesh in meshes:
@@ -1465,7 +1519,7 @@ class CheckHistory(CheckMayaAbstract):
                     objects.append(mesh)
          
         # # Checks if objects have shader           
-        sel = pm.ls(type='mesh')
+        sel = self.snapshot.pyNodes(type='mesh')
         shaderObjects = list()
         
         for obj in sel:
@@ -1538,7 +1592,7 @@ class CheckFaceNormals(CheckMayaAbstract):
     def check(self):
         """@brief Check if geometries have flipped face normals.
         """
-        meshes = pm.ls(type="mesh")
+        meshes = self.snapshot.pyNodes(type="mesh")
         objects = []
         normals = []
 
@@ -1639,7 +1693,6 @@ class CheckNonManifold(CheckMayaAbstract):
 # Locked Vertex Normals
 #=======================================
 
-# TODO : to slow
 class CheckVertexNormals(CheckMayaAbstract):
     """@brief Check if objects have locked normals
     """
@@ -1654,18 +1707,20 @@ class CheckVertexNormals(CheckMayaAbstract):
     def check(self):
         """@brief Check if geometries have locked normals.
         """
-        meshes = pm.ls(type="mesh")
+        meshes = self.snapshot.pyNodes(type="mesh")
         objects = []
+        components = {}
 
         for mesh in meshes:
             if not pm.objExists(mesh.name() + ".grid_noCheck") and pm.objExists(mesh.name() + ".grid_renderGeo"):
-                numsOfVertex = pm.polyEvaluate(mesh, v=True)
-                for vertex in range(0, numsOfVertex, 1):
-                    normals = pm.polyNormalPerVertex('%s.vtx[%s]' % (mesh, vertex), q=True, fn=True)
-                    if True in normals:
-                        father = mesh.getParent()
+                lockedVertices = mesh_analysis.getMeshData(self.validationRun, mesh.name()).lockedNormalVertices()
+                if lockedVertices:
+                    father = mesh.getParent()
+                    # a transform can hold several checked shapes, their components are kept together.
+                    if father not in components:
                         objects.append(father)
-                        break
+                        components[father] = []
+                    components[father].extend(mesh_analysis.componentRanges(mesh.name(), lockedVertices))
 
         if not objects :
             self.status = "OK"
@@ -1673,7 +1728,7 @@ class CheckVertexNormals(CheckMayaAbstract):
             self.status = self.errorMode
             self.errorNodes = objects
             for obj in objects :
-                self.addError("%s has locked  normals" % obj)
+                self.addError("%s has locked  normals : %s" % (obj, " ".join(components[obj])))
             self.errorMessage = "%s objects have locked normals." % (len(objects))
 
     def fix(self):
@@ -1695,8 +1750,6 @@ class CheckVertexNormals(CheckMayaAbstract):
 # Vertex Transform
 #=======================================
 
-# TODO : to slow
-
 class CheckVertexTransform(CheckMayaAbstract):
     """@brief Check if objects have vertex with transforms normals
     """
@@ -1711,18 +1764,20 @@ class CheckVertexTransform(CheckMayaAbstract):
     def check(self):
         """@brief Check if geometries have vertex with transform values.
         """
-        meshes = pm.ls(type="mesh")
+        meshes = self.snapshot.pyNodes(type="mesh")
         objects = []
+        components = {}
 
         for mesh in meshes:
             if not pm.objExists(mesh.name() + ".grid_noCheck") and pm.objExists(mesh.name() + ".grid_renderGeo"):
-                numsOfVertex = pm.polyEvaluate(mesh, v=True)
-                for vertex in range(0, numsOfVertex, 1):
-                    values = mesh.attr('pnts[%s]' % vertex).get()
-                    if values != (0.0, 0.0, 0.0):
-                        father = mesh.getParent()
+                tweakedVertices = mesh_analysis.getMeshData(self.validationRun, mesh.name()).tweakedVertices()
+                if tweakedVertices:
+                    father = mesh.getParent()
+                    # a transform can hold several checked shapes, their components are kept together.
+                    if father not in components:
                         objects.append(father)
-                        break
+                        components[father] = []
+                    components[father].extend(mesh_analysis.componentRanges(mesh.name(), tweakedVertices))
 
         if not objects :
             self.status = "OK"
@@ -1730,7 +1785,7 @@ class CheckVertexTransform(CheckMayaAbstract):
             self.status = self.errorMode
             self.errorNodes = objects
             for obj in objects :
-                self.addError("%s have vertex transformations" % obj)
+                self.addError("%s have vertex transformations : %s" % (obj, " ".join(components[obj])))
             self.errorMessage = "%s objects have vertex transformation." % (len(objects))
 
     def fix(self):
@@ -1832,7 +1887,7 @@ class CheckDuplicateTextures(CheckMayaAbstract):
         """
         texturesPaths = dict()
         # get all the file nodes that are not referenced
-        fileNodes = [fileNode for fileNode in pm.ls(type="file") if not fileNode.isReferenced()]
+        fileNodes = self.snapshot.pyNodes(type="file", referenced=False)
         for fileNode in fileNodes :
             texturePath = fileNode.fileTextureName.get()
             try :
@@ -1860,12 +1915,12 @@ class CheckDuplicateTextures(CheckMayaAbstract):
         """
         for texturesPath, fileNodes in self._getDuplicateFileNode().items() :
             if len(fileNodes) > 1 :
-                self.errorNodes.extend(fileNodes)
+                self.errorStore.extend(fileNodes)
                 self.addError("multiple file nodes point to %s" % texturesPath)
 
-        if self.errorNodes :
+        if self.errorStore :
             self.status = self.errorMode
-            self.errorMessage = "%s FileNodes are duplicate" % (len(self.errorNodes))
+            self.errorMessage = "%s FileNodes are duplicate" % (len(self.errorStore))
         else :
             self.status = "OK"
 
@@ -1913,7 +1968,7 @@ class CheckGhostShapes(CheckMayaAbstract):
         """@brief Check for shapes without any connection
         """
         
-        meshes = pm.ls(type="mesh")
+        meshes = self.snapshot.pyNodes(type="mesh")
         ghostShapes = []
 
 
@@ -1957,55 +2012,50 @@ class CheckReverseUv(CheckMayaAbstract):
 
     _asSelection = True
     _asFix = False
-    
+    # a mesh is reported when it has more reversed or unmapped faces than this.
+    _reversedFacesLimit = 3
+
     def checkReversedUVs(self, dagName):
         """@brief Return the uv that a reverse.
         
         @param dagName The name of the object that need to be checked. (string)
         
-        @return reversedUv
-        """
-        inversedUv = list()
-        selection = om.MSelectionList()
-        selection.add(dagName)
-        if not selection.isEmpty() :
-            mesh = om.MFnMesh(selection.getDagPath(0))
-            for polyIndex in xrange(mesh.numPolygons):
-                try :
-                    pointList = []
-                    for pointIndex in xrange(3):
-                        pointList.append(mesh.getPolygonUV(polyIndex, pointIndex))
-                    edges = (
-                        (pointList[1][0] - pointList[0][0], pointList[1][1] - pointList[0][1]),
-                        (pointList[2][0] - pointList[1][0], pointList[2][1] - pointList[1][1]))
-                    if (edges[0][0] * edges[1][1]) - (edges[0][1] * edges[1][0]) < 0 :
-                        inversedUv.append("%s.map[%s]" % (dagName, polyIndex))
-                except RuntimeError :
-                    inversedUv.append(dagName)
-        
-        if len(inversedUv) > 3 :
+        @return reversedUv The reversed faces and shells ranges, the mesh name for the unmapped faces. (ErrorNodes)
+        """
+        inversedUv = error_store.ErrorNodes()
+        reversedFaces = 0
+        unmapped = False
+        for analysis in mesh_analysis.getUvAnalyses(self.validationRun, dagName):
+            reversedFaces += len(analysis.flippedFaces) + len(analysis.unmappedFaces)
+            inversedUv.addComponents(dagName, 'f', analysis.flippedFaces)
+            for shell in analysis.flippedShells:
+                inversedUv.addComponents(dagName, 'map', shell)
+            if analysis.unmappedFaces and not unmapped:
+                unmapped = True
+                inversedUv.append(dagName)
+
+        if reversedFaces > self._reversedFacesLimit :
             return inversedUv
         else :
-            return []
+            return error_store.ErrorNodes()
 
 
     def check(self):
         """@brief Check for inversed uv.
         """
-        inversedUvs = list()
+        inversedUvs = error_store.ErrorNodes()
         
-        for mesh in pm.ls(type="mesh") :
+        for mesh in self.snapshot.pyNodes(type="mesh") :
             if not pm.objExists(mesh.name() + ".grid_noCheck") and pm.objExists(mesh.name() + ".grid_renderGeo"):
-                inversedUvs.extend(self.checkReversedUVs(mesh.getParent().name()))
+                inversedUvs.extend(self.checkReversedUVs(mesh.name()).names())
             
 
         if not inversedUvs :
             self.status = "OK"
         else :
             self.status = self.errorMode
-            self.errorNodes = inversedUvs
-            for uv in inversedUvs :
-                self.addError("%s is inversed." % uv)
+            self.errorStore = inversedUvs
+            self.addErrors("%s is inversed.", inversedUvs)
             self.errorMessage = "%s inversed uv's." % (len(inversedUvs))
 
     def select(self):
@@ -2029,7 +2079,7 @@ class CheckMeshName(CheckMayaAbstract):
         
         prog = re.compile("^[a-z][a-zA-Z]+_[C|L|R|F|B|U|D]_[0-9]{3}_DMSH[0-9]{2}Shape$")
         
-        for mesh in pm.ls(type="mesh") :
+        for mesh in self.snapshot.pyNodes(type="mesh") :
             # get only the last part of the name to avoid the problems when geometry are instanced
             if not prog.match(mesh.shortName().split("|")[-1]) :
                 badNamedMeshes.append(mesh)
@@ -2066,7 +2116,7 @@ class CheckMeshTransformName(CheckMayaAbstract):
         
         prog = re.compile("^[a-z][a-zA-Z]+_[C|L|R|F|B|U|D]_[0-9]{3}_DMSH$")
         
-        for mesh in pm.ls(type="mesh") :
+        for mesh in self.snapshot.pyNodes(type="mesh") :
             transform = mesh.getParent()
             # get only the last part of the name to avoid the problem with the instance
             # TODO : check for a cleaner way to get the real shortname
@@ -2104,7 +2154,7 @@ class CheckGroupName(CheckMayaAbstract):
         
         prog = re.compile("^[a-z][a-zA-Z]+_[C|L|R|F|B|U|D]_[0-9]{3}_GRUP$")
         
-        for group in pm.ls(exactType="transform") :
+        for group in self.snapshot.pyNodes(exactType="transform") :
             if not group.isReferenced() :
                 if not pm.objExists(group.name() + ".grid_noCheck") :
                     if not group.getShapes():
@@ -2140,7 +2190,7 @@ class CheckMeshLockedTransform(CheckMayaAbstract):
         """
         unlockedTransforms = list()
         
-        for mesh in pm.ls(type="mesh") :
+        for mesh in self.snapshot.pyNodes(type="mesh") :
             meshTransform = mesh.getParent()
             for attribute in ["tx", "ty", "tz",
                                "rx", "ry", "rz",
@@ -2221,7 +2271,7 @@ class CheckUselessConstrains(CheckMayaAbstract):
         """@brief Check if they are constrains without output connections
         """
         
-        constrains = pm.ls(type='constraint')
+        constrains = self.snapshot.pyNodes(type='constraint')
         uselessConstrains = []
         
         for const in constrains:
@@ -2472,6 +2522,8 @@ class CheckTextureLowInLibrary(CheckMayaAbstract):
 
     _asSelection = True
     _asFix = False
+    # the textures are looked for on the server.
+    _cacheable = False
     
     def check(self):
         """@brief Check if all the texture in the scene are low res texture in the library.
@@ -2479,17 +2531,11 @@ class CheckTextureLowInLibrary(CheckMayaAbstract):
         badTextures = list()
         
         
-        textLowPublishTemplate = self.parent.app.get_template_by_name("textureLow_publish")
+        verdicts = self.getTemplateVerdicts()
         
-        for fileNode in pm.ls(type="file") :
-            filePath = os.path.abspath(fileNode.fileTextureName.get())
-            if not textLowPublishTemplate.validate(filePath, skip_keys=["udim"]) :
-                badTextures.append(fileNode)
-                
-        for aiImageNode in pm.ls(type="aiImage") :
-            filePath = os.path.abspath(aiImageNode.filename.get())
-            if not textLowPublishTemplate.validate(filePath, skip_keys=["udim"]) :
-                badTextures.append(aiImageNode)
+        for textureNode, filePath in self.getTextures() :
+            if not verdicts.validate("textureLow_publish", filePath) :
+                badTextures.append(textureNode)
                 
         if not badTextures :
             self.status = "OK"
@@ -2520,6 +2566,8 @@ class CheckTextureInLibrary(CheckMayaAbstract):
 
     _asSelection = True
     _asFix = False
+    # the textures are looked for on the server.
+    _cacheable = False
     
     def check(self):
         """@brief Check if all the textures in the scene are texture in the library.
@@ -2527,19 +2575,12 @@ class CheckTextureInLibrary(CheckMayaAbstract):
         badTextures = list()
         
         
-        textPublishTemplate = self.parent.app.get_template_by_name("texture_publish")
+        verdicts = self.getTemplateVerdicts()
         
-        for fileNode in pm.ls(type="file") :
-            print fileNode
-            filePath = os.path.abspath(fileNode.fileTextureName.get())
-            if not textPublishTemplate.validate(filePath, skip_keys=["udim"]) :
-                badTextures.append(fileNode)
-                
-        for aiImageNode in pm.ls(type="aiImage") :
-            print aiImageNode
-            filePath = os.path.abspath(aiImageNode.filename.get())
-            if not textPublishTemplate.validate(filePath, skip_keys=["udim"]) :
-                badTextures.append(aiImageNode)
+        for textureNode, filePath in self.getTextures() :
+            print textureNode
+            if not verdicts.validate("texture_publish", filePath) :
+                badTextures.append(textureNode)
                 
         if not badTextures :
             self.status = "OK"
@@ -2569,6 +2610,8 @@ class CheckTextureInAnyLibrary(CheckMayaAbstract):
 
     _asSelection = True
     _asFix = False
+    # the textures are looked for on the server.
+    _cacheable = False
     
     def check(self):
         """@brief Check if all the textures or texture low in the scene are texture in the library.
@@ -2576,18 +2619,11 @@ class CheckTextureInAnyLibrary(CheckMayaAbstract):
         badTextures = list()
         
         
-        textPublishTemplate = self.parent.app.get_template_by_name("texture_publish")
-        textLowPublishTemplate = self.parent.app.get_template_by_name("textureLow_publish")
+        verdicts = self.getTemplateVerdicts()
         
-        for fileNode in pm.ls(type="file") :
-            filePath = os.path.abspath(fileNode.fileTextureName.get())
-            if not textPublishTemplate.validate(filePath, skip_keys=["udim"]) and not textLowPublishTemplate.validate(filePath, skip_keys=["udim"]):
-                badTextures.append(fileNode)
-                
-        for aiImageNode in pm.ls(type="aiImage") :
-            filePath = os.path.abspath(aiImageNode.filename.get())
-            if not textPublishTemplate.validate(filePath, skip_keys=["udim"]) and not textLowPublishTemplate.validate(filePath, skip_keys=["udim"]):
-                badTextures.append(aiImageNode)
+        for textureNode, filePath in self.getTextures() :
+            if not verdicts.validate("texture_publish", filePath) and not verdicts.validate("textureLow_publish", filePath):
+                badTextures.append(textureNode)
             
                 
         if not badTextures :
@@ -2628,7 +2664,7 @@ class CheckMeshReferenced(CheckMayaAbstract):
         nonReferencedMesh = list()
         
         
-        for mesh in pm.ls(type="mesh") :
+        for mesh in self.snapshot.pyNodes(type="mesh") :
             if not pm.objExists(mesh.name() + ".grid_noCheck") :
                 if not mesh.isReferenced() :
                     nonReferencedMesh.append(mesh)
@@ -2661,7 +2697,7 @@ class CheckModLowMeshTransform(CheckMayaAbstract):
         """
         transformedMesh = list()
         
-        for assetNode in pm.ls(type="gAsset") :
+        for assetNode in self.snapshot.pyNodes(type="gAsset") :
             if assetNode.grid_pipeStep.get(asString=True) == "modLow" :
                 assetNodeTransform = assetNode.getParent()
                 for mesh in assetNodeTransform.listRelatives(ad=True, type="mesh") :
@@ -2706,7 +2742,7 @@ class CheckAssetNodeNamespace(CheckMayaAbstract):
         
         prog = re.compile("^[A-Z]{4}[0-9]{2}_[0-9]{3}:$")
         
-        for assetNode in pm.ls(type="gAsset") :
+        for assetNode in self.snapshot.pyNodes(type="gAsset") :
             if assetNode.isReferenced() and not prog.match(assetNode.namespace()) :
                 illegalNamespaces.append(assetNode)
                 
@@ -2823,7 +2859,7 @@ class CheckShotsStartEnd(CheckMayaAbstract):
         """
         badShots = list()
         
-        for shot in pm.ls(type="shot") :
+        for shot in self.snapshot.pyNodes(type="shot") :
             if not shot.startFrame.get() == shot.sequenceStartFrame.get() :
                 badShots.append(shot)
                 continue
@@ -2862,7 +2898,7 @@ class CheckOverlappingShots(CheckMayaAbstract):
         """
         overlappingShots = list()
         
-        shots = pm.ls(type="shot")
+        shots = self.snapshot.pyNodes(type="shot")
         
         for i, shot in enumerate(shots) :
             start = shot.startFrame.get()
@@ -2910,7 +2946,7 @@ class CheckShadingId(CheckMayaAbstract):
         excludedShadingEngine = ["initialParticleSE",
                                  "initialShadingGroup"]
         
-        for shadingGroup in pm.ls(type="shadingEngine") :
+        for shadingGroup in self.snapshot.pyNodes(type="shadingEngine") :
             if not shadingGroup.name() in excludedShadingEngine :
                 if not pm.objExists("%s.grid_noCheck" % shadingGroup.name()) :
                     # check if there is at least one connection to the aiCustomAOVs input array
@@ -2952,7 +2988,7 @@ class CheckShadingGroupName(CheckMayaAbstract):
         excludedShadingEngine = ["initialParticleSE",
                                  "initialShadingGroup"]
         
-        for shadingGroup in pm.ls(type="shadingEngine") :
+        for shadingGroup in self.snapshot.pyNodes(type="shadingEngine") :
             if not pm.objExists("%s.grid_noCheck" % shadingGroup.name()) :
                 if not shadingGroup.name() in excludedShadingEngine :
                     if not prog.match(shadingGroup.name()) :
@@ -2991,7 +3027,7 @@ class CheckShaderName(CheckMayaAbstract):
         prog = re.compile("^[a-z][a-zA-Z]+_(C|L|R|F|B|U|D)_[0-9]{3}_AIST$")
         
         # TODO: add support for the other shader 
-        for aiStandard in pm.ls(type="aiStandard") :
+        for aiStandard in self.snapshot.pyNodes(type="aiStandard") :
             if not pm.objExists("%s.grid_noCheck" % aiStandard.name()) :
                 if not prog.match(aiStandard.name()) :
                     shaderBadName.append(aiStandard)
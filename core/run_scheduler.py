@@ -0,0 +1,127 @@
+"""
+Cooperative scheduling of the validation runs. The RunScheduler runs the validations of a run a chunk at a time (see
+Validations.iterRun), the caller gives it a small time slice on each tick of its event loop, a QTimer in the UI, so
+maya stays responsive. Every validation is handed back as soon as it is done and the run can be cancelled between two
+chunks.
+"""
+# General Imports.
+import sys
+import time
+import traceback
+
+# time given to the validations on each tick, the event loop gets the hand back after the chunk crossing it.
+TIME_SLICE = 0.05
+
+
+class RunScheduler(object):
+    """
+    Runs validations one after the other in the same ValidationRun, a chunk at a time.
+    """
+    def __init__(self, validationRun, validations, onResult=None, timeSlice=TIME_SLICE):
+        """
+        :param validationRun: the run shared by the validations, the caller closes it when the scheduler is finished.
+        :type validationRun: validations.ValidationRun
+        :param validations: Validations or CheckAbstract instances, run in this order.
+        :type validations: list
+        :param onResult: called with each validation when it is done, failed ones included.
+        :type onResult: callable
+        :param timeSlice: seconds of work done by each step before giving the hand back.
+        :type timeSlice: float
+        """
+        super(RunScheduler, self).__init__()
+        self.validationRun = validationRun
+        self.pending = list(validations)
+        self.total = len(self.pending)
+        self.done = list()
+        self.failed = list()
+        self.onResult = onResult
+        self.timeSlice = timeSlice
+        self.started = None
+        self.cancelled = False
+        self.current = None
+        self._steps = None
+
+    @property
+    def finished(self):
+        return self.cancelled or (not self.pending and self.current is None)
+
+    @property
+    def count(self):
+        """
+        Number of validations done or failed.
+        :return:
+        :rtype: int
+        """
+        return len(self.done) + len(self.failed)
+
+    def step(self):
+        """
+        Run chunks of the validations until the time slice is used, at least one chunk.
+        :return: True while there is work left.
+        :rtype: bool
+        """
+        if self.finished:
+            return False
+        if self.started is None:
+            self.started = time.time()
+        start = time.time()
+        while not self.finished:
+            if self._steps is None:
+                self.current = self.pending.pop(0)
+                self._steps = self.current.iterRun(self.validationRun)
+            try:
+                next(self._steps)
+            except StopIteration:
+                self._finish(self.done)
+            except Exception:
+                # a broken validation doesn't stop the others, it is reported and the run goes on.
+                traceback.print_exc(file=sys.stdout)
+                self._finish(self.failed)
+            if time.time() - start >= self.timeSlice:
+                break
+        return not self.finished
+
+    def _finish(self, results):
+        validation = self.current
+        self.current = None
+        self._steps = None
+        results.append(validation)
+        if self.onResult is not None:
+            self.onResult(validation)
+
+    def runAll(self):
+        """
+        Run everything left without giving the hand back.
+        :return:
+        :rtype: None
+        """
+        while self.step():
+            pass
+
+    def cancel(self):
+        """
+        Stop the run between two chunks, the validation in progress is closed without result.
+        :return:
+        :rtype: None
+        """
+        if self._steps is not None:
+            self._steps.close()
+        self._steps = None
+        self.current = None
+        self.pending = list()
+        self.cancelled = True
+
+    def elapsed(self):
+        if self.started is None:
+            return 0.0
+        return time.time() - self.started
+
+    def estimateRemaining(self):
+        """
+        Seconds left before the end of the run, from the mean time of the validations done so far.
+        :return: None until a validation is done.
+        :rtype: float
+        """
+        if not self.count:
+            return None
+        return self.elapsed() / self.count * (self.total - self.count)
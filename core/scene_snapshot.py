@@ -0,0 +1,242 @@
+"""
+This module holds the SceneSnapshot, a one pass listing of the maya scene that is shared by all the validations of a
+run instead of every check doing its own pm.ls calls.
+"""
+# General Imports.
+import fnmatch
+
+
+def shortName(longName):
+    """
+    Return the leaf name of a long dag path, DG nodes are returned as they are.
+    :param longName: long name of the node.
+    :type longName: str
+    :return: the short name.
+    :rtype: str
+    """
+    return longName.rsplit('|', 1)[-1]
+
+
+class SceneSnapshot(object):
+    """
+    Index of the scene nodes by type, by name suffix and by referenced/non-referenced, built from a single listing.
+    The snapshot only keeps node names, PyNodes are made on demand and cached for the rest of the run.
+    """
+    def __init__(self, nodes, referencedNodes=(), typeResolver=None):
+        """
+        :param nodes: (longName, nodeType) pairs in the listing order.
+        :type nodes: iterable
+        :param referencedNodes: long names of the referenced nodes.
+        :type referencedNodes: iterable
+        :param typeResolver: callable returning the inherited types of a node type, itself included.
+        :type typeResolver: callable
+        """
+        super(SceneSnapshot, self).__init__()
+        self._typeResolver = typeResolver
+        self._order = list()
+        self._typeOf = dict()
+        self._byType = dict()
+        self._byShortName = dict()
+        for longName, nodeType in nodes:
+            self._order.append(longName)
+            self._typeOf[longName] = nodeType
+            self._byType.setdefault(nodeType, list()).append(longName)
+            self._byShortName.setdefault(shortName(longName), list()).append(longName)
+        self._referenced = set(referencedNodes)
+        self._inheritedTypes = dict()
+        self._typeMembers = dict()
+        self._bySuffix = dict()
+        self._pyNodes = dict()
+        # number of nodes handed out by the queries, read by the instrumentation.
+        self.inspectedCount = 0
+
+    @classmethod
+    def fromMaya(cls):
+        """
+        Build the snapshot from the opened maya scene.
+        :return: the snapshot of the scene.
+        :rtype: SceneSnapshot
+        """
+        import maya.cmds as cmds
+
+        listing = cmds.ls(showType=True, long=True) or list()
+        referenced = cmds.ls(referencedNodes=True, long=True) or list()
+
+        def resolver(nodeType):
+            return cmds.nodeType(nodeType, inherited=True, isTypeName=True) or [nodeType]
+
+        return cls(zip(listing[::2], listing[1::2]), referenced, resolver)
+
+    def __len__(self):
+        return len(self._order)
+
+    def __contains__(self, name):
+        return self.objExists(name)
+
+    def _getInheritedTypes(self, nodeType):
+        """
+        The inherited types for a concrete node type, resolved once per type for the whole run.
+        :param nodeType: concrete type of a node in the scene.
+        :type nodeType: str
+        :return: the types the node type derives from, itself included.
+        :rtype: set
+        """
+        if nodeType not in self._inheritedTypes:
+            inherited = [nodeType]
+            if self._typeResolver:
+                inherited = self._typeResolver(nodeType) or inherited
+            self._inheritedTypes[nodeType] = set(inherited)
+        return self._inheritedTypes[nodeType]
+
+    def _getTypeMembers(self, nodeType):
+        """
+        All the nodes of the given type or of a type derived from it, like pm.ls(type=...) does.
+        :param nodeType: node type to query.
+        :type nodeType: str
+        :return: long names of the nodes.
+        :rtype: list
+        """
+        if nodeType not in self._typeMembers:
+            members = list()
+            for concreteType, names in self._byType.iteritems():
+                if nodeType in self._getInheritedTypes(concreteType):
+                    members.extend(names)
+            self._typeMembers[nodeType] = members
+        return self._typeMembers[nodeType]
+
+    def _getSuffixMembers(self, suffix):
+        """
+        All the nodes with a short name ending with the suffix, namespaced nodes included.
+        :param suffix: the name suffix, like "CTRL".
+        :type suffix: str
+        :return: long names of the nodes.
+        :rtype: list
+        """
+        if suffix not in self._bySuffix:
+            self._bySuffix[suffix] = [x for x in self._order if shortName(x).endswith(suffix)]
+        return self._bySuffix[suffix]
+
+    def ls(self, name=None, type=None, exactType=None, suffix=None, referenced=None, namespaces=False, long=True):
+        """
+        Query the snapshot the same way pm.ls is used in the checks.
+        :param name: short name or fnmatch pattern of the nodes.
+        :type name: str
+        :param type: node type or list of node types, derived types are included.
+        :type type: str or list
+        :param exactType: node type or list of node types, derived types are excluded.
+        :type exactType: str or list
+        :param suffix: name suffix of the nodes, like "CTRL".
+        :type suffix: str
+        :param referenced: True for referenced nodes only, False for the non referenced ones only.
+        :type referenced: bool
+        :param namespaces: include the nodes inside namespaces when matching by name or suffix.
+        :type namespaces: bool
+        :param long: return the long names else the short ones.
+        :type long: bool
+        :return: the names of the matching nodes.
+        :rtype: list
+        """
+        candidates = None
+        if type is not None:
+            candidates = list()
+            for eachType in ([type] if isinstance(type, basestring) else type):
+                candidates.extend(self._getTypeMembers(eachType))
+        if exactType is not None:
+            exactMembers = list()
+            for eachType in ([exactType] if isinstance(exactType, basestring) else exactType):
+                exactMembers.extend(self._byType.get(eachType, list()))
+            if candidates is None:
+                candidates = exactMembers
+            else:
+                exactMembers = set(exactMembers)
+                candidates = [x for x in candidates if x in exactMembers]
+        if suffix is not None:
+            suffixMembers = self._getSuffixMembers(suffix)
+            if candidates is None:
+                candidates = suffixMembers
+            else:
+                suffixMembers = set(suffixMembers)
+                candidates = [x for x in candidates if x in suffixMembers]
+        if name is not None:
+            if candidates is None:
+                if any(x in name for x in '*?['):
+                    candidates = [x for x in self._order if fnmatch.fnmatchcase(shortName(x), name)]
+                else:
+                    candidates = list(self._byShortName.get(name, list()))
+            else:
+                candidates = [x for x in candidates if fnmatch.fnmatchcase(shortName(x), name)]
+        if candidates is None:
+            candidates = self._order
+        if (name is not None or suffix is not None) and not namespaces and ':' not in (name or ''):
+            candidates = [x for x in candidates if ':' not in shortName(x)]
+        if referenced is not None:
+            candidates = [x for x in candidates if (x in self._referenced) == referenced]
+        self.inspectedCount += len(candidates)
+        if not long:
+            return [shortName(x) for x in candidates]
+        return list(candidates)
+
+    def pyNodes(self, *args, **kwargs):
+        """
+        Same query as ls but returns PyNodes, every node is wrapped only once per run.
+        :return: the matching nodes.
+        :rtype: list
+        """
+        import pymel.core as pm
+
+        kwargs['long'] = True
+        names = self.ls(*args, **kwargs)
+        missing = [x for x in names if x not in self._pyNodes]
+        if missing:
+            for node in pm.ls(missing):
+                self._pyNodes[node.longName()] = node
+        return [self._pyNodes[x] for x in names if x in self._pyNodes]
+
+    def assemblies(self, long=False):
+        """
+        The top level dag nodes, like pm.ls(assemblies=True).
+        :param long: return the long names else the short ones.
+        :type long: bool
+        :return: the names of the top nodes.
+        :rtype: list
+        """
+        topNodes = [x for x in self._order if x.startswith('|') and x.count('|') == 1]
+        self.inspectedCount += len(topNodes)
+        if not long:
+            return [shortName(x) for x in topNodes]
+        return topNodes
+
+    def objExists(self, name):
+        """
+        Check if a node exists in the snapshot, by short or long name.
+        :param name: node name.
+        :type name: str
+        :return: True if the node is in the scene.
+        :rtype: bool
+        """
+        return name in self._typeOf or name in self._byShortName
+
+    def nodeType(self, name):
+        """
+        Return the type of a node.
+        :param name: long name of the node.
+        :type name: str
+        :return: the node type or None if the node is not in the snapshot.
+        :rtype: str
+        """
+        if name not in self._typeOf:
+            longNames = self._byShortName.get(name)
+            if not longNames:
+                return None
+            name = longNames[0]
+        return self._typeOf[name]
+
+    def isReferenced(self, name):
+        """
+        Check if a node comes from a reference.
+        :param name: long name of the node.
+        :type name: str
+        :return: True if the node is referenced.
+        :rtype: bool
+        """
+        return name in self._referenced
@@ -0,0 +1,174 @@
+"""
+Filesystem stat cache for the checks looking at files on the network. The paths are grouped by folder, every folder is
+listed once (os.scandir when available) and the exists/size/mtime questions are answered from the listings. The
+folders are read in parallel over a thread pool, so 3000 textures in 40 folders cost 40 folder reads.
+
+One StatCache lives on the ValidationRun (see getStatCache), the files changed during the run are not seen.
+"""
+# General Imports.
+import os
+import threading
+from multiprocessing.pool import ThreadPool
+
+try:
+    from os import scandir
+except ImportError:
+    try:
+        from scandir import scandir
+    except ImportError:
+        scandir = None
+
+# folders read at the same time, the time goes in the network round trips so more threads than cores is fine.
+MAX_WORKERS = 8
+
+
+def normalizePath(path):
+    """
+    Return the absolute, normalized path with the environment variables expanded.
+    :param path: the path to normalize.
+    :type path: str
+    :return:
+    :rtype: str
+    """
+    return os.path.normcase(os.path.abspath(os.path.expandvars(path)))
+
+
+def listFolder(folder):
+    """
+    List a folder in one call.
+    :param folder: the normalized folder path.
+    :type folder: str
+    :return: name to DirEntry (None without scandir), None if the folder can't be listed.
+    :rtype: dict
+    """
+    try:
+        if scandir is not None:
+            return dict((os.path.normcase(x.name), x) for x in scandir(folder))
+        return dict((os.path.normcase(x), None) for x in os.listdir(folder))
+    except OSError:
+        return None
+
+
+class StatCache(object):
+    """
+    The folder listings of one run.
+    """
+    def __init__(self, maxWorkers=MAX_WORKERS):
+        super(StatCache, self).__init__()
+        self.maxWorkers = maxWorkers
+        self._listings = dict()
+        self._stats = dict()
+        self._normalized = dict()
+        self._lock = threading.Lock()
+
+    def normalize(self, path):
+        """
+        Memoized normalizePath.
+        """
+        if path not in self._normalized:
+            self._normalized[path] = normalizePath(path)
+        return self._normalized[path]
+
+    def prefetch(self, paths):
+        """
+        List at once, over the thread pool, the folders of the paths not listed yet.
+        :param paths: file paths.
+        :type paths: iterable
+        :return:
+        :rtype: None
+        """
+        folders = set(os.path.dirname(self.normalize(x)) for x in paths if x)
+        with self._lock:
+            folders = [x for x in folders if x not in self._listings]
+        if not folders:
+            return
+        if len(folders) == 1 or self.maxWorkers < 2:
+            listings = [listFolder(x) for x in folders]
+        else:
+            pool = ThreadPool(min(self.maxWorkers, len(folders)))
+            try:
+                listings = pool.map(listFolder, folders)
+            finally:
+                pool.close()
+                pool.join()
+        with self._lock:
+            self._listings.update(zip(folders, listings))
+
+    def _getListing(self, folder):
+        if folder not in self._listings:
+            listing = listFolder(folder)
+            with self._lock:
+                self._listings.setdefault(folder, listing)
+        return self._listings[folder]
+
+    def _getEntry(self, path):
+        path = self.normalize(path)
+        folder, name = os.path.split(path)
+        listing = self._getListing(folder)
+        if listing is None or name not in listing:
+            return path, None, False
+        return path, listing[name], True
+
+    def exists(self, path):
+        """
+        Check if the file or folder exists.
+        :param path: the path.
+        :type path: str
+        :return:
+        :rtype: bool
+        """
+        if not path:
+            return False
+        return self._getEntry(path)[2]
+
+    def stat(self, path):
+        """
+        Return the os.stat of the path, None if it doesn't exist. With scandir on windows the stat comes with the
+        listing, else it is done once per path.
+        :param path: the path.
+        :type path: str
+        :return:
+        :rtype: os.stat_result
+        """
+        if not path:
+            return None
+        path, entry, found = self._getEntry(path)
+        if not found:
+            return None
+        if path not in self._stats:
+            try:
+                self._stats[path] = entry.stat() if entry is not None else os.stat(path)
+            except OSError:
+                self._stats[path] = None
+        return self._stats[path]
+
+    def isfile(self, path):
+        if not path:
+            return False
+        path, entry, found = self._getEntry(path)
+        if not found:
+            return False
+        if entry is not None:
+            return entry.is_file()
+        return os.path.isfile(path)
+
+    def getsize(self, path):
+        fileStat = self.stat(path)
+        return fileStat.st_size if fileStat is not None else None
+
+    def getmtime(self, path):
+        fileStat = self.stat(path)
+        return fileStat.st_mtime if fileStat is not None else None
+
+
+def getStatCache(validationRun):
+    """
+    Return the StatCache of the run, a new one if there is no run.
+    :param validationRun: the current run.
+    :type validationRun: ValidationRun
+    :return:
+    :rtype: StatCache
+    """
+    if validationRun is None:
+        return StatCache()
+    return validationRun.getCached(('stat_cache.StatCache',), StatCache)
@@ -0,0 +1,98 @@
+"""
+Memoized template validation for the library checks. The verdict of a template on a path is kept for the run, keyed
+by the template name and the normalized path, so the nodes sharing a texture and the checks asking about the same
+textures validate every unique path once per template.
+"""
+# General Imports.
+import os
+
+DEFAULT_SKIP_KEYS = ('udim',)
+
+
+class TemplateVerdicts(object):
+    """
+    The verdicts of one run, the templates come from the getTemplate callable (app.get_template_by_name).
+    """
+    def __init__(self, getTemplate):
+        super(TemplateVerdicts, self).__init__()
+        self.getTemplate = getTemplate
+        self._templates = dict()
+        self._paths = dict()
+        self._verdicts = dict()
+
+    def _getTemplate(self, templateName):
+        if templateName not in self._templates:
+            self._templates[templateName] = self.getTemplate(templateName)
+        return self._templates[templateName]
+
+    def normalize(self, path):
+        """
+        Return the absolute path to validate and the key it is cached under.
+        :param path: the path as set on the node.
+        :type path: str
+        :return: path, key
+        :rtype: tuple
+        """
+        if path not in self._paths:
+            absolutePath = os.path.abspath(path)
+            self._paths[path] = (absolutePath, os.path.normcase(absolutePath).replace('\\', '/'))
+        return self._paths[path]
+
+    def validate(self, templateName, path, skipKeys=DEFAULT_SKIP_KEYS):
+        """
+        Return the verdict of the template on the path, validating it only the first time.
+        :param templateName: the template name.
+        :type templateName: str
+        :param path: the path to validate.
+        :type path: str
+        :param skipKeys: the template keys to skip.
+        :type skipKeys: tuple
+        :return:
+        :rtype: bool
+        """
+        absolutePath, key = self.normalize(path)
+        verdictKey = (templateName, key, tuple(skipKeys))
+        if verdictKey not in self._verdicts:
+            template = self._getTemplate(templateName)
+            if template is None:
+                raise ValueError('No template named "%s"' % templateName)
+            self._verdicts[verdictKey] = bool(template.validate(absolutePath, skip_keys=list(skipKeys)))
+        return self._verdicts[verdictKey]
+
+    def prefetch(self, templateNames, paths, skipKeys=DEFAULT_SKIP_KEYS):
+        """
+        Validate in one pass the unique paths against every existing template of the list.
+        :param templateNames: the template variants.
+        :type templateNames: iterable
+        :param paths: the paths to validate.
+        :type paths: iterable
+        :param skipKeys: the template keys to skip.
+        :type skipKeys: tuple
+        :return:
+        :rtype: None
+        """
+        uniquePaths = dict()
+        for path in paths:
+            absolutePath, key = self.normalize(path)
+            uniquePaths.setdefault(key, path)
+        for templateName in templateNames:
+            if self._getTemplate(templateName) is None:
+                continue
+            for path in uniquePaths.values():
+                self.validate(templateName, path, skipKeys)
+
+
+def getTemplateVerdicts(validationRun, app):
+    """
+    Return the TemplateVerdicts of the run for the app, a new one if there is no run.
+    :param validationRun: the current run.
+    :type validationRun: ValidationRun
+    :param app: the app giving the templates.
+    :type app: object
+    :return:
+    :rtype: TemplateVerdicts
+    """
+    if validationRun is None:
+        return TemplateVerdicts(app.get_template_by_name)
+    return validationRun.getCached(('template_cache.TemplateVerdicts', id(app)),
+                                   lambda: TemplateVerdicts(app.get_template_by_name))
@@ -0,0 +1,468 @@
+"""
+Warm validation daemon. It keeps batch_worker processes started, maya initialized and waiting, and validates the files
+asked over a local connection (multiprocessing.connection, a named pipe on windows and a unix socket elsewhere), so a
+publish gets its verdict in the time of the checks instead of the time of a maya start. The worker empties the scene
+after every job (see batch_worker.validateScene).
+
+A worker is replaced, by a new one started right away, after MAX_JOBS jobs or when its memory goes over --max-memory.
+"--engine memory" runs the workers on the in-memory scene, without maya, for trying the daemon anywhere.
+
+The requests and replies are json dicts, nothing received is unpickled:
+    {"command": "validate", "files": [...], "project": ..., "department": ...}
+        -> {"result": <batch_worker result>} for every file as soon as it is done, then {"done": True, "count": n}
+    {"command": "status"}   -> {"workers": [{"pid": ..., "jobs": ..., "memory": ...}], "queued": n, "served": n}
+    {"command": "stop"}     -> {"stopped": True}
+
+VALIDATIONS_DAEMON_ADDRESS gives the address ("host:port" for tcp), VALIDATIONS_DAEMON_AUTHKEY the key of the
+connections. Without it the key is a secret of the user, made on first use in ~/.validations/daemon_authkey and only
+readable by them. A tcp address needs VALIDATIONS_DAEMON_AUTHKEY, shared with the clients of the other machines.
+
+usage:
+    mayapy Validations/core/validation_daemon.py serve -n 2 --max-jobs 50 --max-memory 6000
+    python -m Validations.core.validation_daemon validate -p bdg -d rig P:/bdg/assets/chr/badger/rig/badger_rig.ma
+"""
+# General Imports.
+import argparse
+import binascii
+import getpass
+import json
+import os
+import Queue
+import sys
+import tempfile
+import threading
+from multiprocessing.connection import Client, Listener
+
+_PACKAGE_PARENT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if _PACKAGE_PARENT not in sys.path:
+    sys.path.insert(0, _PACKAGE_PARENT)
+
+from Validations.core import batch_validate
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+DAEMON_ADDRESS_ENV = 'VALIDATIONS_DAEMON_ADDRESS'
+DAEMON_AUTHKEY_ENV = 'VALIDATIONS_DAEMON_AUTHKEY'
+AUTHKEY_FILE = os.path.join(os.path.expanduser('~'), '.validations', 'daemon_authkey').replace('\\', '/')
+MAX_JOBS = 50
+# megabytes, 0 doesn't check the memory.
+MAX_MEMORY = 0
+
+
+def getAddress(address=None):
+    """
+    Return the address of the daemon, the given one, the one of VALIDATIONS_DAEMON_ADDRESS or the default one.
+    :param address: a pipe name, a socket file or "host:port".
+    :type address: str
+    :return:
+    :rtype: str or tuple
+    """
+    address = address or os.environ.get(DAEMON_ADDRESS_ENV)
+    if not address:
+        # one daemon per user, the key of the others is not readable.
+        if sys.platform == 'win32':
+            return r'\\.\pipe\validations_daemon_%s' % getpass.getuser()
+        return os.path.join(tempfile.gettempdir(), 'validations_daemon_%s.sock' % getpass.getuser())
+    host, _, port = address.rpartition(':')
+    if host and port.isdigit():
+        return host, int(port)
+    return address
+
+
+def getAuthKey(address):
+    """
+    Return the key of the connections, the one of VALIDATIONS_DAEMON_AUTHKEY or the secret of the user, made the first
+    time in AUTHKEY_FILE.
+    :param address: the address of the daemon, see getAddress.
+    :type address: str or tuple
+    :return:
+    :rtype: str
+    """
+    authkey = os.environ.get(DAEMON_AUTHKEY_ENV)
+    if authkey:
+        return authkey
+    if isinstance(address, tuple):
+        raise RuntimeError('The daemon on %s:%s is reachable from the other machines, set %s to a secret shared with '
+                           'its clients.' % (address[0], address[1], DAEMON_AUTHKEY_ENV))
+    folder = os.path.dirname(AUTHKEY_FILE)
+    if not os.path.isdir(folder):
+        os.makedirs(folder)
+    try:
+        fileId = os.open(AUTHKEY_FILE, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    except OSError:
+        # made before, or by the daemon at the same time.
+        pass
+    else:
+        with os.fdopen(fileId, 'w') as writeId:
+            writeId.write(binascii.hexlify(os.urandom(32)))
+    with open(AUTHKEY_FILE, 'r') as readId:
+        authkey = readId.read().strip()
+    if not authkey:
+        raise RuntimeError('The daemon key file %s is empty, remove it to make a new one.' % AUTHKEY_FILE)
+    return authkey
+
+
+def send(connection, message):
+    """
+    Send a message as json, the connections never carry pickles.
+    :param connection: the connection.
+    :type connection: multiprocessing.connection.Connection
+    :param message: the json-able message.
+    :type message: dict
+    :return:
+    :rtype: None
+    """
+    connection.send_bytes(json.dumps(message))
+
+
+def receive(connection):
+    """
+    Receive a json message.
+    :param connection: the connection.
+    :type connection: multiprocessing.connection.Connection
+    :return:
+    :rtype: dict
+    """
+    message = json.loads(connection.recv_bytes())
+    if not isinstance(message, dict):
+        raise ValueError('The messages are json objects, got %s.' % type(message).__name__)
+    return message
+
+
+def getProcessMemory(pid):
+    """
+    Return the resident memory of a process.
+    :param pid: the process id.
+    :type pid: int
+    :return: bytes, None if it can't be measured.
+    :rtype: int
+    """
+    if psutil is not None:
+        try:
+            return psutil.Process(pid).memory_info().rss
+        except psutil.Error:
+            return None
+    statm = '/proc/%s/statm' % pid
+    if os.path.exists(statm):
+        with open(statm, 'r') as readId:
+            return int(readId.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    if sys.platform == 'win32':
+        import ctypes
+        from ctypes import wintypes
+
+        class ProcessMemoryCounters(ctypes.Structure):
+            _fields_ = [('cb', wintypes.DWORD), ('PageFaultCount', wintypes.DWORD)] + \
+                       [(x, ctypes.c_size_t) for x in ('PeakWorkingSetSize', 'WorkingSetSize',
+                                                       'QuotaPeakPagedPoolUsage', 'QuotaPagedPoolUsage',
+                                                       'QuotaPeakNonPagedPoolUsage', 'QuotaNonPagedPoolUsage',
+                                                       'PagefileUsage', 'PeakPagefileUsage')]
+
+        # PROCESS_QUERY_INFORMATION | PROCESS_VM_READ
+        handle = ctypes.windll.kernel32.OpenProcess(0x0400 | 0x0010, False, pid)
+        if not handle:
+            return None
+        try:
+            counters = ProcessMemoryCounters()
+            counters.cb = ctypes.sizeof(counters)
+            if ctypes.windll.psapi.GetProcessMemoryInfo(handle, ctypes.byref(counters), counters.cb):
+                return counters.WorkingSetSize
+        finally:
+            ctypes.windll.kernel32.CloseHandle(handle)
+    return None
+
+
+class ValidationDaemon(object):
+    """
+    Serves the validation requests with a pool of warm workers.
+    """
+    def __init__(self, workerCommand, workerCount=1, address=None, authkey=None, maxJobs=MAX_JOBS,
+                 maxMemory=MAX_MEMORY, log=None, timeout=batch_validate.JOB_TIMEOUT):
+        """
+        :param workerCommand: the command starting a worker, see batch_validate.getWorkerCommand.
+        :type workerCommand: list
+        :param workerCount: the number of workers.
+        :type workerCount: int
+        :param maxJobs: jobs validated by a worker before it is replaced, 0 for no limit.
+        :type maxJobs: int
+        :param maxMemory: megabytes of memory of a worker before it is replaced, 0 for no limit.
+        :type maxMemory: int
+        :param timeout: seconds a worker gets for one scene, None for no limit.
+        :type timeout: float
+        """
+        super(ValidationDaemon, self).__init__()
+        self.address = getAddress(address)
+        self.authkey = authkey or getAuthKey(self.address)
+        self.workers = [batch_validate.WorkerProcess(workerCommand, timeout) for _ in range(max(1, workerCount))]
+        self.maxJobs = maxJobs
+        self.maxMemory = maxMemory
+        self.log = log or (lambda msg: sys.stderr.write(msg + '\n'))
+        self.jobs = Queue.Queue()
+        self.served = 0
+        self.stopped = False
+        self._lock = threading.Lock()
+
+    def getMemory(self, worker):
+        if not worker.isAlive():
+            return None
+        return getProcessMemory(worker.process.pid)
+
+    def needsRecycle(self, worker):
+        """
+        Check if the worker did too many jobs or uses too much memory.
+        :param worker: the worker.
+        :type worker: batch_validate.WorkerProcess
+        :return: why it has to be replaced, None if it doesn't.
+        :rtype: str
+        """
+        if self.maxJobs and worker.jobCount >= self.maxJobs:
+            return '%s jobs' % worker.jobCount
+        if self.maxMemory:
+            memory = self.getMemory(worker)
+            if memory is not None and memory > self.maxMemory * 1024 * 1024:
+                return '%s MB used' % (memory // (1024 * 1024))
+        return None
+
+    def _work(self, worker):
+        worker.start()
+        try:
+            while True:
+                task = self.jobs.get()
+                if task is None:
+                    break
+                job, reply = task
+                result = worker.validate(job)
+                if result is None:
+                    result = dict(job, status='CRASHED', checks=list(), error=worker.error, elapsed=0.0)
+                with self._lock:
+                    self.served += 1
+                reply.put(result)
+                reason = self.needsRecycle(worker) if worker.isAlive() else None
+                if reason:
+                    self.log('Worker %s replaced, %s.' % (worker.process.pid, reason))
+                    worker.stop()
+                if not worker.isAlive():
+                    # started before the next job comes, so it is warm when it does.
+                    worker.start()
+        finally:
+            worker.stop()
+
+    def status(self):
+        workers = [{'pid': x.process.pid if x.isAlive() else None, 'jobs': x.jobCount, 'memory': self.getMemory(x)}
+                   for x in self.workers]
+        return {'workers': workers, 'queued': self.jobs.qsize(), 'served': self.served}
+
+    def _validate(self, connection, request):
+        files = request.get('files')
+        if not isinstance(files, list) or not all(isinstance(x, basestring) for x in files):
+            send(connection, {'error': 'Invalid request : files must be a list of scene paths.'})
+            return
+        if not isinstance(request.get('project'), basestring) or not request['project']:
+            send(connection, {'error': 'Invalid request : project is missing.'})
+            return
+        if not isinstance(request.get('department', 'rig'), basestring):
+            send(connection, {'error': 'Invalid request : department must be a string.'})
+            return
+        reply = Queue.Queue()
+        for sceneFile in files:
+            self.jobs.put(({'file': sceneFile, 'project': request['project'],
+                            'department': request.get('department', 'rig')}, reply))
+        for _ in files:
+            send(connection, {'result': reply.get()})
+        send(connection, {'done': True, 'count': len(files)})
+
+    def _serveConnection(self, connection):
+        try:
+            while True:
+                try:
+                    request = receive(connection)
+                except EOFError:
+                    break
+                except ValueError as error:
+                    send(connection, {'error': 'Invalid request : %s' % error})
+                    continue
+                command = request.get('command')
+                if command == 'validate':
+                    self._validate(connection, request)
+                elif command == 'status':
+                    send(connection, self.status())
+                elif command == 'stop':
+                    send(connection, {'stopped': True})
+                    self.stop()
+                    break
+                else:
+                    send(connection, {'error': 'Unknown command %s.' % command})
+        except (IOError, EOFError):
+            # the client went away, the jobs it asked still finish.
+            pass
+        finally:
+            connection.close()
+
+    def _removeStaleSocket(self):
+        if not isinstance(self.address, basestring) or self.address.startswith('\\\\') \
+                or not os.path.exists(self.address):
+            return
+        try:
+            Client(self.address, authkey=self.authkey).close()
+        except Exception:
+            os.remove(self.address)
+            return
+        raise RuntimeError('A daemon already listens on %s.' % self.address)
+
+    def serve(self):
+        """
+        Start the workers and serve the requests until a stop request.
+        :return:
+        :rtype: None
+        """
+        self._removeStaleSocket()
+        listener = Listener(self.address, authkey=self.authkey)
+        threads = [threading.Thread(target=self._work, args=(x,)) for x in self.workers]
+        for thread in threads:
+            thread.daemon = True
+            thread.start()
+        self.log('Validation daemon on %s with %s workers.' % (self.address, len(self.workers)))
+        connections = list()
+        try:
+            while not self.stopped:
+                try:
+                    connection = listener.accept()
+                except Exception as error:
+                    # a client with the wrong key, or the listener closed.
+                    self.log('Connection refused : %s' % error)
+                    continue
+                if self.stopped:
+                    connection.close()
+                    break
+                thread = threading.Thread(target=self._serveConnection, args=(connection,))
+                thread.daemon = True
+                thread.start()
+                connections = [x for x in connections if x.is_alive()] + [thread]
+        finally:
+            listener.close()
+            for _ in threads:
+                self.jobs.put(None)
+            for thread in threads:
+                thread.join()
+            # the connection asking the stop ends right after, an idle client is not waited for long.
+            for thread in connections:
+                thread.join(1)
+
+    def stop(self):
+        self.stopped = True
+        try:
+            # wakes the listener up.
+            Client(self.address, authkey=self.authkey).close()
+        except Exception:
+            pass
+
+
+class DaemonClient(object):
+    """
+    A connection to the daemon.
+    """
+    def __init__(self, address=None, authkey=None):
+        super(DaemonClient, self).__init__()
+        address = getAddress(address)
+        self.connection = Client(address, authkey=authkey or getAuthKey(address))
+
+    def validate(self, sceneFiles, project, department='rig'):
+        """
+        Validate the scenes, the results come as soon as each one is done.
+        :param sceneFiles: the scenes to validate.
+        :type sceneFiles: list
+        :param project: the project name.
+        :type project: str
+        :param department: "rig" or "anim".
+        :type department: str
+        :return: the results, see batch_worker.
+        :rtype: generator
+        """
+        send(self.connection, {'command': 'validate', 'files': list(sceneFiles), 'project': project,
+                               'department': department})
+        while True:
+            reply = receive(self.connection)
+            if 'error' in reply:
+                raise RuntimeError(reply['error'])
+            if reply.get('done'):
+                break
+            yield reply['result']
+
+    def status(self):
+        send(self.connection, {'command': 'status'})
+        return receive(self.connection)
+
+    def stop(self):
+        send(self.connection, {'command': 'stop'})
+        return receive(self.connection)
+
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+def parseArgs(argv):
+    parser = argparse.ArgumentParser(description='Validation daemon keeping warm workers.')
+    commands = parser.add_subparsers(dest='command')
+    serve = commands.add_parser('serve', help='start the daemon.')
+    validate = commands.add_parser('validate', help='validate scenes with the daemon.')
+    status = commands.add_parser('status', help='show the workers of the daemon.')
+    stop = commands.add_parser('stop', help='stop the daemon.')
+    for each in (serve, validate, status, stop):
+        each.add_argument('--address', help='the pipe, socket file or host:port of the daemon.')
+    serve.add_argument('-n', '--workers', type=int, default=1, help='number of warm workers.')
+    serve.add_argument('--engine', choices=('maya', 'ascii', 'memory'), default='maya',
+                       help='"ascii" and "memory" validate the .ma files offline, without maya.')
+    serve.add_argument('--mayapy', default=os.environ.get('MAYAPY', 'mayapy'), help='mayapy executable.')
+    serve.add_argument('--max-jobs', type=int, default=MAX_JOBS, help='jobs before a worker is replaced, 0: never.')
+    serve.add_argument('--max-memory', type=int, default=MAX_MEMORY,
+                       help='megabytes used by a worker before it is replaced, 0: never.')
+    serve.add_argument('--timeout', type=float, default=batch_validate.JOB_TIMEOUT,
+                       help='seconds a worker gets for one scene before it is killed, 0: no limit.')
+    serve.add_argument('--no-cache', dest='cache', action='store_false',
+                       help='run every validation, without the result cache of the workers.')
+    validate.add_argument('files', nargs='+', help='maya scenes or glob patterns.')
+    validate.add_argument('-p', '--project', required=True, help='project name, used to pick the config.')
+    validate.add_argument('-d', '--department', choices=('rig', 'anim'), default='rig',
+                          help='the VALIDATIONS list of the config to run.')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """
+    Command line entry point.
+    :return: for validate, 0 if every scene is OK or WARNING, 1 otherwise.
+    :rtype: int
+    """
+    args = parseArgs(sys.argv[1:] if argv is None else argv)
+    if args.command == 'serve':
+        daemon = ValidationDaemon(batch_validate.getWorkerCommand(args.mayapy, args.engine, args.cache), args.workers,
+                                  args.address, maxJobs=args.max_jobs, maxMemory=args.max_memory,
+                                  timeout=args.timeout or None)
+        daemon.serve()
+        return 0
+
+    with DaemonClient(args.address) as client:
+        if args.command == 'status':
+            print client.status()
+        elif args.command == 'stop':
+            client.stop()
+        else:
+            failed = 0
+            for result in client.validate(batch_validate.expandSceneFiles(args.files), args.project,
+                                          args.department):
+                print '%s\t%s' % (result['status'], result['file'])
+                failed += result['status'] not in ('OK', 'WARNING')
+            return 1 if failed else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,549 @@
+"""
+Validation farm over a shared folder. A coordinator puts one job file per scene in the queue folder, workers on any
+machine seeing the folder claim the jobs, validate the scenes with the batch_worker engines and write the results next
+to the jobs. Nothing but the folder is shared, so it works on any network share and on a temp folder for a local run.
+
+The queue folder holds:
+    pending/<job>.json          : the jobs waiting for a worker.
+    claimed/<job>@<worker>.json : the jobs being validated, claimed by renaming them out of pending, only one worker
+                                  can win the rename. The worker touches the file every HEARTBEAT_INTERVAL.
+    done/<job>.json             : the results, the job keys with the result keys of batch_worker.
+
+The coordinator watches the claimed jobs, a job whose file wasn't touched for HEARTBEAT_TIMEOUT seconds, as seen by
+the coordinator clock so the clocks of the machines don't matter, goes back to pending. A job given back MAX_ATTEMPTS
+times is marked CRASHED. A worker stopped with ctrl+c gives its job back at once.
+
+usage:
+    # on every machine of the farm
+    mayapy Validations/core/validation_farm.py work -q P:/farm/ep101
+    # on the coordinator
+    python -m Validations.core.validation_farm submit -q P:/farm/ep101 -p bdg -d anim "P:/bdg/ep101/*/anim/*.ma"
+    python -m Validations.core.validation_farm watch -q P:/farm/ep101 --jsonl D:/temp/ep101.jsonl
+    # or everything on this machine, with local workers
+    python -m Validations.core.validation_farm run -q D:/temp/farm -p bdg -d rig -n 4 --engine memory "D:/rigs/*.ma"
+"""
+# General Imports.
+import argparse
+import hashlib
+import json
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+_PACKAGE_PARENT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if _PACKAGE_PARENT not in sys.path:
+    sys.path.insert(0, _PACKAGE_PARENT)
+
+from Validations.core import batch_validate
+
+QUEUE_FOLDERS = ('pending', 'claimed', 'done')
+HEARTBEAT_INTERVAL = 10.0
+# a long scene open can hold the worker for a while, keep it well over the interval.
+HEARTBEAT_TIMEOUT = 300.0
+POLL_INTERVAL = 2.0
+MAX_ATTEMPTS = 3
+# separates the job from the worker in the claimed file names, the job names are scene file names.
+CLAIM_SEPARATOR = '@'
+
+
+def getJobId(sceneFile):
+    """
+    Return the job name of a scene, the path hash keeps the scenes with the same name apart.
+    :param sceneFile: the scene path.
+    :type sceneFile: str
+    :return:
+    :rtype: str
+    """
+    return '%s.%s' % (os.path.basename(sceneFile), hashlib.sha1(sceneFile.lower()).hexdigest()[:10])
+
+
+def getWorkerId():
+    return '%s-%s' % (socket.gethostname(), os.getpid())
+
+
+def writeJson(path, data):
+    """
+    Write the json file through a temp file, the readers never see half a file.
+    :param path: the file to write.
+    :type path: str
+    :param data: json-able data.
+    :type data: dict
+    :return:
+    :rtype: None
+    """
+    tmpFile = '%s.%s.%s.tmp' % (path, socket.gethostname(), os.getpid())
+    with open(tmpFile, 'w') as writeId:
+        json.dump(data, writeId, indent=2, sort_keys=True)
+    if os.path.exists(path):
+        os.remove(path)
+    os.rename(tmpFile, path)
+
+
+def readJson(path):
+    """
+    Read the json file.
+    :param path: the file to read.
+    :type path: str
+    :return: None if the file is gone or not finished.
+    :rtype: dict
+    """
+    try:
+        with open(path, 'r') as readId:
+            return json.load(readId)
+    except (IOError, OSError, ValueError):
+        return None
+
+
+class JobQueue(object):
+    """
+    The queue folder, see the module doc for its layout.
+    """
+    def __init__(self, root):
+        super(JobQueue, self).__init__()
+        self.root = root
+        for folder in QUEUE_FOLDERS:
+            path = os.path.join(root, folder)
+            if not os.path.isdir(path):
+                try:
+                    os.makedirs(path)
+                except OSError:
+                    # made by another machine in the meantime.
+                    if not os.path.isdir(path):
+                        raise
+
+    def getPath(self, folder, name):
+        return os.path.join(self.root, folder, name).replace('\\', '/')
+
+    def listJobs(self, folder):
+        return sorted(x for x in os.listdir(os.path.join(self.root, folder)) if x.endswith('.json'))
+
+    def getResult(self, jobId):
+        return readJson(self.getPath('done', jobId + '.json'))
+
+    def isDone(self, jobId):
+        """
+        Check if the job has a result, the crashed jobs are tried again.
+        :param jobId: the job name.
+        :type jobId: str
+        :return:
+        :rtype: bool
+        """
+        result = self.getResult(jobId)
+        return result is not None and result.get('status') != 'CRASHED'
+
+    def submit(self, sceneFile, project, department, resume=True):
+        """
+        Add the job of a scene to the queue.
+        :param sceneFile: the scene path, as seen by the workers.
+        :type sceneFile: str
+        :param project: the project name.
+        :type project: str
+        :param department: "rig" or "anim".
+        :type department: str
+        :param resume: skip the scene if it already has a result.
+        :type resume: bool
+        :return: the job name, None if it was skipped.
+        :rtype: str
+        """
+        jobId = getJobId(sceneFile)
+        if resume and self.isDone(jobId):
+            return None
+        if os.path.exists(self.getPath('done', jobId + '.json')):
+            os.remove(self.getPath('done', jobId + '.json'))
+        writeJson(self.getPath('pending', jobId + '.json'),
+                  {'file': sceneFile, 'project': project, 'department': department, 'attempts': 0})
+        return jobId
+
+    def claim(self, workerId):
+        """
+        Take the next pending job, the jobs already done are dropped on the way.
+        :param workerId: the name of the worker.
+        :type workerId: str
+        :return: the job name, the job and its claimed file, None if there is no job left.
+        :rtype: tuple
+        """
+        for name in self.listJobs('pending'):
+            jobId = name[:-len('.json')]
+            claimPath = self.getPath('claimed', '%s%s%s.json' % (jobId, CLAIM_SEPARATOR, workerId))
+            try:
+                os.rename(self.getPath('pending', name), claimPath)
+            except OSError:
+                # claimed by another worker first.
+                continue
+            job = readJson(claimPath)
+            if job is None or self.isDone(jobId):
+                self.removeClaim(claimPath)
+                continue
+            return jobId, job, claimPath
+        return None
+
+    def heartbeat(self, claimPath):
+        """
+        Tell the coordinator the job is still being validated.
+        :param claimPath: the claimed file of the job.
+        :type claimPath: str
+        :return: False if the job was given to another worker.
+        :rtype: bool
+        """
+        try:
+            os.utime(claimPath, None)
+        except OSError:
+            return False
+        return True
+
+    def complete(self, jobId, claimPath, result):
+        """
+        Write the result of the job and drop its claim.
+        :param jobId: the job name.
+        :type jobId: str
+        :param claimPath: the claimed file of the job.
+        :type claimPath: str
+        :param result: the result of the job.
+        :type result: dict
+        :return:
+        :rtype: None
+        """
+        writeJson(self.getPath('done', jobId + '.json'), result)
+        self.removeClaim(claimPath)
+
+    def release(self, jobId, claimPath, job, attempts=0):
+        """
+        Put a claimed job back in pending.
+        :param jobId: the job name.
+        :type jobId: str
+        :param claimPath: the claimed file of the job.
+        :type claimPath: str
+        :param job: the job.
+        :type job: dict
+        :param attempts: added to the attempts of the job.
+        :type attempts: int
+        :return:
+        :rtype: None
+        """
+        writeJson(self.getPath('pending', jobId + '.json'), dict(job, attempts=job.get('attempts', 0) + attempts))
+        self.removeClaim(claimPath)
+
+    def removeClaim(self, claimPath):
+        try:
+            os.remove(claimPath)
+        except OSError:
+            pass
+
+    def claims(self):
+        """
+        Return the claimed jobs.
+        :return: the job name, the worker name and the claimed file of each.
+        :rtype: list
+        """
+        claims = list()
+        for name in self.listJobs('claimed'):
+            jobId, _, workerId = name[:-len('.json')].rpartition(CLAIM_SEPARATOR)
+            claims.append((jobId, workerId, self.getPath('claimed', name)))
+        return claims
+
+    def counts(self):
+        return dict((x, len(self.listJobs(x))) for x in QUEUE_FOLDERS)
+
+
+class _Heartbeat(threading.Thread):
+    """
+    Touches the claimed file of a job while it is validated.
+    """
+    def __init__(self, queue, claimPath, interval):
+        super(_Heartbeat, self).__init__()
+        self.daemon = True
+        self.queue = queue
+        self.claimPath = claimPath
+        self.interval = interval
+        self.stopped = threading.Event()
+        self.lost = False
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            if not self.queue.heartbeat(self.claimPath):
+                self.lost = True
+                break
+
+    def stop(self):
+        self.stopped.set()
+        self.join()
+
+
+class FarmWorker(object):
+    """
+    Claims the jobs of the queue one after the other and validates them in this process.
+    """
+    def __init__(self, queue, validate, workerId=None, heartbeatInterval=HEARTBEAT_INTERVAL,
+                 pollInterval=POLL_INTERVAL, log=None):
+        """
+        :param queue: the job queue.
+        :type queue: JobQueue
+        :param validate: callable turning a job into its result, one of the batch_worker.ENGINES.
+        :type validate: callable
+        """
+        super(FarmWorker, self).__init__()
+        self.queue = queue
+        self.validate = validate
+        self.workerId = workerId or getWorkerId()
+        self.heartbeatInterval = heartbeatInterval
+        self.pollInterval = pollInterval
+        self.log = log or (lambda msg: sys.stderr.write(msg + '\n'))
+        self.jobCount = 0
+
+    def runJob(self, jobId, job, claimPath):
+        heartbeat = _Heartbeat(self.queue, claimPath, self.heartbeatInterval)
+        heartbeat.start()
+        try:
+            result = self.validate(job)
+        except KeyboardInterrupt:
+            heartbeat.stop()
+            self.queue.release(jobId, claimPath, job)
+            raise
+        heartbeat.stop()
+        if heartbeat.lost:
+            # given to another worker meanwhile, the result is still good.
+            self.log('%s was given to another worker.' % jobId)
+        self.queue.complete(jobId, claimPath, result)
+        self.jobCount += 1
+        self.log('%s\t%s\t%s' % (self.workerId, result['status'], job['file']))
+
+    def run(self, exitWhenEmpty=False, maxJobs=None):
+        """
+        Validate the jobs of the queue.
+        :param exitWhenEmpty: return when there is no pending job instead of waiting for more.
+        :type exitWhenEmpty: bool
+        :param maxJobs: return after this many jobs.
+        :type maxJobs: int
+        :return: the number of jobs validated.
+        :rtype: int
+        """
+        while maxJobs is None or self.jobCount < maxJobs:
+            claimed = self.queue.claim(self.workerId)
+            if claimed is None:
+                if exitWhenEmpty:
+                    break
+                time.sleep(self.pollInterval)
+                continue
+            self.runJob(*claimed)
+        return self.jobCount
+
+
+class FarmCoordinator(object):
+    """
+    Watches the queue, gives the jobs of the dead workers back and gathers the results.
+    """
+    def __init__(self, queue, timeout=HEARTBEAT_TIMEOUT, maxAttempts=MAX_ATTEMPTS, pollInterval=POLL_INTERVAL,
+                 log=None, exporter=None):
+        """
+        :param exporter: gets the checks of every scene as soon as it is done, like a result_export.ExporterGroup.
+        :type exporter: object
+        """
+        super(FarmCoordinator, self).__init__()
+        self.queue = queue
+        self.timeout = timeout
+        self.maxAttempts = maxAttempts
+        self.pollInterval = pollInterval
+        self.log = log or (lambda msg: sys.stderr.write(msg + '\n'))
+        self.exporter = exporter
+        # the last mtime seen of every claimed file and when it was seen, on this clock.
+        self._seen = dict()
+
+    def reassignStale(self):
+        """
+        Put back in pending the jobs whose worker didn't give news for the timeout.
+        :return: the names of the jobs given back.
+        :rtype: list
+        """
+        now = time.time()
+        reassigned = list()
+        claims = self.queue.claims()
+        for jobId, workerId, claimPath in claims:
+            try:
+                mtime = os.stat(claimPath).st_mtime
+            except OSError:
+                continue
+            seen = self._seen.get(claimPath)
+            if seen is None or seen[0] != mtime:
+                self._seen[claimPath] = (mtime, now)
+                continue
+            if now - seen[1] < self.timeout:
+                continue
+            del self._seen[claimPath]
+            job = readJson(claimPath)
+            if job is None or self.queue.isDone(jobId):
+                self.queue.removeClaim(claimPath)
+                continue
+            if job.get('attempts', 0) + 1 >= self.maxAttempts:
+                self.queue.complete(jobId, claimPath, dict(job, status='CRASHED', checks=list(), elapsed=0.0,
+                                                           error='The workers died on this file %s times, last on %s.'
+                                                                 % (self.maxAttempts, workerId)))
+                self.log('%s crashed %s workers, given up.' % (jobId, self.maxAttempts))
+            else:
+                self.queue.release(jobId, claimPath, job, attempts=1)
+                self.log('%s : no news from %s, given back.' % (jobId, workerId))
+            reassigned.append(jobId)
+        current = set(x[2] for x in claims)
+        for claimPath in [x for x in self._seen if x not in current]:
+            del self._seen[claimPath]
+        return reassigned
+
+    def watch(self, jobIds, onPoll=None):
+        """
+        Watch the queue until every job has a result.
+        :param jobIds: the names of the jobs to wait for.
+        :type jobIds: list
+        :param onPoll: called on every poll of the queue.
+        :type onPoll: callable
+        :return: the results of the jobs, in the order they finished.
+        :rtype: list
+        """
+        remaining = list(jobIds)
+        results = list()
+        while remaining:
+            self.reassignStale()
+            if onPoll is not None:
+                onPoll()
+            for jobId in list(remaining):
+                result = self.queue.getResult(jobId)
+                if result is None:
+                    continue
+                remaining.remove(jobId)
+                results.append(result)
+                if self.exporter is not None:
+                    batch_validate.exportResult(self.exporter, result)
+                self.log('[%s/%s] %s\t%s' % (len(results), len(jobIds), result['status'], result['file']))
+            if remaining:
+                time.sleep(self.pollInterval)
+        return results
+
+
+def getLocalWorkerCommand(queueRoot, engine='maya', mayapy='mayapy'):
+    """
+    Return the command starting a worker on this machine, it stops when the queue is empty.
+    :param queueRoot: the queue folder.
+    :type queueRoot: str
+    :param engine: "maya", "ascii" or "memory", the ascii and memory workers run on the current python.
+    :type engine: str
+    :param mayapy: the mayapy executable.
+    :type mayapy: str
+    :return:
+    :rtype: list
+    """
+    executable = mayapy if engine == 'maya' else sys.executable
+    return [executable, os.path.abspath(__file__), 'work', '-q', queueRoot, '--engine', engine, '--exit-when-empty']
+
+
+def submitFiles(queue, args):
+    jobIds = list()
+    skipped = 0
+    for sceneFile in batch_validate.expandSceneFiles(args.files):
+        jobId = queue.submit(sceneFile, args.project, args.department, resume=args.resume)
+        if jobId is None:
+            skipped += 1
+        else:
+            jobIds.append(jobId)
+    sys.stderr.write('%s files submitted, %s skipped.\n' % (len(jobIds), skipped))
+    return jobIds
+
+
+def watchJobs(queue, args, jobIds, onPoll=None):
+    from Validations.core import result_export
+
+    exporter = result_export.ExporterGroup([result_export.FORMATS[x](getattr(args, x))
+                                            for x in ('jsonl', 'junit', 'csv') if getattr(args, x)])
+    coordinator = FarmCoordinator(queue, timeout=args.timeout, maxAttempts=args.attempts, exporter=exporter)
+    with exporter:
+        results = coordinator.watch(jobIds, onPoll)
+    failed = [x for x in results if x['status'] not in ('OK', 'WARNING')]
+    return 1 if failed else 0
+
+
+def parseArgs(argv):
+    parser = argparse.ArgumentParser(description='Validate maya scenes on the machines sharing a queue folder.')
+    commands = parser.add_subparsers(dest='command')
+    submit = commands.add_parser('submit', help='add the scenes to the queue.')
+    work = commands.add_parser('work', help='validate the jobs of the queue on this machine.')
+    watch = commands.add_parser('watch', help='give back the jobs of dead workers until the queue is done.')
+    run = commands.add_parser('run', help='submit, validate with local workers and watch.')
+    for each in (submit, work, watch, run):
+        each.add_argument('-q', '--queue', required=True, help='the shared queue folder.')
+    for each in (submit, run):
+        each.add_argument('files', nargs='+', help='maya scenes or glob patterns, as seen by the workers.')
+        each.add_argument('-p', '--project', required=True, help='project name, used to pick the config.')
+        each.add_argument('-d', '--department', choices=('rig', 'anim'), default='rig',
+                          help='the VALIDATIONS list of the config to run.')
+        each.add_argument('--no-resume', dest='resume', action='store_false',
+                          help='validate again the scenes that already have a result.')
+    for each in (work, run):
+        each.add_argument('--engine', choices=('maya', 'ascii', 'memory'), default='maya',
+                          help='"ascii" and "memory" validate the .ma files offline, without maya.')
+    for each in (watch, run):
+        each.add_argument('--timeout', type=float, default=HEARTBEAT_TIMEOUT,
+                          help='seconds without heartbeat before a job is given to another worker.')
+        each.add_argument('--attempts', type=int, default=MAX_ATTEMPTS,
+                          help='workers a job can kill before it is marked CRASHED.')
+        each.add_argument('--jsonl', help='json lines file receiving every check.')
+        each.add_argument('--junit', help='JUnit XML file receiving every check.')
+        each.add_argument('--csv', help='csv file receiving every check.')
+    work.add_argument('--exit-when-empty', action='store_true', help='stop when there is no pending job.')
+    work.add_argument('--no-cache', dest='cache', action='store_false',
+                      help='run every validation, without the result cache.')
+    run.add_argument('-n', '--workers', type=int, default=2, help='number of local workers.')
+    run.add_argument('--mayapy', default=os.environ.get('MAYAPY', 'mayapy'), help='mayapy executable.')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """
+    Command line entry point.
+    :return: 0 if every watched scene is OK or WARNING, 1 otherwise.
+    :rtype: int
+    """
+    args = parseArgs(sys.argv[1:] if argv is None else argv)
+    queue = JobQueue(args.queue)
+
+    if args.command == 'submit':
+        submitFiles(queue, args)
+        return 0
+
+    if args.command == 'work':
+        from Validations.core import batch_worker
+
+        batch_worker._RESULT_CACHE['enabled'] = args.cache
+        if args.engine == 'maya':
+            batch_worker.initializeMaya()
+        worker = FarmWorker(queue, batch_worker.ENGINES[args.engine])
+        try:
+            worker.run(exitWhenEmpty=args.exit_when_empty)
+        except KeyboardInterrupt:
+            pass
+        return 0
+
+    if args.command == 'watch':
+        jobIds = [x[:-len('.json')] for x in queue.listJobs('pending')] + [x[0] for x in queue.claims()]
+        return watchJobs(queue, args, jobIds)
+
+    jobIds = submitFiles(queue, args)
+    command = getLocalWorkerCommand(args.queue, args.engine, args.mayapy)
+    workers = [subprocess.Popen(command) for _ in range(min(args.workers, len(jobIds)))]
+
+    def restartWorkers():
+        # the workers stop on an empty queue, the jobs given back later need new ones.
+        if not queue.listJobs('pending'):
+            return
+        for index, worker in enumerate(workers):
+            if worker.poll() is not None:
+                workers[index] = subprocess.Popen(command)
+
+    try:
+        return watchJobs(queue, args, jobIds, restartWorkers)
+    finally:
+        for worker in workers:
+            worker.wait()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,7 +1,244 @@
+"""
+This is the base module for the Validations, it holds the Validations base class, the ValidationRun holding the data
+shared by all the validations of a run and the scene backends the runs read the scene from.
+
+The live maya session is the default backend. The in-memory backend of core/maya_standin runs the same checks on a
+MemoryScene built from a maya ascii file or a fixture, without maya.
+"""
+# General Imports.
+import collections
+import contextlib
+import time
+
+from Validations.core import error_store
+from Validations.core import scene_snapshot
+
+
+# status, message, error nodes (ErrorNodes) and payload of a finished validation, the payload is the value returned
+# by its check.
+CheckResult = collections.namedtuple('CheckResult', ['status', 'errorMessage', 'errorNodes', 'payload'])
+
+
+class SceneBackend(object):
+    """
+    Where the runs read the scene from. A run activates its backend when it starts and deactivates it when it is
+    closed, the checks then use pymel and cmds as usual.
+    """
+    name = ''
+
+    def activate(self):
+        pass
+
+    def deactivate(self):
+        pass
+
+    def buildSnapshot(self):
+        """
+        Build the scene snapshot of a run.
+        :return:
+        :rtype: scene_snapshot.SceneSnapshot
+        """
+        raise NotImplementedError
+
+
+class MayaBackend(SceneBackend):
+    """
+    The scene opened in the maya session.
+    """
+    name = 'maya'
+
+    def buildSnapshot(self):
+        return scene_snapshot.SceneSnapshot.fromMaya()
+
+
+# the backend of the runs made without one, kept through the reload() of this module by the check modules.
+try:
+    _BACKEND
+except NameError:
+    _BACKEND = {'current': None}
+
+
+def getBackend():
+    """
+    Return the backend of the runs made without one, the maya session unless setBackend changed it.
+    :return:
+    :rtype: SceneBackend
+    """
+    if _BACKEND['current'] is None:
+        _BACKEND['current'] = MayaBackend()
+    return _BACKEND['current']
+
+
+def setBackend(backend):
+    """
+    Change the backend of the runs made without one, None goes back to the maya session. The previous backend is
+    deactivated and the new one activated. The in-memory backend has to be set before the check modules are imported,
+    they import pymel.core when they are loaded.
+    :param backend: the new default backend.
+    :type backend: SceneBackend
+    :return: the previous backend.
+    :rtype: SceneBackend
+    """
+    previous = getBackend()
+    previous.deactivate()
+    _BACKEND['current'] = backend
+    getBackend().activate()
+    return previous
+
+
+class ValidationRun(object):
+    """
+    Data shared by all the validations during one run. The scene snapshot and the cached data are built on first use
+    and thrown away when the run is closed. With an instrumentation every check of the run is measured.
+    """
+    def __init__(self, snapshotBuilder=None, instrumentation=None, backend=None):
+        super(ValidationRun, self).__init__()
+        self.backend = backend or getBackend()
+        self.backend.activate()
+        self._active = True
+        self.snapshotBuilder = snapshotBuilder or self.backend.buildSnapshot
+        self.instrumentation = instrumentation
+        self._snapshot = None
+        self._results = dict()
+        self._pending = set()
+        self._cache = dict()
+
+    @property
+    def snapshot(self):
+        """
+        The scene snapshot for this run.
+        :return:
+        :rtype: scene_snapshot.SceneSnapshot
+        """
+        if self._snapshot is None:
+            self._snapshot = self.snapshotBuilder()
+        return self._snapshot
+
+    def storeResult(self, validation):
+        """
+        Keep the result of a finished validation so the validations depending on it don't run it again.
+        :param validation: the finished validation.
+        :type validation: Validations
+        :return:
+        :rtype: None
+        """
+        key = (type(validation).__name__, validation.project)
+        self._results[key] = CheckResult(validation.status, validation.errorMessage, validation.errorStore.copy(),
+                                         validation.payload)
+
+    def getResult(self, validationClass, project):
+        """
+        Return the result of the validation for this run, running it only the first time it is asked for.
+        :param validationClass: the Validations class to get the result of.
+        :type validationClass: type
+        :param project: the project the validation runs for.
+        :type project: str
+        :return:
+        :rtype: CheckResult
+        """
+        key = (validationClass.__name__, project)
+        if key not in self._results:
+            if key in self._pending:
+                raise RuntimeError('Circular requirement on %s' % validationClass.__name__)
+            self._pending.add(key)
+            try:
+                validationClass(project).run(self)
+            finally:
+                self._pending.discard(key)
+        return self._results[key]
+
+    @contextlib.contextmanager
+    def measure(self, validation):
+        """
+        Measure the check running in the block when the run is instrumented.
+        :param validation: Validations or CheckAbstract instance.
+        :type validation: object
+        :return: the record of the check, None without instrumentation.
+        :rtype: instrumentation.CheckRecord
+        """
+        if self.instrumentation is None:
+            yield None
+            return
+        with self.instrumentation.measure(validation, lambda: self._snapshot) as record:
+            yield record
+
+    def getCached(self, key, factory):
+        """
+        Return the data cached for this run under the key, built by the factory the first time.
+        :param key: hashable key, prefixed by the module using it.
+        :type key: tuple
+        :param factory: callable without argument building the data.
+        :type factory: callable
+        :return:
+        :rtype: object
+        """
+        if key not in self._cache:
+            self._cache[key] = factory()
+        return self._cache[key]
+
+    def close(self):
+        """
+        End the run and drop everything cached for it.
+        :return:
+        :rtype: None
+        """
+        self._snapshot = None
+        self._results = dict()
+        self._cache = dict()
+        if self.instrumentation is not None:
+            self.instrumentation.close()
+        if self._active:
+            self._active = False
+            self.backend.deactivate()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+@contextlib.contextmanager
+def boundRun(validation, validationRun=None):
+    """
+    Bind the validation to the run for the duration of the block. If no run is given a private one is made for the
+    block and closed at the end.
+    :param validation: Validations or CheckAbstract instance.
+    :type validation: object
+    :param validationRun: the run to bind to.
+    :type validationRun: ValidationRun
+    :return:
+    :rtype: ValidationRun
+    """
+    ownRun = validationRun is None
+    if ownRun:
+        validationRun = ValidationRun()
+    previousRun = validation.validationRun
+    validation.validationRun = validationRun
+    try:
+        yield validationRun
+    finally:
+        validation.validationRun = previousRun
+        if ownRun:
+            validationRun.close()
+
+
 class Validations(object):
     _possibleStatus = ("WAITING", "RUNNING", "WARNING", "ERROR", "OK")
     _name = ""
     _category = ""
+    # Validations classes this one needs the result of, they run once per run and are shared by all the dependents.
+    _requires = ()
+    # what the check reads, used by the live mode (see live_validation) to only run it again when it can change.
+    # None means any node type or any attribute, () means none of them.
+    _watchTypes = None
+    _watchAttrs = None
+    _watchEvents = ()
+    # bump when the check changes what it reports, the cached results of the older versions are not used (result_cache).
+    _version = 1
+    # False when the result doesn't only depend on the scene, it is then never taken from the result cache.
+    _cacheable = True
+    validationRun = None
 
     def __init__(self, project):
         super(Validations, self).__init__()
@@ -14,6 +251,8 @@ class Validations(object):
         self.warningNodes = list()
         self.isFixable = True
         self.isNodes = True
+        self.payload = None
+        self.requirements = dict()
 
     def _test(self):
         pass
@@ -30,18 +269,82 @@ class Validations(object):
     def setErrorNodes(self, errorNodes=list()):
         self.errorNodes = errorNodes
 
+    @property
+    def errorNodes(self):
+        """
+        The error nodes still in the scene, they are kept in the compact errorStore between the runs.
+        :return:
+        :rtype: list
+        """
+        return self.errorStore.resolve()
+
+    @errorNodes.setter
+    def errorNodes(self, errorNodes):
+        self.errorStore = error_store.ErrorNodes(errorNodes)
+
     def setStatus(self, status):
         if status in self._possibleStatus:
             self.status = status
         else:
             raise RuntimeError('Invalid status change for %s' % self._name)
 
-    def run(self):
+    @property
+    def snapshot(self):
+        """
+        The scene snapshot of the current run, outside of a run a fresh one is built by the default backend on each
+        access.
+        :return:
+        :rtype: scene_snapshot.SceneSnapshot
+        """
+        if self.validationRun is None:
+            return getBackend().buildSnapshot()
+        return self.validationRun.snapshot
+
+    def getRequirement(self, validationClass):
+        """
+        Return the result of one of the required validations for the current run.
+        :param validationClass: a class listed in _requires.
+        :type validationClass: type
+        :return:
+        :rtype: CheckResult
+        """
+        if validationClass.__name__ not in self.requirements:
+            raise RuntimeError('%s is not a requirement of %s' % (validationClass.__name__, self._name))
+        return self.requirements[validationClass.__name__]
+
+    def run(self, validationRun=None):
+        for _ in self.iterRun(validationRun):
+            pass
+
+    def iterRun(self, validationRun=None):
+        """
+        Run the validation a chunk at a time, the generator stops after each chunk of the check so a scheduler can give
+        the hand back in between (see run_scheduler). Closing the generator cancels the validation, the time it spends
+        stopped is not measured.
+        :param validationRun: the run shared with the other validations, a private one is used if not given.
+        :type validationRun: ValidationRun
+        :return:
+        :rtype: generator
+        """
         self.reset()
-        self.outPut()
+        with boundRun(self, validationRun) as currentRun:
+            for required in self._requires:
+                self.requirements[required.__name__] = currentRun.getResult(required, self.project)
+            with currentRun.measure(self) as record:
+                for _ in self.iterOutPut():
+                    paused = time.time()
+                    yield
+                    if record is not None:
+                        record.idleTime += time.time() - paused
+            currentRun.storeResult(self)
 
     def outPut(self):
-        self.check()
+        for _ in self.iterOutPut():
+            pass
+
+    def iterOutPut(self):
+        for _ in self.iterCheck():
+            yield
         if self.status in ['ERROR', 'WARNING']:
             print '%s\t:-' % self._category
             print '%s\t:\t%s\n\t%s' % (self._name, self.status, self.errorMessage)
@@ -52,6 +355,16 @@ class Validations(object):
     def check(self):
         pass
 
+    def iterCheck(self):
+        """
+        The check a chunk at a time, yielding between the chunks. The checks going through many nodes override it to
+        give the hand back between them, by default the whole check is one chunk.
+        :return:
+        :rtype: generator
+        """
+        self.payload = self.check()
+        yield
+
     def fix(self):
         pass
 
@@ -63,6 +376,8 @@ class Validations(object):
         self.status = 'WAITING'
         self.errorMessage = ''
         self.errorNodes = list()
+        self.payload = None
+        self.requirements = dict()
 
 if __name__ == '__main__':
     val = Validations('bdg')
@@ -0,0 +1,243 @@
+"""
+Audit of the work folders of an episode. Every shot work folder (<episode>/<shot>/lay/maya/work by default) is listed
+with one scandir, over a thread pool since the time goes in the network round trips, and its maya files are kept in a
+SQLite index with their size, mtime and version, the number before the extension ("BDG101_sh010_lay_003.ma" is 3).
+
+A folder whose mtime didn't change since the last scan is not listed again, saving a new version changes it. A file
+saved over in place doesn't, --rescan lists everything again. The questions (QUERIES) are answered from the index:
+    not-first : the shots whose oldest work file is not version 1.
+    missing   : the shots without work file.
+    gaps      : the shots missing versions between their first and last one.
+
+VALIDATIONS_WORK_AUDIT_INDEX gives the SQLite file.
+
+usage:
+    python -m Validations.core.work_audit B:/01_SAISON_1/13_PRODUCTION/04_EPISODES/02_Fabrication_3D/BDG101 -q missing
+"""
+# General Imports.
+import argparse
+import os
+import re
+import sqlite3
+import sys
+import time
+from multiprocessing.pool import ThreadPool
+
+from Validations.core.stat_cache import scandir
+
+WORK_AUDIT_INDEX_ENV = 'VALIDATIONS_WORK_AUDIT_INDEX'
+DEFAULT_INDEX_FILE = os.path.join(os.path.expanduser('~'), '.validations', 'work_audit.sqlite').replace('\\', '/')
+
+WORK_FOLDER = ('lay', 'maya', 'work')
+SCENE_EXTENSIONS = ('.ma', '.mb')
+# the folders of the episode that are not shots.
+SKIPPED_FOLDERS = ('animatic',)
+MAX_WORKERS = 16
+
+_VERSION_RE = re.compile(r'[_.vV](?P<version>\d+)\.m[ab]$')
+
+_SCHEMA = ('CREATE TABLE IF NOT EXISTS folders (episode TEXT, shot TEXT, path TEXT, mtime REAL, scanned REAL, '
+           'PRIMARY KEY (episode, shot))',
+           'CREATE TABLE IF NOT EXISTS files (episode TEXT, shot TEXT, name TEXT, size INTEGER, mtime REAL, '
+           'version INTEGER, PRIMARY KEY (episode, shot, name))')
+
+# every query gets the episode and gives (shot, work folder, detail) rows.
+QUERIES = {
+    'not-first': 'SELECT f.shot, f.path, o.name FROM folders f JOIN files o ON o.episode = f.episode AND '
+                 'o.shot = f.shot WHERE f.episode = ? AND o.mtime = (SELECT MIN(mtime) FROM files WHERE '
+                 'episode = f.episode AND shot = f.shot) AND (o.version IS NULL OR o.version != 1) ORDER BY f.shot',
+    'missing': "SELECT f.shot, f.path, CASE WHEN f.mtime IS NULL THEN 'no work folder' ELSE 'no work file' END "
+               'FROM folders f WHERE f.episode = ? AND NOT EXISTS (SELECT 1 FROM files WHERE episode = f.episode AND '
+               'shot = f.shot) ORDER BY f.shot',
+    'gaps': "SELECT f.shot, f.path, 'versions ' || MIN(o.version) || '-' || MAX(o.version) || ', ' || "
+            "COUNT(DISTINCT o.version) || ' found' FROM folders f JOIN files o ON o.episode = f.episode AND "
+            'o.shot = f.shot WHERE f.episode = ? AND o.version IS NOT NULL GROUP BY f.shot, f.path '
+            'HAVING COUNT(DISTINCT o.version) != MAX(o.version) - MIN(o.version) + 1 ORDER BY f.shot',
+}
+
+
+def getVersion(name):
+    """
+    Return the version of a work file, the number before the extension.
+    :param name: the file name.
+    :type name: str
+    :return: None if the name has no version.
+    :rtype: int
+    """
+    match = _VERSION_RE.search(name.lower())
+    return int(match.group('version')) if match else None
+
+
+def listShots(episodeFolder):
+    """
+    Return the shot folders of the episode.
+    :param episodeFolder: the episode folder.
+    :type episodeFolder: str
+    :return:
+    :rtype: list
+    """
+    if scandir is not None:
+        names = [x.name for x in scandir(episodeFolder) if x.is_dir()]
+    else:
+        names = [x for x in os.listdir(episodeFolder) if os.path.isdir(os.path.join(episodeFolder, x))]
+    return sorted(x for x in names if x.lower() not in SKIPPED_FOLDERS)
+
+
+def scanWorkFolder(workFolder, knownMtime=None):
+    """
+    List the maya files of a work folder with their size and mtime.
+    :param workFolder: the work folder.
+    :type workFolder: str
+    :param knownMtime: the folder mtime of the last scan, the folder isn't listed if it didn't change.
+    :type knownMtime: float
+    :return: the folder mtime (None if it doesn't exist) and the (name, size, mtime) of the files, None if unchanged.
+    :rtype: tuple
+    """
+    try:
+        folderMtime = os.stat(workFolder).st_mtime
+    except OSError:
+        return None, list()
+    if knownMtime is not None and folderMtime == knownMtime:
+        return folderMtime, None
+
+    files = list()
+    try:
+        if scandir is not None:
+            # on windows the stat comes with the listing.
+            entries = [(x.name, x.stat()) for x in scandir(workFolder)
+                       if os.path.splitext(x.name)[-1].lower() in SCENE_EXTENSIONS and x.is_file()]
+        else:
+            entries = [(x, os.stat(os.path.join(workFolder, x))) for x in os.listdir(workFolder)
+                       if os.path.splitext(x)[-1].lower() in SCENE_EXTENSIONS]
+    except OSError:
+        return None, list()
+    for name, fileStat in entries:
+        files.append((name, fileStat.st_size, fileStat.st_mtime))
+    return folderMtime, files
+
+
+class WorkAudit(object):
+    """
+    The SQLite index of the work folders.
+    """
+    def __init__(self, path=DEFAULT_INDEX_FILE, workFolder=WORK_FOLDER, maxWorkers=MAX_WORKERS):
+        super(WorkAudit, self).__init__()
+        self.path = path
+        self.workFolder = workFolder
+        self.maxWorkers = maxWorkers
+        folder = os.path.dirname(path)
+        if folder and not os.path.isdir(folder):
+            os.makedirs(folder)
+        self.connection = sqlite3.connect(path, timeout=30)
+        for statement in _SCHEMA:
+            self.connection.execute(statement)
+        self.connection.commit()
+
+    @classmethod
+    def fromEnvironment(cls, **kwargs):
+        return cls(os.environ.get(WORK_AUDIT_INDEX_ENV) or DEFAULT_INDEX_FILE, **kwargs)
+
+    @staticmethod
+    def getEpisodeKey(episodeFolder):
+        return os.path.normcase(os.path.abspath(episodeFolder)).replace('\\', '/')
+
+    def scan(self, episodeFolder, rescan=False):
+        """
+        Bring the index of the episode up to date.
+        :param episodeFolder: the episode folder.
+        :type episodeFolder: str
+        :param rescan: list every work folder, even the unchanged ones.
+        :type rescan: bool
+        :return: the number of shots and of work folders listed.
+        :rtype: tuple
+        """
+        episode = self.getEpisodeKey(episodeFolder)
+        known = dict() if rescan else dict(self.connection.execute('SELECT shot, mtime FROM folders WHERE episode = ?',
+                                                                   (episode,)).fetchall())
+        shots = listShots(episodeFolder)
+        workFolders = [os.path.join(episodeFolder, x, *self.workFolder).replace('\\', '/') for x in shots]
+        args = [(x, known.get(y)) for x, y in zip(workFolders, shots)]
+        pool = ThreadPool(max(1, min(self.maxWorkers, len(args))))
+        try:
+            scanned = pool.map(lambda x: scanWorkFolder(*x), args)
+        finally:
+            pool.close()
+            pool.join()
+
+        now = time.time()
+        listed = 0
+        with self.connection:
+            self.connection.execute('DELETE FROM folders WHERE episode = ? AND shot NOT IN (%s)'
+                                    % ', '.join('?' * len(shots)), [episode] + shots)
+            self.connection.execute('DELETE FROM files WHERE episode = ? AND shot NOT IN (%s)'
+                                    % ', '.join('?' * len(shots)), [episode] + shots)
+            for shot, workFolder, (folderMtime, files) in zip(shots, workFolders, scanned):
+                self.connection.execute('INSERT OR REPLACE INTO folders VALUES (?, ?, ?, ?, ?)',
+                                        (episode, shot, workFolder, folderMtime, now))
+                if files is None:
+                    continue
+                listed += folderMtime is not None
+                self.connection.execute('DELETE FROM files WHERE episode = ? AND shot = ?', (episode, shot))
+                self.connection.executemany('INSERT INTO files VALUES (?, ?, ?, ?, ?, ?)',
+                                            [(episode, shot, name, size, mtime, getVersion(name))
+                                             for name, size, mtime in files])
+        return len(shots), listed
+
+    def query(self, episodeFolder, name):
+        """
+        Answer a question from the index.
+        :param episodeFolder: the episode folder.
+        :type episodeFolder: str
+        :param name: the question, a key of QUERIES.
+        :type name: str
+        :return: the (shot, work folder, detail) rows.
+        :rtype: list
+        """
+        if name not in QUERIES:
+            raise ValueError('Unknown query %s, use %s' % (name, ', '.join(sorted(QUERIES))))
+        return self.connection.execute(QUERIES[name], (self.getEpisodeKey(episodeFolder),)).fetchall()
+
+    def close(self):
+        self.connection.close()
+
+
+def parseArgs(argv):
+    parser = argparse.ArgumentParser(description='Audit the shot work folders of an episode.')
+    parser.add_argument('episode', help='the episode folder, holding one folder per shot.')
+    parser.add_argument('-q', '--query', action='append', choices=sorted(QUERIES),
+                        help='the questions to answer, not-first by default.')
+    parser.add_argument('--work-folder', default='/'.join(WORK_FOLDER), help='the work folder inside a shot.')
+    parser.add_argument('--rescan', action='store_true', help='list every work folder again.')
+    parser.add_argument('--no-scan', dest='scan', action='store_false', help='answer from the index as it is.')
+    parser.add_argument('--index', help='the SQLite index file.')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """
+    Command line entry point.
+    :return: 0 if no shot was found, 1 otherwise.
+    :rtype: int
+    """
+    args = parseArgs(sys.argv[1:] if argv is None else argv)
+    workFolder = tuple(x for x in args.work_folder.replace('\\', '/').split('/') if x)
+    audit = WorkAudit(args.index, workFolder) if args.index else WorkAudit.fromEnvironment(workFolder=workFolder)
+    found = 0
+    try:
+        if args.scan:
+            start = time.time()
+            shotCount, listed = audit.scan(args.episode, rescan=args.rescan)
+            sys.stderr.write('%s shots, %s work folders listed in %.2fs.\n' % (shotCount, listed, time.time() - start))
+        for name in args.query or ['not-first']:
+            rows = audit.query(args.episode, name)
+            print '%s : %s shots' % (name, len(rows))
+            for shot, path, detail in rows:
+                print '%s :\t\t%s\t%s' % (shot, path, detail)
+            found += len(rows)
+    finally:
+        audit.close()
+    return 1 if found else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
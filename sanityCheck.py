@@ -2,9 +2,15 @@
 This is the main ui module for the SanityCheck.
 """
 # general imports.
-import os
+import functools
+import importlib
 import inspect
-import ConfigParser
+import os
+import pyclbr
+import sys
+import time
+
+_IMPORT_START = time.time()
 
 # Qt imports.
 from PySide import QtGui
@@ -12,20 +18,25 @@ from PySide import QtCore
 from shiboken import wrapInstance
 
 # custom imports.
-from Validations.core.rig import RigValidations
-from Validations.core.anim import animValidations
+from Validations.core import dev_mode
+from Validations.core import error_store
+from Validations.core import instrumentation
+from Validations.core import live_validation
+from Validations.core import project_config
+from Validations.core import result_cache
+from Validations.core import result_export
+from Validations.core import run_scheduler
+from Validations.core import validations
 from Validations.ui import validation_ui
 from Validations.ui import result_ui
 
 # maya imports.
-import pymel.core as pm
+import maya.cmds as cmds
 import maya.OpenMayaUI as omui
 # from maya.app.general.mayaMixin import MayaQWidgetDockableMixin
 
-# reload custom imports.
-reload(animValidations)
-reload(RigValidations)
-reload(validation_ui)
+# reload custom imports, in development mode only, see dev_mode.
+dev_mode.devReload(validation_ui)
 
 
 def maya_main_window():
@@ -37,10 +48,86 @@ def maya_main_window():
     main_window_ptr = omui.MQtUtil.mainWindow()
     return wrapInstance(long(main_window_ptr), QtGui.QWidget)
 
-sshFile=r"D:\user\durgesh.n\workspace\Validations\source\Validations\ui\QTDark.stylesheet"
-QTDark = None
-with open(sshFile,"r") as fh:
-    QTDark = fh.read()
+UI_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'ui')
+STYLESHEET_FILE = os.path.join(UI_FOLDER, 'QTDark.stylesheet')
+ICON_FOLDER = os.path.join(UI_FOLDER, 'icons')
+# the check modules of the departments, imported on the first run since they import pymel.
+CHECK_MODULES = {'rig': 'Validations.core.rig.RigValidations', 'anim': 'Validations.core.anim.animValidations'}
+# seconds from the import of this module to the window built, slower starts are reported.
+STARTUP_TARGET = 1.0
+
+# the stylesheet and the icons, loaded once for all the windows.
+_RESOURCES = {'stylesheet': None, 'icons': dict()}
+# the first window also pays the import of this module.
+_STARTUP = {'first': True}
+
+
+def get_stylesheet():
+    """
+    Return the QTDark stylesheet of the package.
+    :return:
+    :rtype: str
+    """
+    if _RESOURCES['stylesheet'] is None:
+        with open(STYLESHEET_FILE, 'r') as fh:
+            _RESOURCES['stylesheet'] = fh.read()
+    return _RESOURCES['stylesheet']
+
+
+def get_icon(name):
+    """
+    Return the icon of the package, an empty icon for an empty name.
+    :param name: the icon file name in ui/icons.
+    :type name: str
+    :return:
+    :rtype: QtGui.QIcon
+    """
+    if name not in _RESOURCES['icons']:
+        _RESOURCES['icons'][name] = QtGui.QIcon(os.path.join(ICON_FOLDER, name)) if name else QtGui.QIcon()
+    return _RESOURCES['icons'][name]
+
+
+def get_check_module(tool_for):
+    """
+    Import the check module of the department, reloaded in development mode.
+    :param tool_for: "rig" or "anim".
+    :type tool_for: str
+    :return:
+    :rtype: module
+    """
+    name = CHECK_MODULES[tool_for]
+    loaded = name in sys.modules
+    module = importlib.import_module(name)
+    if loaded:
+        dev_mode.devReload(module)
+    return module
+
+
+def list_check_classes(tool_for, module=None):
+    """
+    Return the names of the classes of the check module of the department. Without the module its source is read by
+    pyclbr, so the window shows up without importing pymel.
+    :param tool_for: "rig" or "anim".
+    :type tool_for: str
+    :param module: the check module, if it is imported already.
+    :type module: module
+    :return:
+    :rtype: list
+    """
+    if module is not None:
+        return sorted(x[0] for x in inspect.getmembers(module, inspect.isclass))
+    return sorted(pyclbr.readmodule(CHECK_MODULES[tool_for]))
+
+
+def scene_name():
+    return cmds.file(query=True, sceneName=True) or ''
+
+# live mode waits for the scene edits to settle before running the dirty validations.
+LIVE_DELAY_MS = 300
+# run_all gives the hand back to maya between two chunks of the validations.
+RUN_TICK_MS = 0
+# rows of error nodes added to the log window each time its list is scrolled to the end.
+LOG_FETCH_ROWS = 200
 
 
 # class Validator(MayaQWidgetDockableMixin, QtGui.QMainWindow, validation_ui.Ui_MainWindow):
@@ -49,30 +136,82 @@ class Validator(QtGui.QMainWindow, validation_ui.Ui_MainWindow):
     This the the Class start.
     """
     def __init__(self, debug=False, tool_for='rig'):
+        init_start = time.time()
         super(Validator, self).__init__()
         self.setObjectName('sanity_check_window')
         self.debug = debug
         self.tool_for = tool_for
         self.root_folder = os.path.dirname(__file__)
+        self.check_module = None
         self.setupUi(self)
         self.setWindowTitle('PCGI Validation Checks : %s' % self.tool_for)
         self.setMinimumWidth(385)
         self.treeWidget.setHeaderHidden(True)
-        self.treeWidget.setColumnCount(5)
+        self.treeWidget.setColumnCount(6)
         self.treeWidget.setColumnWidth(0, 200)
         self.treeWidget.setColumnWidth(1, 50)
         self.treeWidget.setColumnWidth(2, 35)
         self.treeWidget.setColumnWidth(3, 35)
         self.treeWidget.setColumnWidth(3, 35)
         self.treeWidget.setColumnWidth(4, 35)
+        # time taken by the last run of the validation.
+        self.treeWidget.setColumnWidth(5, 50)
         self.treeWidget.setSelectionMode(QtGui.QAbstractItemView.MultiSelection)
 
+        # live mode, added here to keep the generated ui untouched.
+        self.live_validation = None
+        self.live_cb = QtGui.QCheckBox('Live', self.centralwidget)
+        self.live_cb.setToolTip('Run the validations again when the scene changes.')
+        self.horizontalLayout.addWidget(self.live_cb)
+        self.live_timer = QtCore.QTimer(self)
+        self.live_timer.setSingleShot(True)
+        self.live_timer.setInterval(LIVE_DELAY_MS)
+
+        # progress of run_all, the validations run a chunk per tick of the run timer.
+        self.scheduler = None
+        self.scheduler_items = dict()
+        self.result_cache = None
+        self.scene_key = None
+        # the saved scene the results are cached for, they are stored only if it is still open and unchanged.
+        self.cache_scene_file = None
+        self.cached_names = list()
+        self.report_file = None
+        self.exporter = None
+        self.run_timer = QtCore.QTimer(self)
+        self.run_timer.setInterval(RUN_TICK_MS)
+        self.progress_layout = QtGui.QHBoxLayout()
+        self.progress_bar = QtGui.QProgressBar(self.centralwidget)
+        self.progress_lb = QtGui.QLabel(self.centralwidget)
+        self.cancel_tb = QtGui.QToolButton(self.centralwidget)
+        self.cancel_tb.setText('Cancel')
+        self.progress_layout.addWidget(self.progress_bar)
+        self.progress_layout.addWidget(self.progress_lb)
+        self.progress_layout.addWidget(self.cancel_tb)
+        self.gridLayout.addLayout(self.progress_layout, 3, 0, 1, 1)
+        self.show_progress(False)
+
         self.fill_ui()
         self.select_all_tb.setText('Toggle Selection All')
         self.populateProjects()
         self.connections()
 
-        self.setStyleSheet(QTDark)
+        self.setStyleSheet(get_stylesheet())
+        self.report_startup(init_start)
+
+    def report_startup(self, init_start):
+        """
+        Print the time taken to build the window when it misses STARTUP_TARGET, or always in development mode.
+        :param init_start: the time the window started to be built.
+        :type init_start: float
+        :return:
+        :rtype: None
+        """
+        now = time.time()
+        total = now - (_IMPORT_START if _STARTUP['first'] else init_start)
+        _STARTUP['first'] = False
+        if total > STARTUP_TARGET or dev_mode.isDevMode():
+            print 'SanityCheck window built in %.3fs (target %.1fs, window %.3fs).' % (total, STARTUP_TARGET,
+                                                                                     now - init_start)
 
     def populateProjects(self):
         """
@@ -81,9 +220,7 @@ class Validator(QtGui.QMainWindow, validation_ui.Ui_MainWindow):
         :rtype:
         """
         self.proj_cb.clear()
-        config_folder = os.path.join(os.path.dirname(__file__), 'config').replace('\\', '/')
-        projects = [x for x in os.listdir(config_folder) if not x == 'default']
-        self.proj_cb.addItems(projects)
+        self.proj_cb.addItems(project_config.listProjects())
         self.proj_cb.insertItem(0, 'default')
         self.proj_cb.setCurrentIndex(0)
 
@@ -93,25 +230,15 @@ class Validator(QtGui.QMainWindow, validation_ui.Ui_MainWindow):
         :return:
         :rtype:
         """
-        config_folder = os.path.join(os.path.dirname(__file__), 'config').replace('\\', '/')
-        # print config_folder
-        if not proj:
-            proj = 'default'
-        else:
-            proj = proj.lower()
-        config_file = os.path.join(config_folder, proj)
-        # print config_file
-        return config_file
+        return project_config.getConfigFile(proj)
 
     def get_parser(self, proj):
         """
-        Make the parser with the config file.
+        Get the cached config of the project.
         :return:
-        :rtype:
+        :rtype: project_config.ProjectConfig
         """
-        config_parser = ConfigParser.ConfigParser()
-        config_parser.read(self.get_config_file(proj))
-        return config_parser
+        return project_config.getConfig(proj)
 
     def connections(self):
         """
@@ -124,6 +251,10 @@ class Validator(QtGui.QMainWindow, validation_ui.Ui_MainWindow):
         self.run_all_tb.clicked.connect(self.run_all)
         self.refresh_tb.clicked.connect(self.refereshDef)
         self.proj_cb.currentIndexChanged.connect(self.fill_ui)
+        self.live_cb.toggled.connect(self.toggle_live)
+        self.live_timer.timeout.connect(self.run_dirty)
+        self.run_timer.timeout.connect(self.run_tick)
+        self.cancel_tb.clicked.connect(self.cancel_run)
 
     def getValidations(self, proj):
         parser = self.get_parser(proj)
@@ -148,33 +279,37 @@ class Validator(QtGui.QMainWindow, validation_ui.Ui_MainWindow):
         validValidations = self.getValidations(projectName)
         self.treeWidget.clear()
 
-        valid_dept = list()
-        if self.tool_for == 'rig':
-            valid_dept = inspect.getmembers(RigValidations, inspect.isclass)
-
-        if self.tool_for == 'anim':
-            valid_dept = inspect.getmembers(animValidations, inspect.isclass)
-
-        for each in valid_dept:
-            # print each, '<------------------------------------------'
-            # self.addItemToTree(each[0])
-            if each[0] in ['MayaValidations', 'TestingTheUI']:
+        # the validations are made on their first use, see make_validation.
+        if self.check_module is None and (dev_mode.isDevMode() or CHECK_MODULES[self.tool_for] in sys.modules):
+            self.check_module = get_check_module(self.tool_for)
+        for each in list_check_classes(self.tool_for, self.check_module):
+            if each in ['MayaValidations', 'TestingTheUI']:
                 if not self.debug:
                     continue
-            # print validValidations, '<========================================'
-            if not each[0] in validValidations:
+            if not each in validValidations:
                 continue
+            CustomTreeItem(self.treeWidget, each, functools.partial(self.make_validation, each, projectName),
+                           self.root_folder)
 
-            class_i = None
-            if self.tool_for == 'rig':
-                class_i = 'RigValidations.%s("%s")' % (each[0], projectName)
-            if self.tool_for == 'anim':
-                class_i = 'animValidations.%s("%s")' % (each[0], projectName)
+        # the tree items are new, watch them instead of the old ones.
+        if self.live_cb.isChecked():
+            self.toggle_live(True)
 
-            class_init = eval(class_i)
-            class_init.project = projectName
-            item = CustomTreeItem(self.treeWidget, each[0], class_init, self.root_folder)
-            item.setData(66, QtCore.Qt.UserRole, class_init)
+    def make_validation(self, class_name, project_name):
+        """
+        Make the validation of a tree item, the check module is imported by the first one.
+        :param class_name: the validation class name.
+        :type class_name: str
+        :param project_name: the project of the validation.
+        :type project_name: str
+        :return:
+        :rtype: validations.Validations
+        """
+        if self.check_module is None:
+            self.check_module = get_check_module(self.tool_for)
+        class_init = getattr(self.check_module, class_name)(project_name)
+        class_init.project = project_name
+        return class_init
 
     def toggle_all_def(self):
         """
@@ -189,11 +324,13 @@ class Validator(QtGui.QMainWindow, validation_ui.Ui_MainWindow):
             i = 1 - cb.currentIndex()
             cb.setCurrentIndex(i)
 
-    def run_def(self, itm=''):
+    def run_def(self, itm='', validation_run=None):
         """
         Run the validation and store the class related info here.
         :param itm:
         :type itm:
+        :param validation_run: the run shared by all the validations in run_all, a private one is used if not given.
+        :type validation_run: validations.ValidationRun
         :return:
         :rtype:
         """
@@ -204,12 +341,30 @@ class Validator(QtGui.QMainWindow, validation_ui.Ui_MainWindow):
             print 'Validation switched off SKIPPING...'
             return
 
-        class_init = itm.data(66, QtCore.Qt.UserRole)
-        class_init.run()
+        class_init = itm.get_validation()
+        if validation_run is None:
+            with self.make_validation_run() as own_run:
+                class_init.run(own_run)
+                self.show_result(itm, own_run)
+        else:
+            class_init.run(validation_run)
+            self.show_result(itm, validation_run)
 
-        error_icon = QtGui.QIcon(os.path.join(self.root_folder, 'ui/icons/NOTOK.png'))
-        ok_icon = QtGui.QIcon(os.path.join(self.root_folder, 'ui/icons/OK.png'))
-        warning_icon = QtGui.QIcon(os.path.join(self.root_folder, 'ui/icons/warning3.png'))
+    def show_result(self, itm, validation_run):
+        """
+        Show the status and the timing of the last run of the validation.
+        :param itm: the tree item of the validation.
+        :type itm: CustomTreeItem
+        :param validation_run: the run the validation ran in.
+        :type validation_run: validations.ValidationRun
+        :return:
+        :rtype: None
+        """
+        self.show_timing(itm, validation_run)
+        class_init = itm.get_validation()
+        error_icon = get_icon('NOTOK.png')
+        ok_icon = get_icon('OK.png')
+        warning_icon = get_icon('Warning3.png')
         tb = self.treeWidget.itemWidget(itm, 2)
         nodes_tb = self.treeWidget.itemWidget(itm, 3)
         fix_tb = self.treeWidget.itemWidget(itm, 4)
@@ -223,14 +378,298 @@ class Validator(QtGui.QMainWindow, validation_ui.Ui_MainWindow):
         nodes_tb.setEnabled(class_init.isNodes)
         fix_tb.setEnabled(class_init.isFixable)
 
+    def make_validation_run(self):
+        """
+        Return a new instrumented run, the pymel/cmds calls are counted if VALIDATIONS_COUNT_CALLS is set.
+        :return:
+        :rtype: validations.ValidationRun
+        """
+        return validations.ValidationRun(instrumentation=instrumentation.Instrumentation.fromEnvironment())
+
+    def show_timing(self, itm, validation_run):
+        """
+        Show the measures of the last run of the validation in the timing column.
+        :param itm: the tree item of the validation.
+        :type itm: CustomTreeItem
+        :param validation_run: the instrumented run the validation ran in.
+        :type validation_run: validations.ValidationRun
+        :return:
+        :rtype: None
+        """
+        if validation_run is None or validation_run.instrumentation is None:
+            return
+        record = validation_run.instrumentation.getRecord(itm.get_validation())
+        if record is None:
+            return
+        itm.setText(5, '%.2fs' % record.wallTime)
+        tool_tip = '%.3f seconds\n%s nodes inspected' % (record.wallTime, record.nodesInspected)
+        if validation_run.instrumentation.counter is not None:
+            tool_tip += '\n%s pymel/cmds calls' % record.callCount
+        itm.setToolTip(5, tool_tip)
+
     def run_all(self):
         """
-        This is to run on all.
+        This is to run on all without blocking maya, the validations run a chunk per tick of the run timer and their
+        results show up as soon as they are done. The measures of the run are written to a json report at the end.
+        On a scene unchanged since it was saved, the results of the result cache are shown without running.
         :return:
         :rtype:
         """
+        if self.scheduler is not None:
+            return
+        to_run = list()
+        self.scheduler_items = dict()
+        for each in range(self.treeWidget.topLevelItemCount()):
+            itm = self.treeWidget.topLevelItem(each)
+            if str(self.treeWidget.itemWidget(itm, 1).currentText()) == 'OFF':
+                continue
+            class_init = itm.get_validation()
+            self.scheduler_items[type(class_init).__name__] = itm
+            to_run.append(class_init)
+
+        # the checks are exported next to the run report as soon as they are done, see result_export.
+        self.report_file = instrumentation.getReportFile(scene_name())
+        try:
+            self.exporter = result_export.ExporterGroup.fromEnvironment(os.path.splitext(self.report_file)[0])
+        except ValueError as error:
+            # a wrong VALIDATIONS_EXPORT_FORMATS doesn't stop the run, it only goes without exports.
+            print 'Validation results not exported : %s' % error
+            self.exporter = None
+        self.open_result_cache()
+        cached = dict()
+        if self.result_cache is not None:
+            cached = self.result_cache.getMany(self.scene_key, [type(x) for x in to_run])
+        self.cached_names = sorted(cached)
+        for class_init in [x for x in to_run if type(x).__name__ in cached]:
+            result_cache.applyResult(class_init, cached[type(class_init).__name__])
+            self.show_cached(self.scheduler_items[type(class_init).__name__])
+            self.export_result(result_export.checkResult(class_init))
+            to_run.remove(class_init)
+        self.start_scheduler(to_run)
+
+    def start_scheduler(self, to_run):
+        """
+        Start running the validations a chunk per tick of the run timer, with the progress bar and the cancel button.
+        :param to_run: the validations, their tree items are in scheduler_items.
+        :type to_run: list
+        :return:
+        :rtype: None
+        """
+        # one scene snapshot for the whole run, dropped when the run ends.
+        self.scheduler = run_scheduler.RunScheduler(self.make_validation_run(), to_run, onResult=self.scheduled_result)
+        self.progress_bar.setRange(0, self.scheduler.total)
+        self.progress_bar.setValue(0)
+        self.progress_lb.setText('')
+        self.show_progress(True)
+        self.run_timer.start()
+
+    def open_result_cache(self):
+        """
+        Open the result cache for run_all when the scene is saved and unchanged since.
+        :return:
+        :rtype: None
+        """
+        self.result_cache = None
+        self.scene_key = None
+        self.cache_scene_file = None
+        scene_file = cmds.file(q=True, sceneName=True)
+        if not scene_file or cmds.file(q=True, modified=True):
+            return
+        self.cache_scene_file = scene_file
+        self.result_cache = result_cache.ResultCache.fromEnvironment()
+        if self.result_cache is not None:
+            self.scene_key = self.result_cache.getSceneKey(scene_file, str(self.proj_cb.currentText()),
+                                                           validations.getBackend().name,
+                                                           result_cache.getMayaReferences())
+
+    def show_cached(self, itm):
+        """
+        Show the cached result of the validation.
+        :param itm: the tree item of the validation.
+        :type itm: CustomTreeItem
+        :return:
+        :rtype: None
+        """
+        self.show_result(itm, None)
+        itm.setText(5, 'cached')
+        itm.setToolTip(5, 'Result of the last run on this saved scene.')
+
+    def run_tick(self):
+        """
+        Run the next chunk of run_all and update the progress.
+        :return:
+        :rtype: None
+        """
+        if self.scheduler is None:
+            self.run_timer.stop()
+            return
+        if self.live_validation is not None:
+            with self.live_validation.suspended():
+                running = self.scheduler.step()
+        else:
+            running = self.scheduler.step()
+        if not running:
+            self.finish_run()
+            return
+        remaining = self.scheduler.estimateRemaining()
+        if remaining is not None:
+            self.progress_lb.setText('~%ds left' % remaining)
+
+    def scheduled_result(self, class_init):
+        """
+        Show the result of a validation of run_all as soon as it is done.
+        :param class_init: the finished validation.
+        :type class_init: validations.Validations
+        :return:
+        :rtype: None
+        """
+        itm = self.scheduler_items.get(type(class_init).__name__)
+        if itm is not None:
+            self.show_result(itm, self.scheduler.validationRun)
+        self.progress_bar.setValue(self.scheduler.count)
+        instrumented = self.scheduler.validationRun.instrumentation
+        result = result_export.checkResult(class_init, instrumented.getRecord(class_init) if instrumented else None)
+        if class_init in self.scheduler.failed:
+            result['status'] = 'FAILED'
+        self.export_result(result)
+
+    def export_result(self, result):
+        """
+        Write the result of a check of run_all to the exporters, if any.
+        :param result: the check result.
+        :type result: dict
+        :return:
+        :rtype: None
+        """
+        if self.exporter is not None:
+            self.exporter.write(result, scene_name())
+
+    def cancel_run(self):
+        """
+        Stop run_all between two chunks, the validations done so far keep their results.
+        :return:
+        :rtype: None
+        """
+        if self.scheduler is None:
+            return
+        self.scheduler.cancel()
+        self.finish_run()
+
+    def finish_run(self):
+        """
+        End the run and write its report, the runs of the live mode have none.
+        :return:
+        :rtype: None
+        """
+        self.run_timer.stop()
+        scheduler = self.scheduler
+        self.scheduler = None
+        self.scheduler_items = dict()
+        self.show_progress(False)
+        validation_run = scheduler.validationRun
+        validation_run.close()
+        if self.result_cache is not None:
+            # the scene changed or was switched during the run, the results don't match the cached scene anymore.
+            if cmds.file(q=True, sceneName=True) == self.cache_scene_file and not cmds.file(q=True, modified=True):
+                for class_init in scheduler.done:
+                    self.result_cache.put(self.scene_key, type(class_init), result_cache.resultOf(class_init))
+            self.result_cache.close()
+            self.result_cache = None
+        if self.exporter is not None:
+            self.exporter.close()
+            print 'Validation results : %s' % ', '.join(self.exporter.paths)
+            self.exporter = None
+        if self.report_file is None:
+            return
+        report_file = validation_run.instrumentation.writeReport(self.report_file,
+                                                                 scene=scene_name(),
+                                                                 project=str(self.proj_cb.currentText()),
+                                                                 department=self.tool_for,
+                                                                 cancelled=scheduler.cancelled,
+                                                                 failed=[type(x).__name__ for x in scheduler.failed],
+                                                                 cached=self.cached_names)
+        print 'Validation report : %s' % report_file
+
+    def show_progress(self, state):
+        """
+        Switch between the progress of run_all and the run buttons.
+        :param state: True while run_all is running.
+        :type state: bool
+        :return:
+        :rtype: None
+        """
+        self.progress_bar.setVisible(state)
+        self.progress_lb.setVisible(state)
+        self.cancel_tb.setVisible(state)
+        for each in (self.run_tb, self.run_all_tb, self.refresh_tb, self.proj_cb):
+            each.setEnabled(not state)
+
+    def toggle_live(self, state):
+        """
+        Switch the live mode, the validations of the tree are run again when the scene changes what they check.
+        :param state: True to start the live mode.
+        :type state: bool
+        :return:
+        :rtype: None
+        """
+        if self.live_validation is not None:
+            self.live_validation.stop()
+            self.live_validation = None
+        self.live_timer.stop()
+        if not state:
+            return
+        self.live_validation = live_validation.LiveValidation(live_validation.MayaCallbackSource(),
+                                                              onDirty=self.live_timer.start)
         for each in range(self.treeWidget.topLevelItemCount()):
-            self.run_def(self.treeWidget.topLevelItem(each))
+            itm = self.treeWidget.topLevelItem(each)
+            self.live_validation.watch(str(itm.text(0)), itm.get_validation())
+        self.live_validation.start()
+        self.run_dirty()
+
+    def run_dirty(self):
+        """
+        Run the validations the scene changes made dirty since the last time, through the run scheduler like run_all
+        but without result cache, exporters or report.
+        :return:
+        :rtype: None
+        """
+        if self.live_validation is None:
+            return
+        if self.scheduler is not None:
+            # a run is going on, try again once it is done.
+            self.live_timer.start()
+            return
+        dirty = self.live_validation.takeDirty()
+        if not dirty:
+            return
+        items = dict()
+        for each in range(self.treeWidget.topLevelItemCount()):
+            itm = self.treeWidget.topLevelItem(each)
+            items[str(itm.text(0))] = itm
+        to_run = list()
+        self.scheduler_items = dict()
+        for each in dirty:
+            itm = items.get(each)
+            if itm is None or str(self.treeWidget.itemWidget(itm, 1).currentText()) == 'OFF':
+                continue
+            class_init = itm.get_validation()
+            self.scheduler_items[type(class_init).__name__] = itm
+            to_run.append(class_init)
+        if not to_run:
+            return
+        self.report_file = None
+        self.exporter = None
+        self.result_cache = None
+        self.cached_names = list()
+        self.start_scheduler(to_run)
+
+    def closeEvent(self, event):
+        """
+        Remove the maya callbacks of the live mode with the window, a run_all in progress is cancelled.
+        """
+        self.cancel_run()
+        self.toggle_live(False)
+        super(Validator, self).closeEvent(event)
 
     def contextMenuEvent(self, event):
         """
@@ -250,12 +689,14 @@ class CustomTreeItem(QtGui.QTreeWidgetItem):
     """
     Custom TreeWidgetItem since PySide don't work well with extra widgets attached to the TreeWidgetItems.
     """
-    def __init__(self, parent, name, className, root_folder):
+    def __init__(self, parent, name, make_validation, root_folder):
         super(CustomTreeItem, self).__init__(parent)
         # Column 0 - Text:
         self.root_folder = root_folder
         self.setText(0, name)
-        self.className = className
+        # makes the validation on its first use, the window shows up before the check modules are imported.
+        self.make_validation = make_validation
+        self._validation = None
         # self.parent = parent
         # Column 1 - Combobox:
         self.combobox = QtGui.QComboBox()
@@ -263,14 +704,14 @@ class CustomTreeItem(QtGui.QTreeWidgetItem):
         self.treeWidget().setItemWidget(self, 1, self.combobox)
         # Column 2 - Button:
         self.ok_pb = QtGui.QToolButton()
-        ok_icon = QtGui.QIcon(os.path.join(self.root_folder, 'ui/icons/.png'))
+        ok_icon = get_icon('')
         self.ok_pb.setMaximumHeight(25)
         self.ok_pb.setMaximumWidth(25)
         self.ok_pb.setIcon(ok_icon)
         self.treeWidget().setItemWidget(self, 2, self.ok_pb)
         # Column 3 - Button:
         self.log_pb = QtGui.QToolButton()
-        log_icon = QtGui.QIcon(os.path.join(self.root_folder, 'ui/icons/logFile.png'))
+        log_icon = get_icon('logFile.png')
         self.log_pb.setMaximumHeight(25)
         self.log_pb.setMaximumWidth(25)
         self.log_pb.setIcon(log_icon)
@@ -278,7 +719,7 @@ class CustomTreeItem(QtGui.QTreeWidgetItem):
         self.treeWidget().setItemWidget(self, 3, self.log_pb)
         # Column 4 - Button:
         self.fix_pb = QtGui.QToolButton()
-        fix_icon = QtGui.QIcon(os.path.join(self.root_folder, 'ui/icons/wrench.png'))
+        fix_icon = get_icon('wrench.png')
         self.fix_pb.setMaximumHeight(25)
         self.fix_pb.setMaximumWidth(25)
         self.fix_pb.setIcon(fix_icon)
@@ -288,6 +729,20 @@ class CustomTreeItem(QtGui.QTreeWidgetItem):
         self.treeWidget().connect(self.log_pb, QtCore.SIGNAL("clicked()"), self.log_def)
         self.treeWidget().connect(self.fix_pb, QtCore.SIGNAL("clicked()"), self.fix_def)
 
+    def get_validation(self):
+        """
+        Return the validation of the item, made on the first call.
+        :return:
+        :rtype: validations.Validations
+        """
+        if self._validation is None:
+            self._validation = self.make_validation()
+        return self._validation
+
+    @property
+    def className(self):
+        return self.get_validation()
+
     def log_def(self):
         """
         Show the log window.
@@ -299,7 +754,7 @@ class CustomTreeItem(QtGui.QTreeWidgetItem):
 
         log_win = LogWin(maya_main_window())
         # log_win.setWindowModality(QtCore.Qt.WindowModal)
-        log_win.listWidget.addItems([str(x) for x in self.className.errorNodes])
+        log_win.setErrorNodes(self.className.errorStore)
         log_window = log_win.show()
         # self.exec_()
         return log_window
@@ -315,6 +770,56 @@ class CustomTreeItem(QtGui.QTreeWidgetItem):
         self.className.fix()
 
 
+class ErrorNodesModel(QtCore.QAbstractListModel):
+    """
+    List model over the ErrorRows of a validation, the rows are made when the view scrolls to them.
+    """
+    def __init__(self, rows, parent=None):
+        super(ErrorNodesModel, self).__init__(parent)
+        self.rows = rows
+        self.shown = 0
+
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        if parent.isValid():
+            return 0
+        return self.shown
+
+    def data(self, index, role=QtCore.Qt.DisplayRole):
+        if not index.isValid() or role != QtCore.Qt.DisplayRole:
+            return None
+        return self.rows.rows[index.row()][0]
+
+    def canFetchMore(self, parent=QtCore.QModelIndex()):
+        if parent.isValid():
+            return False
+        return self.shown < len(self.rows.rows) or not self.rows.exhausted
+
+    def fetchMore(self, parent=QtCore.QModelIndex()):
+        if parent.isValid():
+            return
+        if self.shown + LOG_FETCH_ROWS > len(self.rows.rows):
+            self.rows.fetch(self.shown + LOG_FETCH_ROWS - len(self.rows.rows))
+        if len(self.rows.rows) == self.shown:
+            return
+        self.beginInsertRows(QtCore.QModelIndex(), self.shown, len(self.rows.rows) - 1)
+        self.shown = len(self.rows.rows)
+        self.endInsertRows()
+
+    def refresh(self, change, *args):
+        """
+        Change the rows, like with ErrorRows.setFilter, and show them again from the top.
+        :param change: the ErrorRows method to call.
+        :type change: callable
+        :return:
+        :rtype: None
+        """
+        self.beginResetModel()
+        change(*args)
+        self.shown = 0
+        self.endResetModel()
+        self.fetchMore()
+
+
 class LogWin(QtGui.QMainWindow, result_ui.Ui_errorNodesWin):
     """
     A window just to show all the ErrorNodes.
@@ -322,30 +827,94 @@ class LogWin(QtGui.QMainWindow, result_ui.Ui_errorNodesWin):
     def __init__(self, parent=None):
         super(LogWin, self).__init__(parent)
         self.setupUi(self)
-        self.listWidget.itemClicked.connect(self.selectNode)
+        # the list widget of the generated ui made an item per error node up front, a lazy list view replaces it.
+        self.listWidget.hide()
+        self.filter_le = QtGui.QLineEdit(self.centralwidget)
+        self.filter_le.setPlaceholderText('Filter')
+        self.group_cb = QtGui.QCheckBox('Group by mesh', self.centralwidget)
+        self.select_all_tb = QtGui.QToolButton(self.centralwidget)
+        self.select_all_tb.setText('Select All')
+        self.listView = QtGui.QListView(self.centralwidget)
+        self.listView.setUniformItemSizes(True)
+        self.listView.setSelectionMode(QtGui.QAbstractItemView.ExtendedSelection)
+        self.options_layout = QtGui.QHBoxLayout()
+        self.options_layout.addWidget(self.group_cb)
+        self.options_layout.addWidget(self.select_all_tb)
+        self.gridLayout.addWidget(self.filter_le, 1, 0, 1, 1)
+        self.gridLayout.addLayout(self.options_layout, 2, 0, 1, 1)
+        self.gridLayout.addWidget(self.listView, 3, 0, 1, 1)
+        self.error_rows = None
+        self.model = None
+
+        self.filter_le.textChanged.connect(self.filterNodes)
+        self.group_cb.toggled.connect(self.groupNodes)
+        self.select_all_tb.clicked.connect(self.selectAll)
+
+    def setErrorNodes(self, errorNodes):
+        """
+        Show the error nodes of a validation.
+        :param errorNodes: the error nodes store of the validation.
+        :type errorNodes: error_store.ErrorNodes
+        :return:
+        :rtype: None
+        """
+        self.error_rows = error_store.ErrorRows(errorNodes, grouped=self.group_cb.isChecked())
+        self.error_rows.setFilter(str(self.filter_le.text()))
+        self.model = ErrorNodesModel(self.error_rows, self)
+        self.listView.setModel(self.model)
+        self.listView.selectionModel().selectionChanged.connect(self.selectNode)
+        self.model.fetchMore()
 
     def populateUi(self, itmList):
         """
-        just put all the passed errorNodes into the listWidget.
+        just put all the passed errorNodes into the list.
+        :return:
+        :rtype:
+        """
+        self.setErrorNodes(error_store.ErrorNodes(itmList))
+
+    def filterNodes(self, text):
+        if self.model is not None:
+            self.model.refresh(self.error_rows.setFilter, str(text))
+
+    def groupNodes(self, state):
+        if self.model is not None:
+            self.model.refresh(self.error_rows.setGrouped, state)
+
+    def selectNode(self, *args):
+        """
+        This is to select the ErrorNodes of the selected rows in Maya, with one select for all of them.
         :return:
         :rtype:
         """
-        for each in itmList:
-            self.listWidget.addItems(each)
-        pass
+        rows = [self.error_rows.rows[x.row()] for x in self.listView.selectionModel().selectedRows()]
+        self.selectNames(self.error_rows.names(rows))
 
-    def selectNode(self):
+    def selectAll(self):
         """
-        This is to select the ErrorNodes in Maya.
+        Select the ErrorNodes of all the rows matching the filter, with one select.
         :return:
         :rtype:
         """
-        itm = self.listWidget.selectedItems()[0]
-        mayaNode = ''
-        if itm:
-            mayaNode = itm.text()
-        if mayaNode:
-            pm.select(mayaNode)
+        if self.error_rows is None:
+            return
+        self.error_rows.fetchAll()
+        self.selectNames(self.error_rows.names(self.error_rows.rows))
+
+    @staticmethod
+    def selectNames(names):
+        """
+        Select the nodes and components still in the scene.
+        :param names: node and component names.
+        :type names: list
+        :return:
+        :rtype: None
+        """
+        existing = cmds.ls(names) if names else []
+        if existing:
+            cmds.select(existing, replace=True)
+        else:
+            cmds.select(clear=True)
 
 
 def main():
@@ -1,15 +1,42 @@
+import hashlib
+import json
 import os
 import sys
 import subprocess
 
+# the resolved environments, one json file per project and app, see AppLauncher.resolve_env.
+ENV_CACHE_FOLDER = os.path.join(os.path.expanduser('~'), '.validations', 'env_cache').replace('\\', '/')
+
+# run by the pre-spawned mayapy, maya starts while it waits for the command line of the launch.
+BATCH_BOOTSTRAP = """
+import json, sys
+import maya.standalone
+maya.standalone.initialize(name='python')
+# the batch scripts start maya themselves, it is done already.
+maya.standalone.initialize = lambda *args, **kwargs: None
+line = sys.stdin.readline()
+if line:
+    sys.argv = [x.encode(sys.getfilesystemencoding() or 'utf-8') for x in json.loads(line)]
+    if sys.argv[0].lower().endswith('.py'):
+        execfile(sys.argv[0], {'__name__': '__main__', '__file__': sys.argv[0]})
+    elif sys.argv[0]:
+        import maya.cmds as cmds
+        cmds.file(sys.argv[0], open=True, force=True, prompt=False)
+"""
+
 
 class AppLauncher:
-    def __init__(self, project=''):
+    def __init__(self, project='', verbose=False):
         self.project = project.upper()
         self.show_wrapper = ''
         self.app_wrapper = ''
         self.env_settings = dict()
         self.config_location = '//stor/data/python_packages/configs'
+        self.env_cache_folder = ENV_CACHE_FOLDER
+        self.resolved_env = dict()
+        # app name : (the environment it was started with, the waiting mayapy process)
+        self.prespawned = dict()
+        self.verbose = verbose
 
     def get_show_wrapper(self):
         self.show_wrapper = self.config_location + '/show_config/' + self.project + '/show_wrapper.txt'
@@ -17,8 +44,8 @@ class AppLauncher:
     def get_app_wrapper(self, app_name='maya2015'):
         self.app_wrapper = self.config_location + '/app_config/' + app_name.capitalize() + '.txt'
 
-    def configure_settings(self):
-        self.get_app_wrapper()
+    def configure_settings(self, app_name='maya2015'):
+        self.get_app_wrapper(app_name)
         self.get_show_wrapper()
         app_settings = read_config(self.app_wrapper)
         show_settings = read_config(self.show_wrapper)
@@ -30,12 +57,36 @@ class AppLauncher:
         self.env_settings = new_dict.copy()
         return new_dict
 
-    def set_up_env(self):
-        self.configure_settings()
-        my_env = dict()
-        for each_env in self.env_settings.keys():
-            print 'setting %s to : %s' % (each_env, ';'.join(self.env_settings[each_env]) if sys.platform == 'win32' else ':'.join(self.env_settings[each_env]))
-            os.environ[each_env] = ';'.join(self.env_settings[each_env]) if sys.platform == 'win32' else ':'.join(self.env_settings[each_env])
+    def get_config_stamp(self, app_name='maya2015'):
+        # only the mtimes of the wrappers are read on the network, the cached environment is good while they match.
+        self.get_app_wrapper(app_name)
+        self.get_show_wrapper()
+        return {'project': self.project, 'app': app_name,
+                'configs': dict((x, os.path.getmtime(x)) for x in (self.app_wrapper, self.show_wrapper))}
+
+    def get_env_cache_file(self, app_name='maya2015'):
+        return os.path.join(self.env_cache_folder, '%s_%s.json' % (self.project or 'default', app_name))
+
+    def resolve_env(self, app_name='maya2015'):
+        stamp = self.get_config_stamp(app_name)
+        cache_file = self.get_env_cache_file(app_name)
+        cached = read_env_cache(cache_file)
+        if cached is not None and cached['stamp'] == stamp:
+            self.resolved_env = cached['env']
+            return self.resolved_env
+
+        self.configure_settings(app_name)
+        separator = ';' if sys.platform == 'win32' else ':'
+        self.resolved_env = dict((key, separator.join(value)) for key, value in self.env_settings.items())
+        write_env_cache(cache_file, stamp, self.resolved_env)
+        return self.resolved_env
+
+    def set_up_env(self, app_name='maya2015'):
+        self.resolve_env(app_name)
+        for each_env, value in self.resolved_env.items():
+            if self.verbose:
+                print 'setting %s to : %s' % (each_env, value)
+            os.environ[str(each_env)] = str(value)
 
     def get_app_exe(self, app_name='maya2015', is_batch=False):
         if is_batch:
@@ -46,15 +97,42 @@ class AppLauncher:
     def start_up_commands(self):
         pass
 
-    def launch_app(self, app_to_launch, version='', start_up='', file_to_open='', is_batch=False):
+    def prespawn_batch(self, app_name='maya2015'):
+        # a mayapy started ahead with the environment of the app, the next batch launch of the app only hands it
+        # its command line.
+        self.set_up_env(app_name)
+        process = subprocess.Popen([self.get_app_exe(app_name=app_name, is_batch=True), '-c', BATCH_BOOTSTRAP],
+                                   stdin=subprocess.PIPE)
+        self.prespawned[app_name] = (self.resolved_env.copy(), process)
+        return process
+
+    def take_prespawned(self, app_name='maya2015'):
+        env, process = self.prespawned.pop(app_name, (None, None))
+        if process is None or process.poll() is not None:
+            return None
+        if env != self.resolved_env:
+            # the configs changed since it was started.
+            process.stdin.close()
+            return None
+        return process
+
+    def launch_app(self, app_to_launch, version='', start_up='', file_to_open='', is_batch=False, keep_warm=False):
         app_exe = self.get_app_exe(app_name=app_to_launch, is_batch=is_batch)
-        self.set_up_env()
+        self.set_up_env(app_to_launch)
         # cmd = [app_exe, '-hideConsole', '-log', 'D:/temp/maya_log.txt', '-noAutoloadPlugins']
         cmd = [app_exe, file_to_open, '-noAutoloadPlugins', '-log', 'D:/temp/maya_log.txt']
         # cmd = [app_exe, '-log', 'D:/temp/maya_log.txt', '-noAutoloadPlugins']
         print cmd
-        subprocess.Popen(cmd)
+        process = self.take_prespawned(app_to_launch) if is_batch else None
+        if process is not None:
+            process.stdin.write(json.dumps(cmd[1:]) + '\n')
+            process.stdin.close()
+        else:
+            process = subprocess.Popen(cmd)
+        if is_batch and keep_warm:
+            self.prespawn_batch(app_to_launch)
         print os.environ['MAYA_SCRIPT_PATH']
+        return process
 
 
 def read_config(config):
@@ -78,7 +156,38 @@ def read_config(config):
                 new_list.append(each_line)
     return ret_dict
 
-    
+
+def get_env_checksum(stamp, env):
+    return hashlib.sha1(json.dumps({'stamp': stamp, 'env': env}, sort_keys=True)).hexdigest()
+
+
+def read_env_cache(cache_file):
+    # None when there is no cache or it doesn't match its checksum.
+    try:
+        with open(cache_file, 'r') as fid:
+            cached = json.load(fid)
+    except (IOError, ValueError):
+        return None
+    if not isinstance(cached, dict) or 'stamp' not in cached or 'env' not in cached:
+        return None
+    if cached.get('checksum') != get_env_checksum(cached['stamp'], cached['env']):
+        return None
+    return cached
+
+
+def write_env_cache(cache_file, stamp, env):
+    folder = os.path.dirname(cache_file)
+    if not os.path.isdir(folder):
+        os.makedirs(folder)
+    tmp_file = '%s.%s.tmp' % (cache_file, os.getpid())
+    with open(tmp_file, 'w') as fid:
+        json.dump({'stamp': stamp, 'env': env, 'checksum': get_env_checksum(stamp, env)}, fid, indent=2,
+                  sort_keys=True)
+    if os.path.exists(cache_file):
+        os.remove(cache_file)
+    os.rename(tmp_file, cache_file)
+
+
 if __name__ == '__main__':
     os.environ['PROJECT'] = 'bdg'
     app = AppLauncher(project='bdg')